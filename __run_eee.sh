@@ -58,6 +58,31 @@ function usage () {
     printf "    -s modeloutputkey     Which model output will be analysed. Needs to be one of the keys used for                 \n"
     printf "                          dictionary of model outputs in '2_run_model_<name-model>.py'.                             \n"
     printf "                          (default: 'All').                                                                         \n"
+    printf "    -j nchunks            Number of blocks of parameter sets run in parallel with option --chunk of model script    \n"
+    printf "                          and merged afterwards with '2_merge_model_output.py'. In scheduler array jobs,            \n"
+    printf "                          run one block per task instead (default: 1).                                              \n"
+    printf "    -f fidelities         Multi-fidelity screening: comma-separated fidelities in (0,1] of iterations 2, 3, ...;        \n"
+    printf "                          the last one is used for all further iterations. The first iteration, which derives       \n"
+    printf "                          the cutoff, and the final iteration always run at full fidelity 1. Passed as option       \n"
+    printf "                          --fidelity to the model script, which shortens the simulated period accordingly           \n"
+    printf "                          (Raven and CEQUEAU scripts only), e.g. -f 0.25,0.5 (default: 1).                          \n"
+    printf "                          Elementary Effects of a shorter period have another magnitude: the parameter sets of the  \n"
+    printf "                          first iteration are run again at every reduced fidelity and the cutoff is scaled by the   \n"
+    printf "                          ratio of the Elementary Effects at reduced and full fidelity (see '4_scale_cutoff.py').   \n"
+    printf "                          This assumes that the effects of all parameters change by the same factor; parameters     \n"
+    printf "                          whose influence depends on the period, e.g. snow parameters in a period without winter,   \n"
+    printf "                          can be misclassified. Parameters wrongly found informative are not screened again.        \n"
+    printf "    -a tolerance          Adaptive number of trajectories: trajectories are added one at a time in every iteration  \n"
+    printf "                          until the split into informative and non-informative parameters and the parameter         \n"
+    printf "                          ranking of bootstrap resamples of the trajectories agree with the estimate of all         \n"
+    printf "                          trajectories within the tolerance (see '4_check_convergence.py'), e.g. -a 0.05.           \n"
+    printf "                          Option -j is ignored then (default: fixed number of trajectories).                        \n"
+    printf "    -n min_traj           Minimal number of trajectories of intermediate iterations with option -a; the first and   \n"
+    printf "                          the final iteration use at least as many trajectories as without option -a (default: 3).  \n"
+    printf "    -r min_resamples      Minimal number of distinct bootstrap resamples of trajectories for convergence with       \n"
+    printf "                          option -a, e.g. 3 trajectories allow only 10 and 4 allow 35 distinct resamples            \n"
+    printf "                          (default: 20).                                                                            \n"
+    printf "    -t max_traj           Maximal number of trajectories per iteration with option -a (default: 20).                \n"
     printf "                                                                                                                    \n"
     printf "Example                                                                                                             \n"
     printf "    ${isdir}/${pprog} -s out1 -x 2_run_model_ishigami-homma.py -m parameters.dat examples/ishigami-homma/           \n"
@@ -81,6 +106,12 @@ traj_M2=5    # number of trajectories for final iteration
 traj_M=1     # number of trajectories for 2nd, 3rd, ..., second-last iteration
 model_function='2_run_model_ishigami-homma.py'
 modeloutputkey='All'
+nchunks=1    # number of blocks of parameter sets run in parallel (--chunk i/n of model script)
+fidelities=1 # fidelities of iterations 2, 3, ... (--fidelity of model script); first and final iteration always 1
+adaptive=''  # tolerance of bootstrap agreement for adaptive number of trajectories (empty: fixed numbers above)
+traj_max=20  # maximal number of trajectories per iteration if adaptive
+traj_min=3   # minimal number of trajectories of intermediate iterations if adaptive; first and final iteration: traj_M1 and traj_M2
+min_resamples=20 # minimal number of distinct bootstrap resamples for convergence if adaptive
 
 verbose=2 # 0: pipe stdout and stderr to /dev/null
           # 1: pipe stdout to /dev/null
@@ -89,11 +120,17 @@ pipeit=''
 if [[ ${verbose} -eq 0 ]] ; then pipeit=' > /dev/null 2>&1' ; fi
 if [[ ${verbose} -eq 1 ]] ; then pipeit=' > /dev/null' ; fi
 
-while getopts "hpm:s:x:" Option ; do
+while getopts "a:hpf:j:m:n:r:s:t:x:" Option ; do
     case ${Option} in
+        a) adaptive="${OPTARG}";;
         h) usage 1>&2; exit 0;;
+        f) fidelities="${OPTARG}";;
+        j) nchunks="${OPTARG}";;
         m) maskfile="${OPTARG}";;
+        n) traj_min="${OPTARG}";;
+        r) min_resamples="${OPTARG}";;
         s) modeloutputkey="${OPTARG}";;
+        t) traj_max="${OPTARG}";;
         x) model_function="${OPTARG}";;
         *) printf "Error ${pprog}: unimplemented option.\n\n";  usage 1>&2; exit 1;;
     esac
@@ -170,30 +207,130 @@ while [[ "${finished}" = false ]] ; do
         fi
     fi
 
+    # Determine fidelity: full fidelity for first and final iteration, otherwise fidelity of this iteration or the last one given.
+    # The cutoff is fitted to the Elementary Effects of the first iteration and reused by all later ones; it is hence
+    # derived at full fidelity, since Elementary Effects of a shorter simulated period have another magnitude, and
+    # scaled to every reduced fidelity with runs of the parameter sets of the first iteration at that fidelity.
+    if ${last_iteration} || [[ ${iterations_counter} -eq 1 ]] ; then
+        fidelity=1
+    else
+        fidelity=$(echo ${fidelities} | cut -d , -f $[${iterations_counter}-1] -s)
+        if [[ -z "${fidelity}" ]] ; then
+            if [[ ${iterations_counter} -eq 2 ]] ; then
+                fidelity=${fidelities}
+            else
+                fidelity=$(echo ${fidelities} | awk -F , '{print $NF}')
+            fi
+        fi
+    fi
+    fidelity_opt=''
+    if [[ "${fidelity}" != "1" ]] ; then fidelity_opt="--fidelity ${fidelity}" ; fi
+
+    # Cutoff of this iteration: cutoff of the first iteration, scaled to the fidelity of this iteration
+    iter_cutoff=${cutoff}
+    if [[ "${fidelity}" != "1" ]] ; then iter_cutoff=$(cat iter_1/cutoff_fidelity_${fidelity}.dat) ; fi
+
     # Change directory to iteration-folder
     cd iter_${iterations_counter}
 
-    echo '# ---------------------------------------------------------------------------------'
-    echo '# ('${iterations_counter}'.1) Create Morris trajectories                           '
-    echo '# ---------------------------------------------------------------------------------'
-    python "${isdir}"/codes/1_create_parameter_sets.py -d "${maskfile}" -t ${traj} -n 1 -o parameter_sets
+    if [[ -z "${adaptive}" ]] ; then
 
-    echo '# ---------------------------------------------------------------------------------'
-    echo '# ('${iterations_counter}'.2) Run model and store all model results                  '
-    echo '# ---------------------------------------------------------------------------------'
-    parafile_M=$( \ls parameter_sets_1_scaled_*_M.dat )
-    parafile_v=$( \ls parameter_sets_1_*_v.dat )
-    skip=$( head -1 ${parafile_M} | cut -d : -f 2 )                # number of lines to skip in file containing sampled parameter sets
-    nlines=$( echo $( wc -l ${parafile_M}) | cut -f 1 -d " ")      # total number of lines in file containing sampled parameter sets
-    n_model_runs=$(( ${n_model_runs} + ${nlines} - ${skip} ))      # number of model runs
-    echo 'number model runs: '${n_model_runs}
+        echo '# ---------------------------------------------------------------------------------'
+        echo '# ('${iterations_counter}'.1) Create Morris trajectories                           '
+        echo '# ---------------------------------------------------------------------------------'
+        python "${isdir}"/codes/1_create_parameter_sets.py -d "${maskfile}" -t ${traj} -n 1 -o parameter_sets
 
-    python "${isdir}"/codes/${model_function} -i "${parafile_M}" -s ${skip} -o model_output.pkl
+        echo '# ---------------------------------------------------------------------------------'
+        echo '# ('${iterations_counter}'.2) Run model and store all model results                  '
+        echo '# ---------------------------------------------------------------------------------'
+        parafile_M=$( \ls parameter_sets_1_scaled_*_M.dat )
+        parafile_v=$( \ls parameter_sets_1_*_v.dat )
+        skip=$( head -1 ${parafile_M} | cut -d : -f 2 )                # number of lines to skip in file containing sampled parameter sets
+        nlines=$( echo $( wc -l ${parafile_M}) | cut -f 1 -d " ")      # total number of lines in file containing sampled parameter sets
+        n_model_runs=$(( ${n_model_runs} + ${nlines} - ${skip} ))      # number of model runs
+        echo 'number model runs: '${n_model_runs}
+        echo 'fidelity:          '${fidelity}
+
+        if [[ ${nchunks} -eq 1 ]] ; then
+            python "${isdir}"/codes/${model_function} -i "${parafile_M}" -s ${skip} -o model_output ${fidelity_opt}
+        else
+            # same as one SLURM/PBS array task per block: --chunk ${SLURM_ARRAY_TASK_ID}/${nchunks}
+            pids=''
+            for ichunk in $(seq 1 ${nchunks}) ; do
+                python "${isdir}"/codes/${model_function} -i "${parafile_M}" -s ${skip} -o model_output_${ichunk} --chunk ${ichunk}/${nchunks} ${fidelity_opt} &
+                pids="${pids} $!"
+            done
+            for ipid in ${pids} ; do wait ${ipid} ; done
+            python "${isdir}"/codes/2_merge_model_output.py -o model_output $(for ichunk in $(seq 1 ${nchunks}) ; do echo model_output_${ichunk} ; done)
+            rm -r $(for ichunk in $(seq 1 ${nchunks}) ; do echo model_output_${ichunk} ; done)
+        fi
+
+    else
+
+        echo '# ---------------------------------------------------------------------------------'
+        echo '# ('${iterations_counter}'.1-2) Add Morris trajectories and run model until screening converged'
+        echo '# ---------------------------------------------------------------------------------'
+        echo 'fidelity:          '${fidelity}
+        # convergence is not checked before a floor of trajectories: the fixed numbers of the first and the
+        # final iteration, at least traj_min in between; bootstrap agreement of fewer trajectories is trivially high
+        traj_floor=$(( ${traj} > ${traj_min} ? ${traj} : ${traj_min} ))
+        if ${first_iteration} || ${last_iteration} ; then traj_floor=${traj} ; fi
+        traj_floor=$(( ${traj_floor} > 2 ? ${traj_floor} : 2 ))
+        traj_last=$(( ${traj_max} > ${traj_floor} ? ${traj_max} : ${traj_floor} ))
+        for ((itraj=1 ; itraj<=${traj_last} ; itraj++)) ; do
+
+            # one new trajectory and its model runs in subfolder traj_<itraj>
+            mkdir traj_${itraj}
+            cd traj_${itraj}
+            python "${isdir}"/codes/1_create_parameter_sets.py -d "../${maskfile}" -t 1 -n 1 -o parameter_sets
+            parafile_M=$( \ls parameter_sets_1_scaled_*_M.dat )
+            skip=$( head -1 ${parafile_M} | cut -d : -f 2 )
+            nlines=$( echo $( wc -l ${parafile_M}) | cut -f 1 -d " ")
+            n_model_runs=$(( ${n_model_runs} + ${nlines} - ${skip} ))
+            python "${isdir}"/codes/${model_function} -i "${parafile_M}" -s ${skip} -o model_output ${fidelity_opt}
+            cd ..
+
+            # all trajectories so far: header of first trajectory files followed by parameter sets of all trajectories
+            for ff in $(cd traj_1 ; \ls parameter_sets_1_*.dat) ; do
+                head -n ${skip} traj_1/${ff} > ${ff}
+                for ((jtraj=1 ; jtraj<=${itraj} ; jtraj++)) ; do
+                    tail -n +$(( ${skip} + 1 )) traj_${jtraj}/${ff} >> ${ff}
+                done
+            done
+            if [[ ${itraj} -eq 1 ]] ; then
+                cp -r traj_1/model_output model_output
+            else
+                python "${isdir}"/codes/2_merge_model_output.py --append -o model_output_new model_output traj_${itraj}/model_output
+                rm -r model_output
+                mv model_output_new model_output
+            fi
+
+            # bootstrap agreement of screening with cutoff of this iteration (first iteration: fitted to current EEs)
+            if [[ ${itraj} -ge ${traj_floor} ]] ; then
+                parafile_M=$( \ls parameter_sets_1_*_M.dat | grep -v scaled )
+                parafile_v=$( \ls parameter_sets_1_*_v.dat )
+                python "${isdir}"/codes/3_derive_elementary_effects.py -i model_output -k ${modeloutputkey} -d "${maskfile}" -m "${parafile_M}" -v "${parafile_v}" -o eee_results.dat
+                if [[ "${cutoff}" == "-1" ]] ; then
+                    python "${isdir}"/codes/4_derive_threshold.py -e eee_results.dat -m "${maskfile}" -c -1 -n
+                    check_cutoff=''
+                    for ff in $(\ls cutoff_[0-9]*.dat) ; do
+                        check_cutoff=$(echo ${check_cutoff}$(tail -1 $ff):)
+                    done
+                else
+                    check_cutoff=${iter_cutoff}
+                fi
+                python "${isdir}"/codes/4_check_convergence.py -i model_output -k ${modeloutputkey} -d "${maskfile}" -m "${parafile_M}" -v "${parafile_v}" -c ${check_cutoff} -t ${adaptive} -r ${min_resamples} -o convergence.dat
+                if [[ $(tail -1 convergence.dat | awk '{print $NF}') -eq 1 ]] ; then break ; fi
+            fi
+        done
+        echo 'number model runs: '${n_model_runs}
+
+    fi
 
     echo '# ---------------------------------------------------------------------------------'
     echo '# ('${iterations_counter}'.3) Calculate Elementary Effects                         '
     echo '# ---------------------------------------------------------------------------------'
-    model_outputs='model_output.pkl'
+    model_outputs='model_output'          # directory of .npy files; EE step memory-maps requested key only
     eefile='eee_results.dat'
     parafile_M=$( \ls parameter_sets_1_*_M.dat | grep -v scaled )
     parafile_v=$( \ls parameter_sets_1_*_v.dat )
@@ -202,17 +339,34 @@ while [[ "${finished}" = false ]] ; do
     echo '# ---------------------------------------------------------------------------------'
     echo '# ('${iterations_counter}'.4) Create some plots and derive cutoff                  '
     echo '# ---------------------------------------------------------------------------------'
-    python "${isdir}"/codes/4_derive_threshold.py -e "${eefile}" -m "${maskfile}" -p "${outfile}" -c ${cutoff} #-t # -n
+    python "${isdir}"/codes/4_derive_threshold.py -e "${eefile}" -m "${maskfile}" -p "${outfile}" -c ${iter_cutoff} #-t # -n
 
     echo '# ---------------------------------------------------------------------------------'
     echo '# ('${iterations_counter}'.5) Get the Cutoff                                       '
     echo '# ---------------------------------------------------------------------------------'
-    files=$(\ls cutoff_*.dat)
-    cutoff=''
-    for ff in $files ; do
-        cutoff=$(echo ${cutoff}$(tail -1 $ff):)
-    done
+    # cutoff is fitted in the first iteration at full fidelity; cutoff files of later iterations can hold scaled cutoffs
+    if ${first_iteration} ; then
+        files=$(\ls cutoff_[0-9]*.dat)
+        cutoff=''
+        for ff in $files ; do
+            cutoff=$(echo ${cutoff}$(tail -1 $ff):)
+        done
+
+        # scaled cutoff of every reduced fidelity: parameter sets of this iteration run again at that fidelity
+        for fid in $(echo ${fidelities} | tr , '\n' | sort -u) ; do
+            if [[ "${fid}" == "1" ]] ; then continue ; fi
+            echo 'Calibrate cutoff at fidelity '${fid}
+            mkdir fidelity_${fid}
+            cd fidelity_${fid}
+            python "${isdir}"/codes/${model_function} -i "../$( cd .. ; \ls parameter_sets_1_scaled_*_M.dat )" -s ${skip} -o model_output --fidelity ${fid}
+            n_model_runs=$(( ${n_model_runs} + $( echo $( wc -l ../${parafile_M}) | cut -f 1 -d " ") - ${skip} ))
+            python "${isdir}"/codes/3_derive_elementary_effects.py -i model_output -k ${modeloutputkey} -d "../${maskfile}" -m "../${parafile_M}" -v "../${parafile_v}" -o eee_results.dat
+            cd ..
+            python "${isdir}"/codes/4_scale_cutoff.py -e "${eefile}" -f fidelity_${fid}/eee_results.dat -d "${maskfile}" -c ${cutoff} -o cutoff_fidelity_${fid}.dat
+        done
+    fi
     echo 'Cutoff(s) :: '${cutoff}
+    if [[ "${fidelity}" != "1" ]] ; then echo 'Cutoff(s) at fidelity '${fidelity}' :: '${iter_cutoff} ; fi
     if ${first_iteration} ; then
         first_iteration=false
     fi
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+from __future__ import print_function
+
+# Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+#
+# License
+# This file is part of the EEE code library for "Computationally inexpensive identification
+# of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+#
+# The EEE code library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The MVA code library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with The EEE code library.
+# If not, see <https://github.com/julemai/EEE/blob/master/LICENSE>.
+#
+# If you use this method in a publication please cite:
+#
+#    M Cuntz & J Mai et al. (2015).
+#    Computationally inexpensive identification of noninformative model parameters by sequential screening.
+#    Water Resources Research, 51, 6417-6441.
+#    https://doi.org/10.1002/2015WR016907.
+#
+# Derives objective metrics (e.g. NSE, KGE) of simulated time series stored in a model output
+# (option -i, key option -k) against observations of a Raven RVT file (option -b) for all
+# model runs at once. The metrics are added to the model output as new keys <metric>_<key>,
+# e.g. 'nse_Q', that can be analysed with 3_derive_elementary_effects.py without rerunning
+# the model.
+#
+# python 2_derive_metrics.py \
+#                       -i model_output.pkl \
+#                       -k Q \
+#                       -b ../examples/raven-hmets/model/data_obs/Salmon-River-Near-Prince-George_Qobs_daily.rvt \
+#                       --start 1991-01-01 \
+#                       -m nse,kge,lognse,pbias
+
+"""
+Derives objective metrics of stored simulated time series of all model runs and adds them to the model output.
+
+History
+-------
+Written,  JM, Oct 2026
+"""
+
+# -------------------------------------------------------------------------
+# Command line arguments - if script
+#
+
+# Comment|Uncomment - Begin
+#if __name__ == '__main__':
+
+# -----------------------
+# add subolder scripts/lib to search path
+# -----------------------
+import sys
+import os
+dir_path = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(dir_path+'/lib')
+
+import argparse
+import datetime
+import numpy as np
+
+from   output_store    import load_model_output, add_model_output    # in lib/
+from   raven_output    import read_raven_observations                # in lib/
+from   metrics         import calc_metrics                           # in lib/
+
+modeloutputs = 'example_raven-hmets/model_output.pkl'                # model output with simulated time series
+simkey       = 'Q'                                                   # key of simulated time series
+obsfile      = os.path.join(dir_path,'..','examples','raven-hmets','model','data_obs','Salmon-River-Near-Prince-George_Qobs_daily.rvt')
+start        = '1991-01-01'                                          # date of first stored simulated time step (after warm-up)
+metrics      = 'nse,kge,lognse,pbias'                                # metrics to derive
+float32      = False                                                 # store metrics in single precision
+
+parser   = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                  description='''Derives objective metrics (option -m) of simulated time series (option -k) stored in a model output (option -i) against observations of a Raven RVT file (option -b) for all model runs at once. Metrics are added to the model output as new keys <metric>_<key>, e.g. 'nse_Q', without rerunning the model.''')
+parser.add_argument('-i', '--modeloutputs', action='store',
+                    default=modeloutputs, dest='modeloutputs', metavar='modeloutputs',
+                    help="Model output written by 2_run_model_*.py: pickle file (*.pkl), NetCDF file (*.nc) or directory of .npy files (default: 'example_raven-hmets/model_output.pkl').")
+parser.add_argument('-k', '--key', action='store',
+                    default=simkey, dest='simkey', metavar='key',
+                    help="Key of simulated time series in model output (default: 'Q').")
+parser.add_argument('-b', '--obsfile', action='store',
+                    default=obsfile, dest='obsfile', metavar='obsfile',
+                    help="Raven RVT file with :ObservationData block of observations (default: Qobs_daily.rvt of Salmon River in examples/raven-hmets/model/data_obs).")
+parser.add_argument('--start', action='store',
+                    default=start, dest='start', metavar='YYYY-MM-DD',
+                    help="Date of first stored simulated time step, i.e. after warm-up. Simulations and observations need the same time step (default: '1991-01-01').")
+parser.add_argument('-m', '--metrics', action='store',
+                    default=metrics, dest='metrics', metavar='m1,m2',
+                    help="Comma-separated list of metrics: nse, lognse, kge, pbias, rmse, mae (default: 'nse,kge,lognse,pbias').")
+parser.add_argument('--float32', action='store_true',
+                    default=float32, dest='float32',
+                    help="Store metrics in single precision (default: False, i.e. double precision).")
+
+args         = parser.parse_args()
+modeloutputs = args.modeloutputs
+simkey       = args.simkey
+obsfile      = args.obsfile
+start        = datetime.datetime.strptime(args.start, '%Y-%m-%d')
+metrics      = args.metrics.split(',')
+float32      = args.float32
+
+del parser, args
+
+# -------------------------
+# read observations once and align them with stored simulations
+# -------------------------
+obs = read_raven_observations(obsfile)
+sim = load_model_output(modeloutputs, keys=[simkey])[simkey]     # memory-mapped for .npy directories
+if len(np.shape(sim)) != 2:
+    raise ValueError("Model output '"+simkey+"' must be a time series per model run, but has shape "+str(np.shape(sim)))
+ntime  = np.shape(sim)[1]
+
+offset = (start - obs['start']).total_seconds() / 86400. / obs['interval']
+if offset != int(offset) or offset < 0:
+    raise ValueError("Start of simulation "+str(start)+" is not a time step of observations starting "+str(obs['start']))
+offset = int(offset)
+qobs   = np.full(ntime, np.nan)
+nobs   = max(0, min(ntime, len(obs['values'])-offset))
+qobs[:nobs] = obs['values'][offset:offset+nobs]
+print("observations:  "+str(np.sum(np.isfinite(qobs)))+" of "+str(ntime)+" time steps from '"+obsfile+"'")
+
+# -------------------------
+# metrics of all model runs (vectorized over runs, see lib/metrics.py)
+# -------------------------
+out = calc_metrics(sim, qobs, metrics)
+out = dict([ (mm+'_'+simkey, out[mm]) for mm in metrics ])
+
+add_model_output(modeloutputs, out, dtype=np.float32 if float32 else None)
+
+for ikey in out:
+    print(ikey.ljust(14)+" range: [",np.nanmin(out[ikey]),",",np.nanmax(out[ikey]),"]")
+print("wrote:   '"+modeloutputs+"' (added keys: "+', '.join(out.keys())+")")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+from __future__ import print_function
+
+# Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+#
+# License
+# This file is part of the EEE code library for "Computationally inexpensive identification
+# of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+#
+# The EEE code library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The MVA code library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with The EEE code library.
+# If not, see <https://github.com/julemai/EEE/blob/master/LICENSE>.
+#
+# If you use this method in a publication please cite:
+#
+#    M Cuntz & J Mai et al. (2015).
+#    Computationally inexpensive identification of noninformative model parameters by sequential screening.
+#    Water Resources Research, 51, 6417-6441.
+#    https://doi.org/10.1002/2015WR016907.
+#
+# Merges the partial model outputs of blocks of parameter sets (option --chunk i/n of the
+# 2_run_model_*.py scripts, e.g. one block per SLURM/PBS array task) into one model output
+# in the order of the parameter design (option -o). It is checked that all partial outputs
+# belong to the same design and that every parameter set was run exactly once.
+#
+# python 2_merge_model_output.py \
+#                       -o model_output.pkl \
+#                       model_output_1.pkl model_output_2.pkl model_output_3.pkl
+#
+# With option --append, complete model outputs of consecutive parameter designs, e.g. Morris
+# trajectories added one at a time (option -a of __run_eee.sh), are appended in the given order.
+
+"""
+Merges partial model outputs of blocks of parameter sets into one model output.
+
+History
+-------
+Written,  JM, Oct 2026
+"""
+
+# -------------------------------------------------------------------------
+# Command line arguments - if script
+#
+
+# Comment|Uncomment - Begin
+#if __name__ == '__main__':
+
+# -----------------------
+# add subolder scripts/lib to search path
+# -----------------------
+import sys
+import os
+dir_path = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(dir_path+'/lib')
+
+import argparse
+import numpy as np
+
+from   output_store    import merge_model_output, append_model_output    # in lib/
+
+outfile     = 'model_output.pkl'    # name of merged model output
+float32     = False                 # store model outputs in single precision
+compress    = False                 # compress model outputs (NetCDF only)
+append      = False                 # append complete model outputs in given order instead of merging partial outputs
+
+parser   = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                  description='''Merges the partial model outputs of blocks of parameter sets (option --chunk i/n of 2_run_model_*.py) into one model output in the order of the parameter design (option -o). Fails if parameter sets are missing or were run more than once. With option --append, complete model outputs of consecutive parameter designs are appended in the given order.''')
+parser.add_argument('infiles', nargs='+', metavar='partial_output',
+                    help="Partial model outputs written with option --chunk i/n of 2_run_model_*.py.")
+parser.add_argument('-o', '--outfile', action='store',
+                    default=outfile, dest='outfile', metavar='outfile',
+                    help="Name of merged model output: pickle file (*.pkl), NetCDF file (*.nc) or directory of memory-mappable .npy files (any other name) (default: 'model_output.pkl').")
+parser.add_argument('--float32', action='store_true',
+                    default=float32, dest='float32',
+                    help="Store model outputs in single precision (default: False, i.e. double precision).")
+parser.add_argument('--compress', action='store_true',
+                    default=compress, dest='compress',
+                    help="Compress model outputs (zlib); only for NetCDF outfile *.nc (default: False).")
+parser.add_argument('--append', action='store_true',
+                    default=append, dest='append',
+                    help="Append complete model outputs of consecutive parameter designs (e.g. Morris trajectories added one at a time) in the given order instead of merging partial outputs of one design (default: False).")
+
+args     = parser.parse_args()
+infiles  = args.infiles
+outfile  = args.outfile
+float32  = args.float32
+compress = args.compress
+append   = args.append
+
+del parser, args
+
+if append:
+    model_output = append_model_output(infiles, outfile, dtype=np.float32 if float32 else None, zlib=compress)
+    print("appended: "+str(len(infiles))+" model outputs with "+str(model_output.nruns)+" model runs")
+else:
+    model_output = merge_model_output(infiles, outfile, dtype=np.float32 if float32 else None, zlib=compress)
+    print("merged:  "+str(len(infiles))+" partial outputs with "+str(model_output.nruns)+" model runs")
+print("wrote:   '"+outfile+"'")
@@ -30,8 +30,8 @@ from __future__ import print_function
 #
 # An example calling sequence to derive model outputs for previously sampled parameter sets stored
 # in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs
-# are stored in a pickle file (option -o). The model outputs are stored as dictionaries. Multiple
-# model outputs are possible.
+# are stored as one array per output (option -o) in a pickle file (*.pkl), a NetCDF file (*.nc), or
+# a directory of .npy files (any other name). Multiple model outputs are possible.
 #
 # python 2_run_model_cequeau.py \
 #                       -i parameter_sets_1_scaled_para21_M.dat \
@@ -39,7 +39,7 @@ from __future__ import print_function
 #                       -o model_output.pkl
 
 """
-Runs a model for a bunch of parameter sets and stores model outputs in a pickle file.
+Runs a model for a bunch of parameter sets and stores model outputs in a model output store (lib/output_store.py).
 
 History
 -------
@@ -66,22 +66,26 @@ import argparse
 import numpy as np
 import scipy.stats as stats
 import copy
-import pickle
 from   pathlib2        import Path
-import subprocess
-import shutil
 import datetime
 
 from   cequeau_templates import EXECUTION_XML, PARAMETRES_XML, BASSINVERSANT_XML # in examples/cequeau-nc/model/
 from   cequeau_common    import writeString, makeDirectories, get_discharge      # in examples/cequeau-nc/model/
 from   fread             import fread                                            # in lib/
+from   model_process     import run_model                                        # in lib/
+from   driver            import add_run_options, ModelRuns                       # in lib/
+from   reduction         import parse_reductions, reduce_outputs                 # in lib/
+from   fidelity          import fidelity_end                                     # in lib/
 
 infile      = 'example_cequeau-nc/parameter_sets_1_scaled_para9_M.dat'     # name of file containing sampled parameter sets to run the model
 outfile     = 'example_cequeau-nc/model_output.pkl'                        # name of file used to save (scalar) model outputs
 skip        = None                                                         # number of lines to skip in input file
+reductions  = None                                                         # reduce time series of each run to these statistics, e.g. 'Q:mean,Q:q95' (see lib/reduction.py)
+keepseries  = False                                                        # keep reduced time series as well
+fidelity    = 1.                                                           # fraction of simulated period (multi-fidelity screening; 1: full period)
 
 parser   = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
-                                  description='''An example calling sequence to derive model outputs for previously sampled parameter sets stored in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs are stored in a pickle file (option -o). The model outputs are stored as dictionaries. Multiple model outputs are possible..''')
+                                  description='''An example calling sequence to derive model outputs for previously sampled parameter sets stored in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs are stored as one array per output (option -o). Multiple model outputs are possible..''')
 parser.add_argument('-i', '--infile', action='store',
                     default=infile, dest='infile', metavar='infile',
                     help="Name of file containing sampled SCALED parameter sets to run the model (default: 'parameter_sets.out').")
@@ -90,15 +94,41 @@ parser.add_argument('-s', '--skip', action='store',
                     help="Number of lines to skip in input file (default: None).")
 parser.add_argument('-o', '--outfile', action='store',
                     default=outfile, dest='outfile', metavar='outfile',
-                    help="Name of file used to save (scalar) model outputs in a pickle file (default: 'model_output.pkl').")
+                    help="Name of file used to save model outputs: pickle file (*.pkl), NetCDF file (*.nc) or directory of memory-mappable .npy files (any other name) (default: 'model_output.pkl').")
+parser.add_argument('--reduce', action='store',
+                    default=reductions, dest='reductions', metavar='key:stat,...',
+                    help="Reduce time series outputs of each run to statistics before they are returned and stored, e.g. 'Q:mean,Q:q05,Q:q95,Q:annual_max,Q:djf'. Statistic stat of key is stored as key stat_key, e.g. 'q95_Q'. Statistics: mean, median, std, min, max, sum, qNN (percentile), annual_mean, annual_sum, annual_max, djf, mam, jja, son, monNN (see lib/reduction.py) (default: None, i.e. full time series are stored).")
+parser.add_argument('--fidelity', action='store',
+                    default=fidelity, dest='fidelity', metavar='fidelity',
+                    help="Multi-fidelity screening: fidelity in (0,1] shortens the simulation period of execution.xml (end_day of cequeau-setup.dat) after the spin-up (warmup_days of cequeau-setup.dat) to this fraction of its length, e.g. for intermediate EEE iterations; outputs such as time series of Q are then shorter. Full fidelity 1 is meant for the first iteration, which derives the cutoff, and the final iteration (default: 1, i.e. full period).")
+parser.add_argument('--keep-series', action='store_true',
+                    default=keepseries, dest='keepseries',
+                    help="Keep the full time series of reduced outputs in addition to their statistics (default: False).")
+add_run_options(parser, external=True)
 
 args     = parser.parse_args()
 infile   = args.infile
 outfile  = args.outfile
 skip     = args.skip
+reductions  = args.reductions
+keepseries  = args.keepseries
+fidelity    = float(args.fidelity)
+
+# runs of all parameter sets: serially, by parallel processes or by job queue workers, with retries
+# of failed runs, model output store and online Elementary Effects (see lib/driver.py)
+runs       = ModelRuns(args, external=True)
+timeout    = runs.timeout
+logdir     = runs.logdir
+telemetry  = runs.telemetry
+scratchdir = runs.scratchdir
+
+# time series are reduced to statistics by each run before they are returned (see lib/reduction.py)
+if not(reductions is None):
+    reductions = parse_reductions(reductions)
 
 del parser, args
 
+@telemetry.timed
 def model_function(paras, run_id=None):
     # input:
     #     paras     ... list of model parameters scaled to their range;
@@ -158,7 +188,7 @@ def model_function(paras, run_id=None):
     # ---------------
     # create a run folder
     # ---------------
-    tmp_folder = "/tmp/eee-analysis/"+str(run_id) # "/tmp/juletest" #  TODO a generic folder name in /tmp
+    tmp_folder = scratchdir.run_folder(run_id)   # unique per analysis (see lib/scratch.py)
     cequeau_exe_name    = os.path.abspath(dir_path+"/../"+"examples/cequeau-nc/model/cequeau")
     cequeau_obs_folder  = os.path.abspath(dir_path+"/../"+"examples/cequeau-nc/model/data_obs")
     cequeau_run_details = os.path.abspath(os.path.dirname(infile)+"/../model/"+"cequeau-setup.dat")
@@ -175,6 +205,7 @@ def model_function(paras, run_id=None):
     dict_setup['basin_id']   = None
     dict_setup['start_day']  = None
     dict_setup['end_day']    = None
+    dict_setup['warmup_days']= 0
     
     for ii in lines:
         if (len(ii) > 0):
@@ -189,6 +220,8 @@ def model_function(paras, run_id=None):
                     dict_setup['start_day']  = ii_val
                 if ii_key == 'end_day':
                     dict_setup['end_day']    = ii_val
+                if ii_key == 'warmup_days':
+                    dict_setup['warmup_days']= int(ii_val)
 
     if ( dict_setup['basin_id'] is None ) or ( dict_setup['start_day'] is None ) or ( dict_setup['end_day'] is None ):
         print("basin_id:  ",dict_setup['basin_id'])
@@ -196,9 +229,12 @@ def model_function(paras, run_id=None):
         print("end_day:   ",dict_setup['end_day'])
         raise ValueError('CEQUEAU setup file has missing key values!')
 
-    # cleanup before run
-    if os.path.exists(tmp_folder):
-        shutil.rmtree(tmp_folder)
+    # multi-fidelity screening: shortened simulation period after the spin-up (option --fidelity)
+    if fidelity < 1.:
+        end_day = fidelity_end(datetime.datetime.strptime(dict_setup['start_day'],'%Y-%m-%d'),
+                               datetime.datetime.strptime(dict_setup['end_day'],'%Y-%m-%d'), fidelity,
+                               warmup=dict_setup['warmup_days'])
+        dict_setup['end_day'] = end_day.strftime('%Y-%m-%d')
 
     # print setups
     print("dict_setup: ",dict_setup)
@@ -223,18 +259,23 @@ def model_function(paras, run_id=None):
     out_folder = str(Path(tmp_folder,"output"))
     os.makedirs(out_folder)
     
+    telemetry.lap('model')
+
     # ---------------
     # run the model with these input rv* files
     # ---------------        
     cmd = [str(Path(tmp_folder,os.path.basename(cequeau_exe_name))),str(Path(tmp_folder,"execution.xml"))]
     print("run cmd: ",' '.join(cmd))
 
-    process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    # model output is written directly to a log file per run; hung runs are killed after timeout
+    logfile = str(Path(logdir,str(run_id)+".log"))
+    status  = run_model(cmd, logfile, timeout=timeout)
+    telemetry.model_status(status)
+    telemetry.lap('parse')
+    print("Cequeau exit code: ",status['returncode'],"  (log file: "+logfile+")")
 
-    print("")
-    print("Cequeau standard output:")
-    for line in process.stdout:
-        print(">>> ",line.rstrip()) # rstrip removes trailing \n
+    if status['timeout']:
+        raise ValueError("ERROR: Cequeau run killed after timeout of "+str(timeout)+" s (see log file "+logfile+")")
 
     if not(os.path.exists(str(Path(tmp_folder,"output","resultats.nc")))):            
         print("")
@@ -288,45 +329,18 @@ def model_function(paras, run_id=None):
     print("shape Q:        ",np.shape(model['Q']))
     print("")
 
+    telemetry.lap('cleanup')
+
     # ---------------
     # cleanup
     # ---------------
-    #if os.path.exists(tmp_folder):
-    #    shutil.rmtree(tmp_folder)
-
-    return model
-
-# read parameter sets
-ff = open(infile, "r")
-parasets = ff.readlines()
-ff.close()
-
-if skip is None:
-    skip = np.int(parasets[0].strip().split(':')[1])
-else:
-    skip = np.int(skip)
-parasets = parasets[skip:]
-
-model_output = {}
+    #scratchdir.release(run_id)
 
-# this loop could be easily parallized and modified such that it
-# actually submits multiple tasks to a HPC
-for iparaset,paraset in enumerate(parasets):
-    
-    paraset = list(map(float,paraset.strip().split()))
-    model = model_function(paraset,run_id='run_set_'+str(iparaset))
-
-    if iparaset == 0:
-        for ikey in model.keys():
-            model_output[ikey] = []
-
-
-    for ikey in model.keys():
-            
-        model_output[ikey].append(model[ikey])
-            
+    # ---------------
+    # reduce time series to statistics (option --reduce)
+    # ---------------
+    model = reduce_outputs(model, reductions, keep=keepseries, start=start_day)
 
-pickle.dump( model_output, open( outfile, "wb" ) )
+    return model
 
-print("wrote:   '"+outfile+"'")
-        
+runs.run(model_function)
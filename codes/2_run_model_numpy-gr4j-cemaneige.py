@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+from __future__ import print_function
+
+# Copyright 2019 Juliane Mai - juliane.mai(at)uwaterloo.ca
+#
+# License
+# This file is part of the EEE code library for "Computationally inexpensive identification
+# of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+#
+# The EEE code library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The MVA code library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with The EEE code library.
+# If not, see <https://github.com/julemai/EEE/blob/master/LICENSE>.
+#
+# If you use this method in a publication please cite:
+#
+#    M Cuntz & J Mai et al. (2015).
+#    Computationally inexpensive identification of noninformative model parameters by sequential screening.
+#    Water Resources Research, 51, 6417-6441.
+#    https://doi.org/10.1002/2015WR016907.
+#
+# Same as 2_run_model_raven-gr4j-cemaneige.py but with an emulation of Raven's GR4J-CemaNeige
+# in NumPy (lib/gr4j_cemaneige.py) instead of Raven: blocks of parameter sets (option -b)
+# are run in lockstep through time as arrays, driven by the same forcings (data_obs), the same
+# simulation period (RVI template) and the same parameters.dat. Model outputs have the same
+# keys as the Raven driver (nse, kge, Q). The emulation reproduces the reference hydrographs of
+# Raven v4.12.1 in examples/raven-gr4j-cemaneige/model/data_ref; option --compare checks parity
+# against a model output of the Raven driver for the same parameter sets.
+#
+# python 2_run_model_numpy-gr4j-cemaneige.py \
+#                       -i parameter_sets_1_scaled_para9_M.dat \
+#                       -s 10
+#                       -o model_output.pkl
+
+"""
+Runs a NumPy emulation of Raven's GR4J-CemaNeige for a bunch of parameter sets at once and stores model outputs in a model output store (lib/output_store.py).
+
+History
+-------
+Written,  JM, Oct 2026
+"""
+
+# -------------------------------------------------------------------------
+# Command line arguments - if script
+#
+
+# Comment|Uncomment - Begin
+#if __name__ == '__main__':
+
+# -----------------------
+# add subolder scripts/lib to search path
+# -----------------------
+import sys
+import os
+dir_path = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.abspath(dir_path+'/lib'))
+sys.path.append(os.path.abspath(dir_path+'/../examples/raven-gr4j-cemaneige/model'))
+
+import argparse
+import datetime
+import time
+import numpy as np
+
+from   raven_templates import RVI                                             # in examples/raven-gr4j-cemaneige/model/
+from   raven_output    import read_raven_multidata, read_raven_observations  # in lib/
+from   raven_staging   import raven_window                                    # in lib/
+from   fidelity        import shorten_raven_window                            # in lib/
+from   gr4j_cemaneige  import gr4j_cemaneige, hargreaves_pet                  # in lib/
+from   metrics         import nse, kge                                        # in lib/
+from   output_store    import load_model_output                               # in lib/
+from   driver          import add_run_options, ModelRuns                      # in lib/
+from   reduction       import parse_reductions, reduce_outputs                # in lib/
+
+infile      = 'example_raven-gr4j-cemaneige/parameter_sets_1_scaled_para9_M.dat'  # name of file containing sampled parameter sets to run the model
+outfile     = 'example_raven-gr4j-cemaneige/model_output.pkl'                     # name of file used to save (scalar) model outputs
+skip        = None                                                                # number of lines to skip in input file
+nblock      = 1000                                                                # number of parameter sets run at once as arrays
+keys        = None                                                                # compute only these model output keys (comma-separated)
+reductions  = None                                                                # reduce time series of each run to these statistics, e.g. 'Q:mean,Q:q95' (see lib/reduction.py)
+keepseries  = False                                                               # keep reduced time series as well
+fidelity    = 1.                                                                  # fraction of simulated period after warm-up (multi-fidelity screening; 1: full period)
+compare     = None                                                                # model output of Raven driver for the same parameter sets to check parity with
+tolerance   = 1e-3                                                                # largest relative difference to Raven outputs accepted by parity check
+
+parser   = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                  description='''Emulation of the Raven GR4J-CemaNeige example in NumPy that reproduces Raven v4.12.1 (see examples/raven-gr4j-cemaneige/model/data_ref). An example calling sequence to derive model outputs for previously sampled parameter sets stored in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs are stored as one array per output (option -o). Multiple model outputs are possible..''')
+parser.add_argument('-i', '--infile', action='store',
+                    default=infile, dest='infile', metavar='infile',
+                    help="Name of file containing sampled SCALED parameter sets to run the model (default: 'parameter_sets.out').")
+parser.add_argument('-s', '--skip', action='store',
+                    default=skip, dest='skip', metavar='skip',
+                    help="Number of lines to skip in input file (default: None).")
+parser.add_argument('-o', '--outfile', action='store',
+                    default=outfile, dest='outfile', metavar='outfile',
+                    help="Name of file used to save model outputs: pickle file (*.pkl), NetCDF file (*.nc) or directory of memory-mappable .npy files (any other name) (default: 'model_output.pkl').")
+parser.add_argument('-b', '--block', action='store',
+                    default=nblock, dest='nblock', metavar='nblock',
+                    help="Number of parameter sets run at once in lockstep as arrays; memory is about 8*ntime*nblock*2 bytes (default: 1000).")
+parser.add_argument('--keys', action='store',
+                    default=keys, dest='keys', metavar='key1,key2',
+                    help="Compute only these model output keys, e.g. 'nse' (default: None, i.e. all keys: nse, kge, Q).")
+parser.add_argument('--reduce', action='store',
+                    default=reductions, dest='reductions', metavar='key:stat,...',
+                    help="Reduce time series outputs of each run to statistics before they are stored, e.g. 'Q:mean,Q:q05,Q:q95,Q:annual_max,Q:djf'. Statistic stat of key is stored as key stat_key, e.g. 'q95_Q' (see lib/reduction.py) (default: None, i.e. full time series are stored).")
+parser.add_argument('--keep-series', action='store_true',
+                    default=keepseries, dest='keepseries',
+                    help="Keep the full time series of reduced outputs in addition to their statistics (default: False).")
+parser.add_argument('--fidelity', action='store',
+                    default=fidelity, dest='fidelity', metavar='fidelity',
+                    help="Multi-fidelity screening: fidelity in (0,1] shortens the simulation period of the RVI to this fraction of its length after the two-year warm-up (default: 1, i.e. full period).")
+parser.add_argument('--compare', action='store',
+                    default=compare, dest='compare', metavar='raven_output',
+                    help="Parity check: model output written by 2_run_model_raven-gr4j-cemaneige.py for the same parameter sets. Differences of all common keys are reported and the script fails if a relative difference exceeds the tolerance (default: None, i.e. no check).")
+parser.add_argument('--tolerance', action='store',
+                    default=tolerance, dest='tolerance', metavar='tolerance',
+                    help="Largest relative difference to the Raven outputs accepted by the parity check (default: 1e-3).")
+add_run_options(parser, queue=False)
+
+args       = parser.parse_args()
+infile     = args.infile
+outfile    = args.outfile
+skip       = args.skip
+nblock     = int(args.nblock)
+keys       = args.keys
+reductions = args.reductions
+keepseries = args.keepseries
+fidelity   = float(args.fidelity)
+compare    = args.compare
+tolerance  = float(args.tolerance)
+
+# parameter sets, failed runs, model output store and online Elementary Effects (see lib/driver.py)
+runs = ModelRuns(args)
+
+if keys is None:
+    keys = ['nse', 'kge', 'Q']
+else:
+    keys = keys.split(',')
+    for ikey in keys:
+        if not(ikey in ['nse', 'kge', 'Q']):
+            raise ValueError("Unknown model output key '"+ikey+"'. Available keys: nse, kge, Q")
+
+# time series are reduced to statistics by each run before they are stored (see lib/reduction.py)
+if not(reductions is None):
+    reductions = parse_reductions(reductions)
+    for ikey in reductions:
+        if not(ikey in keys):
+            raise ValueError("Reduced key '"+ikey+"' is not a computed model output key: "+', '.join(keys))
+
+del parser, args
+
+# ---------------
+# setup of Raven example: simulation period, forcings, observations, catchment area (RVH)
+# ---------------
+warmup   = 2*365      # rows of Raven Hydrographs.csv skipped by Raven driver; first stored day 1991-01-01
+area     = 4250.6     # km2
+latitude = 54.4848    # deg, HRU of RVH
+obs_folder = os.path.abspath(dir_path+"/../"+"examples/raven-gr4j-cemaneige/model/data_obs")
+start, end = raven_window(shorten_raven_window(RVI, fidelity, warmup=warmup))
+forcing    = read_raven_multidata(os.path.join(obs_folder, "Salmon-River-Near-Prince-George_meteo_daily.rvt"))
+qobs       = read_raven_observations(os.path.join(obs_folder, "Salmon-River-Near-Prince-George_Qobs_daily.rvt"))
+
+# Raven simulates the time steps from start until end; Hydrographs.csv has the initial state
+# as first row and the mean discharge of time step i in row i+1
+nsteps = int(round((end - start).total_seconds() / 86400.))
+ifirst = int(round((start - forcing['start']).total_seconds() / 86400. / forcing['interval']))
+if ifirst < 0 or ifirst+nsteps > len(forcing['data']['RAINFALL']):
+    raise ValueError("Forcings do not cover simulation period "+str(start)+" to "+str(end))
+meteo  = [ forcing['data'][ff][ifirst:ifirst+nsteps] for ff in ['RAINFALL', 'SNOWFALL', 'TEMP_DAILY_MIN', 'TEMP_DAILY_MAX', 'PET'] ]
+
+# Raven evaporates ponded water with its default open-water PET because the RVI sets only :Evaporation
+owpet  = hargreaves_pet(meteo[2], meteo[3], latitude, start)
+
+# observations of the stored rows, i.e. from 1991-01-01 on (Raven :EvaluationTime); Raven compares
+# the row of date d, i.e. the time step starting on day d-1, with the observation of day d-1
+iobs   = int(round((start + datetime.timedelta(days=warmup-1) - qobs['start']).total_seconds() / 86400.))
+qobs   = qobs['values'][iobs:iobs+nsteps-warmup+1]
+
+
+def model_function(parasets):
+    # input:
+    #     parasets  ... array of parameter sets [nruns, 9] scaled to their range
+    # output:
+    #     list of model outputs in dictionaries, one per parameter set
+    #     example:
+    #          models[0]['nse'] = 0.74
+    q = gr4j_cemaneige(parasets, *meteo, owpet=owpet, area=area, nstore=warmup-1)
+
+    models = [ {} for irun in range(len(parasets)) ]
+    if 'nse' in keys:
+        for irun,value in enumerate(nse(q, qobs)):
+            models[irun]['nse'] = value
+    if 'kge' in keys:
+        for irun,value in enumerate(kge(q, qobs)):
+            models[irun]['kge'] = value
+    if 'Q' in keys:
+        for irun in range(len(parasets)):
+            models[irun]['Q'] = q[irun]
+
+    # reduce time series to statistics (option --reduce); first stored day is 1991-01-01
+    return [ reduce_outputs(model, reductions, keep=keepseries, start=datetime.datetime(1991,1,1)) for model in models ]
+
+# parameter sets of this task (option --chunk) run in blocks of nblock
+parasets = np.array(runs.read())
+t0 = time.time()
+for iblock in range(0, len(parasets), nblock):
+    models = model_function(parasets[iblock:iblock+nblock])
+    for imodel,model in enumerate(models):
+        if np.any([ np.any(~np.isfinite(model[ikey])) for ikey in model ]):
+            # failed model run, e.g. parameters outside of valid range: outputs stay NaN (see lib/output_store.py)
+            runs.done(iblock+imodel, errors=['non-finite model output'])
+        else:
+            runs.done(iblock+imodel, model)
+walltime = time.time() - t0
+print("ran:     "+str(len(parasets))+" parameter sets in {:.2f} s ({:.1f} runs/s)".format(walltime, len(parasets)/max(walltime,1e-9)))
+
+runs.finish()
+
+# ---------------
+# parity check against Raven outputs of the same parameter sets (option --compare)
+# ---------------
+if not(compare is None):
+    raven  = load_model_output(compare, mmap=False)
+    native = load_model_output(outfile, mmap=False)
+    common = [ ikey for ikey in native if ikey in raven ]
+    if len(common) == 0:
+        raise ValueError("No common model output keys in '"+outfile+"' and '"+compare+"'")
+    failed = []
+    for ikey in common:
+        if np.shape(raven[ikey]) != np.shape(native[ikey]):
+            raise ValueError("Shapes of key '"+ikey+"' differ: "+str(np.shape(native[ikey]))+" (native) vs. "+str(np.shape(raven[ikey]))+" (Raven)")
+        diff  = np.abs(np.asarray(native[ikey], dtype=float) - np.asarray(raven[ikey], dtype=float))
+        scale = np.maximum(np.nanmax(np.abs(raven[ikey])), 1e-12)
+        print("parity:  {:s}  max abs diff {:.3e}  max rel diff {:.3e}".format(ikey, np.nanmax(diff), np.nanmax(diff)/scale))
+        if np.nanmax(diff)/scale > tolerance:
+            failed.append(ikey)
+    if len(failed) > 0:
+        raise ValueError("Native GR4J-CemaNeige differs from Raven by more than "+str(tolerance)+" for keys: "+', '.join(failed))
+    print("parity:  all keys within relative tolerance "+str(tolerance))
@@ -30,8 +30,8 @@ from __future__ import print_function
 #
 # An example calling sequence to derive model outputs for previously sampled parameter sets stored
 # in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs
-# are stored in a pickle file (option -o). The model outputs are stored as dictionaries. Multiple
-# model outputs are possible.
+# are stored as one array per output (option -o) in a pickle file (*.pkl), a NetCDF file (*.nc), or
+# a directory of .npy files (any other name). Multiple model outputs are possible.
 #
 # python 2_run_model_oakley-ohagan.py \
 #                       -i parameter_sets_1_scaled_para3_M.dat \
@@ -39,7 +39,7 @@ from __future__ import print_function
 #                       -o model_output.pkl
 
 """
-Runs a model for a bunch of parameter sets and stores model outputs in a pickle file.
+Runs a model for a bunch of parameter sets and stores model outputs in a model output store (lib/output_store.py).
 
 History
 -------
@@ -65,14 +65,15 @@ import argparse
 import numpy as np
 import scipy.stats as stats
 import copy
-import pickle
+
+from   driver          import add_run_options, ModelRuns                   # in lib/
 
 infile      = 'example_oakley-ohagan/parameter_sets_1_scaled_para15_M.dat'     # name of file containing sampled parameter sets to run the model
 outfile     = 'example_oakley-ohagan/model_output.pkl'                         # name of file used to save (scalar) model outputs
 skip        = None                                                             # number of lines to skip in input file
 
 parser   = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
-                                  description='''An example calling sequence to derive model outputs for previously sampled parameter sets stored in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs are stored in a pickle file (option -o). The model outputs are stored as dictionaries. Multiple model outputs are possible..''')
+                                  description='''An example calling sequence to derive model outputs for previously sampled parameter sets stored in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs are stored as one array per output (option -o). Multiple model outputs are possible..''')
 parser.add_argument('-i', '--infile', action='store',
                     default=infile, dest='infile', metavar='infile',
                     help="Name of file containing sampled SCALED parameter sets to run the model (default: 'parameter_sets.out').")
@@ -81,17 +82,22 @@ parser.add_argument('-s', '--skip', action='store',
                     help="Number of lines to skip in input file (default: None).")
 parser.add_argument('-o', '--outfile', action='store',
                     default=outfile, dest='outfile', metavar='outfile',
-                    help="Name of file used to save (scalar) model outputs in a pickle file (default: 'model_output.pkl').")
+                    help="Name of file used to save model outputs: pickle file (*.pkl), NetCDF file (*.nc) or directory of memory-mappable .npy files (any other name) (default: 'model_output.pkl').")
+add_run_options(parser)
 
 args     = parser.parse_args()
 infile   = args.infile
 outfile  = args.outfile
 skip     = args.skip
 
+# runs of all parameter sets: serially, by parallel processes or by job queue workers, with retries
+# of failed runs, model output store and online Elementary Effects (see lib/driver.py)
+runs = ModelRuns(args)
+
 del parser, args
 
 
-def model_function(paraset):
+def model_function(paraset, run_id=None):
     # function that takes parameter set and returns (scalar) model output
     # here: Oakley-O'Hagan function (Oakley & O'Hagan, [2004])
     out = {}
@@ -137,34 +143,4 @@ def model_function(paraset):
     
     return out
 
-# read parameter sets
-ff = open(infile, "r")
-parasets = ff.readlines()
-ff.close()
-
-if skip is None:
-    skip = np.int(parasets[0].strip().split(':')[1])
-else:
-    skip = np.int(skip)
-parasets = parasets[skip:]
-
-model_output = {}
-
-for iparaset,paraset in enumerate(parasets):
-    paraset = list(map(float,paraset.strip().split()))
-    model = model_function(paraset)
-
-    if iparaset == 0:
-        for ikey in model.keys():
-            model_output[ikey] = []
-
-
-    for ikey in model.keys():
-            
-        model_output[ikey].append(model[ikey])
-            
-
-pickle.dump( model_output, open( outfile, "wb" ) )
-
-print("wrote:   '"+outfile+"'")
-        
+runs.run(model_function)
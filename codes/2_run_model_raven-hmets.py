@@ -30,8 +30,8 @@ from __future__ import print_function
 #
 # An example calling sequence to derive model outputs for previously sampled parameter sets stored
 # in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs
-# are stored in a pickle file (option -o). The model outputs are stored as dictionaries. Multiple
-# model outputs are possible.
+# are stored as one array per output (option -o) in a pickle file (*.pkl), a NetCDF file (*.nc), or
+# a directory of .npy files (any other name). Multiple model outputs are possible.
 #
 # python 2_run_model_raven-hmets.py \
 #                       -i parameter_sets_1_scaled_para21_M.dat \
@@ -39,7 +39,7 @@ from __future__ import print_function
 #                       -o model_output.pkl
 
 """
-Runs a model for a bunch of parameter sets and stores model outputs in a pickle file.
+Runs a model for a bunch of parameter sets and stores model outputs in a model output store (lib/output_store.py).
 
 History
 -------
@@ -66,21 +66,31 @@ import argparse
 import numpy as np
 import scipy.stats as stats
 import copy
-import pickle
+import datetime
 from   pathlib2        import Path
-import subprocess
-import shutil
 
 from   raven_templates import RVI, RVT, RVP, RVH, RVC          # in examples/raven-hmets/model/
 from   raven_common    import writeString, makeDirectories     # in examples/raven-hmets/model/
-from   fread           import fread                            # in lib/
+from   raven_output    import read_raven_csv, read_raven_diagnostics   # in lib/
+from   template        import compile_template                 # in lib/
+from   model_process   import run_model                        # in lib/
+from   driver          import add_run_options, ModelRuns       # in lib/
+from   reduction       import parse_reductions, reduce_outputs # in lib/
+from   raven_screening import raven_outputs_needed, screening_templates   # in lib/
+from   raven_staging   import stage_raven_forcing                         # in lib/
+from   fidelity        import shorten_raven_window                        # in lib/
 
 infile      = 'example_raven-hmets/parameter_sets_1_scaled_para15_M.dat'     # name of file containing sampled parameter sets to run the model
 outfile     = 'example_raven-hmets/model_output.pkl'                         # name of file used to save (scalar) model outputs
 skip        = None                                                           # number of lines to skip in input file
+keys        = None                                                           # screening mode: compute only these model output keys (comma-separated); Raven writes only outputs needed for them
+stagedir    = None                                                           # folder of forcings trimmed to simulated period (None: staged_forcing next to outfile or in queue directory; 'none': off)
+reductions  = None                                                           # reduce time series of each run to these statistics, e.g. 'Q:mean,Q:q95' (see lib/reduction.py)
+keepseries  = False                                                          # keep reduced time series as well
+fidelity    = 1.                                                             # fraction of simulated period after warm-up (multi-fidelity screening; 1: full period)
 
 parser   = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
-                                  description='''An example calling sequence to derive model outputs for previously sampled parameter sets stored in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs are stored in a pickle file (option -o). The model outputs are stored as dictionaries. Multiple model outputs are possible..''')
+                                  description='''An example calling sequence to derive model outputs for previously sampled parameter sets stored in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs are stored as one array per output (option -o). Multiple model outputs are possible..''')
 parser.add_argument('-i', '--infile', action='store',
                     default=infile, dest='infile', metavar='infile',
                     help="Name of file containing sampled SCALED parameter sets to run the model (default: 'parameter_sets.out').")
@@ -89,15 +99,84 @@ parser.add_argument('-s', '--skip', action='store',
                     help="Number of lines to skip in input file (default: None).")
 parser.add_argument('-o', '--outfile', action='store',
                     default=outfile, dest='outfile', metavar='outfile',
-                    help="Name of file used to save (scalar) model outputs in a pickle file (default: 'model_output.pkl').")
+                    help="Name of file used to save model outputs: pickle file (*.pkl), NetCDF file (*.nc) or directory of memory-mappable .npy files (any other name) (default: 'model_output.pkl').")
+parser.add_argument('--keys', action='store',
+                    default=keys, dest='keys', metavar='key1,key2',
+                    help="Screening mode: compute only these model output keys, e.g. 'nse'. Raven input files are reduced such that only the outputs needed for these keys are written (see lib/raven_screening.py) (default: None, i.e. all keys: nse, Q, infiltration).")
+parser.add_argument('--stage-forcing', action='store',
+                    default=stagedir, dest='stagedir', metavar='stagedir',
+                    help="Folder in which forcing and observation files of data_obs are staged once per campaign, trimmed to the simulation period of the RVI; runs then read only the simulated period. 'none' uses the original files (default: 'staged_forcing' in directory of outfile, or in queue directory with -q/--worker).")
+parser.add_argument('--reduce', action='store',
+                    default=reductions, dest='reductions', metavar='key:stat,...',
+                    help="Reduce time series outputs of each run to statistics before they are returned and stored, e.g. 'Q:mean,Q:q05,Q:q95,Q:annual_max,Q:djf'. Statistic stat of key is stored as key stat_key, e.g. 'q95_Q'. Statistics: mean, median, std, min, max, sum, qNN (percentile), annual_mean, annual_sum, annual_max, djf, mam, jja, son, monNN (see lib/reduction.py) (default: None, i.e. full time series are stored).")
+parser.add_argument('--fidelity', action='store',
+                    default=fidelity, dest='fidelity', metavar='fidelity',
+                    help="Multi-fidelity screening: fidelity in (0,1] shortens the simulation period of the RVI (:EndDate) to this fraction of its length after the two-year warm-up, e.g. for intermediate EEE iterations; outputs such as time series of Q are then shorter. Full fidelity 1 is meant for the first iteration, which derives the cutoff, and the final iteration (default: 1, i.e. full period).")
+parser.add_argument('--keep-series', action='store_true',
+                    default=keepseries, dest='keepseries',
+                    help="Keep the full time series of reduced outputs in addition to their statistics (default: False).")
+add_run_options(parser, external=True)
 
 args     = parser.parse_args()
 infile   = args.infile
 outfile  = args.outfile
 skip     = args.skip
+keys     = args.keys
+stagedir    = args.stagedir
+reductions  = args.reductions
+keepseries  = args.keepseries
+fidelity    = float(args.fidelity)
+
+# runs of all parameter sets: serially, by parallel processes or by job queue workers, with retries
+# of failed runs, model output store and online Elementary Effects (see lib/driver.py)
+runs       = ModelRuns(args, external=True)
+timeout    = runs.timeout
+logdir     = runs.logdir
+telemetry  = runs.telemetry
+scratchdir = runs.scratchdir
+
+# Raven outputs (see lib/raven_screening.py) and output files each model output key is derived from
+raven_outputs = {'nse':          ['DIAG_NASH_SUTCLIFFE'],
+                 'Q':            ['Hydrographs'],
+                 'infiltration': ['CustomOutput']}
+raven_files   = {'nse':          'Diagnostics.csv',
+                 'Q':            'Hydrographs.csv',
+                 'infiltration': 'BETWEEN_PONDED_WATER_AND_SOIL[0]_Daily_Average_BySubbasin.csv'}
+
+# screening mode: Raven input files are reduced to write only the outputs needed for the requested keys
+if keys is None:
+    keys = list(raven_outputs.keys())
+else:
+    keys = keys.split(',')
+    RVI, RVT = screening_templates(RVI, RVT, raven_outputs_needed(keys, raven_outputs))
+
+# time series are reduced to statistics by each run before they are returned (see lib/reduction.py)
+if not(reductions is None):
+    reductions = parse_reductions(reductions)
+    for ikey in reductions:
+        if not(ikey in keys):
+            raise ValueError("Reduced key '"+ikey+"' is not a computed model output key: "+', '.join(keys))
+
+# multi-fidelity screening: simulated period after the two-year warm-up shortened (option --fidelity);
+# done before staging such that forcings are trimmed to the shortened period
+RVI = shorten_raven_window(RVI, fidelity, warmup=2*365)
+
+# forcings and observations trimmed to the simulated period once per campaign (see lib/raven_staging.py);
+# the staged folder is linked into the run folders instead of data_obs
+raven_obs_folder = os.path.abspath(dir_path+"/../"+"examples/raven-hmets/model/data_obs")
+if stagedir is None:
+    if not(runs.worker is None):
+        stagedir = os.path.join(os.path.abspath(runs.worker),"staged_forcing")
+    elif not(runs.queue is None):
+        stagedir = os.path.join(os.path.abspath(runs.queue),"staged_forcing")
+    else:
+        stagedir = os.path.join(os.path.dirname(os.path.abspath(outfile)),"staged_forcing")
+if stagedir != 'none':
+    raven_obs_folder = stage_raven_forcing(RVI, RVT, raven_obs_folder, stagedir)
 
 del parser, args
 
+@telemetry.timed
 def model_function(paras, run_id=None):
     # input:
     #     paras     ... list of model parameters scaled to their range;
@@ -147,7 +226,11 @@ def model_function(paras, run_id=None):
     else:
         raise ValueError("More than 999 parameters are not implemented yet!")
     vals_paras = paras
-    dict_paras = dict(zip(keys_paras,vals_paras))
+
+    # templates are compiled only once into text chunks and slots (see lib/template.py);
+    # rendering is then only a join over the values in the order of names
+    names  = [ 'par['+kk+']' for kk in keys_paras ] + [ 'dpar['+kk+']' for kk in dict_dparas ]
+    values = list(vals_paras) + list(dict_dparas.values())
 
     # fill in to templates
     # templates need to have patterns:
@@ -157,19 +240,19 @@ def model_function(paras, run_id=None):
     # ---------------
     # create a run folder
     # ---------------
-    tmp_folder = "/tmp/eee-analysis/"+str(run_id) # "/tmp/juletest" #  TODO a generic folder name in /tmp
+    # one Raven launch per parameter set: Raven's ensemble modes (:EnsembleMode ENSEMBLE_MONTECARLO,
+    # ENSEMBLE_DDS, ENSEMBLE_ENKF, ... in an .rve file) draw the parameters of their members themselves
+    # from :ParameterDistributions, calibrate them, or perturb forcings and states; none of them reads
+    # given parameter sets, and derived parameters and initial states (RVC) cannot be set per member
+    tmp_folder = scratchdir.run_folder(run_id)   # unique per analysis (see lib/scratch.py)
     raven_exe_name   = os.path.abspath(dir_path+"/../"+"examples/raven-hmets/model/Raven.exe")
-    raven_obs_folder = os.path.abspath(dir_path+"/../"+"examples/raven-hmets/model/data_obs")
-
-    if os.path.exists(tmp_folder):
-        shutil.rmtree(tmp_folder)
 
     # all RAVEN setup files
-    writeString( Path(tmp_folder,"raven_hmets.rvi"), RVI.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"raven_hmets.rvp"), RVP.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"raven_hmets.rvh"), RVH.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"raven_hmets.rvt"), RVT.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"raven_hmets.rvc"), RVC.format(par=dict_paras,dpar=dict_dparas) )
+    writeString( Path(tmp_folder,"raven_hmets.rvi"), compile_template(RVI,names).render(values) )
+    writeString( Path(tmp_folder,"raven_hmets.rvp"), compile_template(RVP,names).render(values) )
+    writeString( Path(tmp_folder,"raven_hmets.rvh"), compile_template(RVH,names).render(values) )
+    writeString( Path(tmp_folder,"raven_hmets.rvt"), compile_template(RVT,names).render(values) )
+    writeString( Path(tmp_folder,"raven_hmets.rvc"), compile_template(RVC,names).render(values) )
 
     # link executable
     if not(os.path.exists(str(Path(tmp_folder,os.path.basename(raven_exe_name))))):
@@ -185,22 +268,29 @@ def model_function(paras, run_id=None):
     out_folder = str(Path(tmp_folder,"output"))
     os.makedirs(out_folder)
 
+    telemetry.lap('model')
+
     # ---------------
     # run the model with these input rv* files
     # ---------------
     cmd = [str(Path(tmp_folder,os.path.basename(raven_exe_name))),str(Path(tmp_folder,"raven_hmets")),"-o",str(Path(tmp_folder,"output"))+'/']
     print("run cmd: ",' '.join(cmd))
 
-    process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    # model output is written directly to a log file per run; hung runs are killed after timeout
+    logfile = str(Path(logdir,str(run_id)+".log"))
+    status  = run_model(cmd, logfile, timeout=timeout)
+    telemetry.model_status(status)
+    telemetry.lap('parse')
+    print("Raven exit code: ",status['returncode'],"  (log file: "+logfile+")")
 
-    print("")
-    print("Raven standard output:")
-    for line in process.stdout:
-        print(">>> ",line.rstrip()) # rstrip removes trailing \n
+    if status['timeout']:
+        raise ValueError("ERROR: Raven run killed after timeout of "+str(timeout)+" s (see log file "+logfile+")")
 
-    if not(os.path.exists(str(Path(tmp_folder,"output","Diagnostics.csv")))):
+    # output files of requested keys; missing files mean that Raven failed
+    missing = sorted(set([ raven_files[ikey] for ikey in keys if not(os.path.exists(str(Path(tmp_folder,"output",raven_files[ikey])))) ]))
+    if len(missing) > 0:
         print("")
-        print("ERROR: No Diagnostics.csv produced")
+        print("ERROR: No "+', '.join(missing)+" produced")
         print("")
         print("Raven error file content:")
         ff = open(str(Path(tmp_folder,"output","Raven_errors.txt")), "r")
@@ -209,88 +299,64 @@ def model_function(paras, run_id=None):
         for line in lines:
             print(">>> ",line.rstrip()) # rstrip removes trailing \n
 
-        raise ValueError("ERROR: No Diagnostics.csv produced (scroll up to see content of error file)")
+        raise ValueError("ERROR: No "+', '.join(missing)+" produced (scroll up to see content of error file)")
 
     model = {}
 
     # ---------------
     # extract model output: Diagnostics: NSE
     # ---------------
-    model['nse'] = 0.0
-    ff = open(str(Path(tmp_folder,"output","Diagnostics.csv")), "r")
-    lines = ff.readlines()
-    ff.close()
+    if 'nse' in keys:
+        model['nse'] = 0.0
+        diag = read_raven_diagnostics(str(Path(tmp_folder,"output","Diagnostics.csv")))
 
-    nse = np.float(lines[-1].strip().split(',')[2])
-    print("NSE:            ",nse)
-    model['nse'] = nse
-    print("")
+        nse = diag['DIAG_NASH_SUTCLIFFE'][-1]
+        print("NSE:            ",nse)
+        model['nse'] = nse
+        print("")
 
     # ---------------
     # extract model output: Hydrographs: simulated Q
     # ---------------
-    model['Q']  = 0.0
-    warmup = 2*365  # 1 # model timestep 1 day and want to skip 2 years  # first day 1991-01-01 00:00:00.00 (checked)
-    model['Q']  = np.transpose(fread(str(Path(tmp_folder,"output","Hydrographs.csv")),skip=warmup+1,cskip=4,nc=1))[0]
-
-    print("Q:              ",model['Q'][0:4],"...",model['Q'][-4:])
-    print("Q_range:         [",np.min(model['Q']),",",np.max(model['Q']),"]")
-    print("shape Q:        ",np.shape(model['Q']))
-    print("")
+    if 'Q' in keys:
+        model['Q']  = 0.0
+        warmup = 2*365  # 1 # model timestep 1 day and want to skip 2 years  # first day 1991-01-01 00:00:00.00 (checked)
+        model['Q']  = read_raven_csv(str(Path(tmp_folder,"output","Hydrographs.csv")),'hmets [m3/s]',skip=warmup)
+
+        print("Q:              ",model['Q'][0:4],"...",model['Q'][-4:])
+        print("Q_range:         [",np.min(model['Q']),",",np.max(model['Q']),"]")
+        print("shape Q:        ",np.shape(model['Q']))
+        print("")
 
     # ---------------
     # extract model output: BETWEEN_PONDED_WATER_AND_SOIL[0]_Daily_Average_BySubbasin.csv: accumulated infiltration volume
     # ---------------
-    model['infiltration']  = 0.0
-    warmup = 2*365  # 1 # model timestep 1 day and want to skip 2 years  # first day 1990-12-31 00:00:00.00 (checked) But all timesteps are shifted by 1 day...
-    #
-    # de-accumulated infiltration volume
-    model['infiltration'] = np.transpose(fread(str(Path(tmp_folder,"output","BETWEEN_PONDED_WATER_AND_SOIL[0]_Daily_Average_BySubbasin.csv")),skip=warmup,cskip=2,nc=1))[0]
-    model['infiltration'] = np.diff(model['infiltration'])
+    if 'infiltration' in keys:
+        model['infiltration']  = 0.0
+        warmup = 2*365  # 1 # model timestep 1 day and want to skip 2 years  # first day 1990-12-31 00:00:00.00 (checked) But all timesteps are shifted by 1 day...
+        #
+        # de-accumulated infiltration volume
+        # custom outputs by basin: first subbasin is column 2 after time and date columns
+        model['infiltration'] = read_raven_csv(str(Path(tmp_folder,"output","BETWEEN_PONDED_WATER_AND_SOIL[0]_Daily_Average_BySubbasin.csv")),2,skip=warmup-1)
+        model['infiltration'] = np.diff(model['infiltration'])
+
+        print("Infiltration I: ",model['infiltration'][0:4],"...",model['infiltration'][-4:])
+        print("I_range:         [",np.min(model['infiltration']),",",np.max(model['infiltration']),"]")
+        print("shape I:        ",np.shape(model['infiltration']))
+        print("")
 
-    print("Infiltration I: ",model['infiltration'][0:4],"...",model['infiltration'][-4:])
-    print("I_range:         [",np.min(model['infiltration']),",",np.max(model['infiltration']),"]")
-    print("shape I:        ",np.shape(model['infiltration']))
-    print("")
+    telemetry.lap('cleanup')
 
     # ---------------
     # cleanup
     # ---------------
-    if os.path.exists(tmp_folder):
-        shutil.rmtree(tmp_folder)
-
-    return model
-
-# read parameter sets
-ff = open(infile, "r")
-parasets = ff.readlines()
-ff.close()
-
-if skip is None:
-    skip = np.int(parasets[0].strip().split(':')[1])
-else:
-    skip = np.int(skip)
-parasets = parasets[skip:]
-
-model_output = {}
-
-# this loop could be easily parallized and modified such that it
-# actually submits multiple tasks to a HPC
-for iparaset,paraset in enumerate(parasets):
-
-    paraset = list(map(float,paraset.strip().split()))
-    model = model_function(paraset,run_id='run_set_'+str(iparaset))
-
-    if iparaset == 0:
-        for ikey in model.keys():
-            model_output[ikey] = []
-
-
-    for ikey in model.keys():
-
-        model_output[ikey].append(model[ikey])
+    scratchdir.release(run_id)
 
+    # ---------------
+    # reduce time series to statistics (option --reduce); first stored day is 1991-01-01
+    # ---------------
+    model = reduce_outputs(model, reductions, keep=keepseries, start=datetime.datetime(1991,1,1))
 
-pickle.dump( model_output, open( outfile, "wb" ) )
+    return model
 
-print("wrote:   '"+outfile+"'")
+runs.run(model_function)
@@ -31,8 +31,8 @@ from __future__ import print_function
 #
 # An example calling sequence to derive model outputs for previously sampled parameter sets stored
 # in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs
-# are stored in a pickle file (option -o). The model outputs are stored as dictionaries. Multiple
-# model outputs are possible.
+# are stored as one array per output (option -o) in a pickle file (*.pkl), a NetCDF file (*.nc), or
+# a directory of .npy files (any other name). Multiple model outputs are possible.
 #
 # python 2_run_model_raven-hmets.py \
 #                       -i parameter_sets_1_scaled_para21_M.dat \
@@ -40,7 +40,7 @@ from __future__ import print_function
 #                       -o model_output.pkl
 
 """
-Runs a model for a bunch of parameter sets and stores model outputs in a pickle file.
+Runs a model for a bunch of parameter sets and stores model outputs in a model output store (lib/output_store.py).
 
 History
 -------
@@ -67,22 +67,22 @@ import argparse
 import numpy as np
 import scipy.stats as stats
 import copy
-import pickle
 from   pathlib2        import Path
-import subprocess
-import shutil
 
 from   raven_model_files import RVI, RVT, RVP, RVP_CHANNEL, RVH, RVH_LAKE, RVC        # in examples/model/robin; adapted from examples/raven-hmets/model
 from   robin_model_files import PAR, HRUCROP, INFO, INIC, MODEL, MGT, OBS             # in examples/model/robin; adapted from examples/raven-hmets/model/
 from   raven_common      import writeString, makeDirectories                          # for modifying model input files; copied from examples/raven-hmets/model/
 from   fread             import fread                                                 # in lib/
+from   template          import compile_template                                      # in lib/
+from   model_process     import run_model                                             # in lib/
+from   driver            import add_run_options, ModelRuns                            # in lib/
 
 infile      = 'examples/robin/parameter_sets_1_scaled_para15_M.dat'                   # name of file containing sampled parameter sets to run the model
 outfile     = 'examples/robin/model_output.pkl'                                       # name of file used to save (scalar) model outputs
 skip        = None                                                                    # number of lines to skip in input file
 
 parser   = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
-                                  description='''An example calling sequence to derive model outputs for previously sampled parameter sets stored in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs are stored in a pickle file (option -o). The model outputs are stored as dictionaries. Multiple model outputs are possible..''')
+                                  description='''An example calling sequence to derive model outputs for previously sampled parameter sets stored in an ASCII file (option -i) where some lines might be skipped (option -s). The final model outputs are stored as one array per output (option -o). Multiple model outputs are possible..''')
 parser.add_argument('-i', '--infile', action='store',
                     default=infile, dest='infile', metavar='infile',
                     help="Name of file containing sampled SCALED parameter sets to run the model (default: 'parameter_sets.out').")
@@ -91,15 +91,25 @@ parser.add_argument('-s', '--skip', action='store',
                     help="Number of lines to skip in input file (default: None).")
 parser.add_argument('-o', '--outfile', action='store',
                     default=outfile, dest='outfile', metavar='outfile',
-                    help="Name of file used to save (scalar) model outputs in a pickle file (default: 'model_output.pkl').")
+                    help="Name of file used to save model outputs: pickle file (*.pkl), NetCDF file (*.nc) or directory of memory-mappable .npy files (any other name) (default: 'model_output.pkl').")
+add_run_options(parser, external=True)
 
 args     = parser.parse_args()
 infile   = args.infile
 outfile  = args.outfile
 skip     = args.skip
 
+# runs of all parameter sets: serially, by parallel processes or by job queue workers, with retries
+# of failed runs, model output store and online Elementary Effects (see lib/driver.py)
+runs       = ModelRuns(args, external=True)
+timeout    = runs.timeout
+logdir     = runs.logdir
+telemetry  = runs.telemetry
+scratchdir = runs.scratchdir
+
 del parser, args
 
+@telemetry.timed
 def model_function(paras, run_id=None):
     # input:
     #     paras     ... list of model parameters scaled to their range;
@@ -147,7 +157,11 @@ def model_function(paras, run_id=None):
     else:
         raise ValueError("More than 999 parameters are not implemented yet!")
     vals_paras = paras
-    dict_paras = dict(zip(keys_paras,vals_paras))
+
+    # templates are compiled only once into text chunks and slots (see lib/template.py);
+    # rendering is then only a join over the values in the order of names
+    names  = [ 'par['+kk+']' for kk in keys_paras ] + [ 'dpar['+kk+']' for kk in dict_dparas ]
+    values = list(vals_paras) + list(dict_dparas.values())
 
     # fill in to templates
     # templates need to have patterns:
@@ -157,35 +171,32 @@ def model_function(paras, run_id=None):
     # ---------------
     # create a run folder
     # ---------------
-    tmp_folder = os.path.abspath(dir_path+"/../tmp/eee-analysis/Turkey_Lakes/"+str(run_id)) # "/tmp/juletest" #  TODO a generic folder name in /tmp
+    tmp_folder = scratchdir.run_folder(run_id)   # unique per analysis (see lib/scratch.py)
     robin_exe_name   = os.path.abspath(dir_path+"/../examples/robin/model/raven_robin")
     raven_obs_folder = os.path.abspath(dir_path+"/../examples/robin/model/obs")
     raven_forcing_folder = os.path.abspath(dir_path+"/../examples/robin/model/Forcing")
     robin_obs_folder = os.path.abspath(dir_path+"/../examples/robin/model/cropmodel/obs")
     print(robin_obs_folder)
  
-    if os.path.exists(tmp_folder):
-        shutil.rmtree(tmp_folder)
-
     # all RAVEN setup files (ASCII files can only be read once at a time, creating local copies speeds up run time)
-    writeString( Path(tmp_folder,"Turkey_Lake.rvi"), RVI.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"Turkey_Lake.rvp"), RVP.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"Turkey_Lake.rvh"), RVH.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"Turkey_Lake.rvt"), RVT.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"Turkey_Lake.rvc"), RVC.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"Turkey_Lake_Lake.rvh"), RVH_LAKE.format(par=dict_paras,dpar=dict_dparas) )   
-    writeString( Path(tmp_folder,"Turkey_Lake_channel.rvp"), RVP_CHANNEL.format(par=dict_paras,dpar=dict_dparas) )   
+    writeString( Path(tmp_folder,"Turkey_Lake.rvi"), compile_template(RVI,names).render(values) )
+    writeString( Path(tmp_folder,"Turkey_Lake.rvp"), compile_template(RVP,names).render(values) )
+    writeString( Path(tmp_folder,"Turkey_Lake.rvh"), compile_template(RVH,names).render(values) )
+    writeString( Path(tmp_folder,"Turkey_Lake.rvt"), compile_template(RVT,names).render(values) )
+    writeString( Path(tmp_folder,"Turkey_Lake.rvc"), compile_template(RVC,names).render(values) )
+    writeString( Path(tmp_folder,"Turkey_Lake_Lake.rvh"), compile_template(RVH_LAKE,names).render(values) )   
+    writeString( Path(tmp_folder,"Turkey_Lake_channel.rvp"), compile_template(RVP_CHANNEL,names).render(values) )   
 
     # all ROBIN setup files (ASCII files can only be read once at a time, creating local copies speeds up run time)
-    writeString( Path(tmp_folder,"cropmodel/crop.hrucrop"), HRUCROP.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"cropmodel/crop.info"), INFO.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"cropmodel/crop.inic"), INIC.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"cropmodel/crop.mgt"), MGT.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"cropmodel/crop.obs"), OBS.format(par=dict_paras,dpar=dict_dparas) )
-    writeString( Path(tmp_folder,"cropmodel/crop.model"), MODEL.format(par=dict_paras,dpar=dict_dparas) )
+    writeString( Path(tmp_folder,"cropmodel/crop.hrucrop"), compile_template(HRUCROP,names).render(values) )
+    writeString( Path(tmp_folder,"cropmodel/crop.info"), compile_template(INFO,names).render(values) )
+    writeString( Path(tmp_folder,"cropmodel/crop.inic"), compile_template(INIC,names).render(values) )
+    writeString( Path(tmp_folder,"cropmodel/crop.mgt"), compile_template(MGT,names).render(values) )
+    writeString( Path(tmp_folder,"cropmodel/crop.obs"), compile_template(OBS,names).render(values) )
+    writeString( Path(tmp_folder,"cropmodel/crop.model"), compile_template(MODEL,names).render(values) )
    
    # write sampled Robin parameter set to crop.par file for use
-    writeString( Path(tmp_folder,"cropmodel/crop.par"), PAR.format(par=dict_paras,dpar=dict_dparas) )
+    writeString( Path(tmp_folder,"cropmodel/crop.par"), compile_template(PAR,names).render(values) )
 
     # link executable
     if not(os.path.exists(str(Path(tmp_folder,os.path.basename(robin_exe_name))))):
@@ -211,6 +222,8 @@ def model_function(paras, run_id=None):
     out_folder = str(Path(tmp_folder,"output"))
     os.makedirs(out_folder)
     
+    telemetry.lap('model')
+
     # ---------------
     # run the model with these input rv* files
     # ---------------        
@@ -224,13 +237,15 @@ def model_function(paras, run_id=None):
     # Robin literally searches for all the input files based on the current working directory ("./cropmodel/")
     #process_up = subprocess.call(cmd_up, shell=True)
     #print(os.getcwd())
-    process = subprocess.Popen(cmd, cwd = tmp_folder, stdout=subprocess.PIPE)
-    #process_down = subprocess.call(cmd_down, shell=True)
+    # model output is written directly to a log file per run; hung runs are killed after timeout
+    logfile = str(Path(logdir,str(run_id)+".log"))
+    status  = run_model(cmd, logfile, cwd=tmp_folder, timeout=timeout)
+    telemetry.model_status(status)
+    telemetry.lap('parse')
+    print("Raven exit code: ",status['returncode'],"  (log file: "+logfile+")")
 
-    print("")
-    print("Raven standard output:")
-    for line in process.stdout:
-        print(">>> ",line.rstrip()) # rstrip removes trailing \n
+    if status['timeout']:
+        raise ValueError("ERROR: Raven run killed after timeout of "+str(timeout)+" s (see log file "+logfile+")")
 
     if not(os.path.exists(str(Path(tmp_folder,"output","Diagnostics.csv")))):            
         print("")
@@ -325,44 +340,13 @@ def model_function(paras, run_id=None):
     #print("shape I:        ",np.shape(model['infiltration']))
     #print("")
 
+    telemetry.lap('cleanup')
+
     # ---------------
     # cleanup
     # ---------------
-    if os.path.exists(tmp_folder):
-        shutil.rmtree(tmp_folder)
+    scratchdir.release(run_id)
 
     return model
 
-# read parameter sets
-ff = open(infile, "r")
-parasets = ff.readlines()
-ff.close()
-
-if skip is None:
-    skip = np.int(parasets[0].strip().split(':')[1])
-else:
-    skip = np.int(skip)
-parasets = parasets[skip:]
-
-model_output = {}
-
-# this loop could be easily parallized and modified such that it
-# actually submits multiple tasks to a HPC
-for iparaset,paraset in enumerate(parasets):
-    
-    paraset = list(map(float,paraset.strip().split()))
-    model = model_function(paraset,run_id='run_set_'+str(iparaset))
-
-    if iparaset == 0:
-        for ikey in model.keys():
-            model_output[ikey] = []
-
-
-    for ikey in model.keys():
-            
-        model_output[ikey].append(model[ikey])
-            
-
-pickle.dump( model_output, open( outfile, "wb" ) )
-
-print("wrote:   '"+outfile+"'")
+runs.run(model_function)
@@ -38,10 +38,12 @@ from __future__ import print_function
 #                       -o example_ishigami-homma/eee_results.dat
 
 """
-Derives the Elementary Effects based on model outputs stored as dictionary in a pickle file (option -i)
+Derives the Elementary Effects based on model outputs stored in a model output store (option -i)
 using specified model parameters (option -d). The model parameters were sampled beforehand as Morris
 trajectories. The Morris trajectory information is stored in two files (option -m and option -v). The
-Elementary Effects are stored in a file (option -o).
+Elementary Effects are stored in a file (option -o). Optionally, Elementary Effects of time series outputs
+are derived for every time step, month of the year or season and written to NetCDF (options -r and -a).
+Bootstrap confidence intervals of mu*, mu and sigma are derived by resampling trajectories (option -n).
 
 History
 -------
@@ -60,17 +62,25 @@ morris_M       = 'example_ishigami-homma/parameter_sets_1_para3_M.dat'
 morris_v       = 'example_ishigami-homma/parameter_sets_1_para3_v.dat'
 outfile        = 'example_ishigami-homma/eee_results.dat'
 skip           = None                                                              # number of lines to skip in Morris files
+timechunk      = None                                                              # number of time steps of time series outputs read at once
+timeresolved   = None                                                              # NetCDF file of time-resolved EEs of time series outputs
+aggregate      = 'day'                                                             # time steps of time-resolved EEs: day, month or season
+start          = '1991-01-01'                                                      # date of first time step of time series outputs
+nboot          = 0                                                                 # number of bootstrap resamples of trajectories (0: none)
+confidence     = 0.95                                                              # confidence level of bootstrap intervals
+seed           = None                                                              # seed of bootstrap resampling
+processes      = 1                                                                 # number of processes for bootstrap
 
 import optparse
 parser = optparse.OptionParser(usage='%prog [options]',
-                               description="Derives the Elementary Effects based on model outputs stored as dictionary in a pickle file (option -i) using specified model parameters (option -d). The model parameters were sampled beforehand as Morris trajectories. The Morris trajectory information is stored in two files (option -m and option -v). The Elementary Effects are stored in a file (option -o).")
+                               description="Derives the Elementary Effects based on model outputs stored in a model output store (option -i) using specified model parameters (option -d). The model parameters were sampled beforehand as Morris trajectories. The Morris trajectory information is stored in two files (option -m and option -v). The Elementary Effects are stored in a file (option -o).")
 
 parser.add_option('-i', '--modeloutputs', action='store',
                     default=modeloutputs, dest='modeloutputs', metavar='modeloutputs',
-                    help="Name of file used to save (scalar) model outputs in a pickle file (default: 'model_output.pkl').")
+                    help="Name of model output store: pickle file (*.pkl), NetCDF file (*.nc) or directory of .npy files written by 2_run_model_*.py (default: 'model_output.pkl').")
 parser.add_option('-k', '--modeloutputkey', action='store',
                     default=modeloutputkey, dest='modeloutputkey', metavar='modeloutputkey',
-                    help="Key of model output dictionary stored in pickle output file. If 'All', all model outputs are taken into account and multi-objective EEE is applied. (default: 'All').")
+                    help="Key of model output stored in model output store. If 'All', all model outputs are taken into account and multi-objective EEE is applied. (default: 'All').")
 parser.add_option('-d', '--maskfile', action='store', dest='maskfile', type='string',
                   default=maskfile, metavar='File',
                   help='Name of file where all model parameters are specified including their distribution, distribution parameters, default value and if included in analysis or not. (default: maskfile=parameters.dat).')
@@ -83,6 +93,30 @@ parser.add_option('-v', '--morris_v', action='store', dest='morris_v', type='str
 parser.add_option('-s', '--skip', action='store',
                     default=skip, dest='skip', metavar='skip',
                     help="Number of lines to skip in Morris output files (default: None).")
+parser.add_option('-t', '--timechunk', action='store',
+                    default=timechunk, dest='timechunk', metavar='timechunk',
+                    help="Number of time steps of time series model outputs read at once. Bounds memory for outputs larger than RAM which are streamed from NetCDF or .npy directory stores; results do not depend on it (default: None, i.e. all time steps).")
+parser.add_option('-r', '--timeresolved', action='store', dest='timeresolved', type='string',
+                  default=timeresolved, metavar='File',
+                  help='NetCDF file of time-resolved Elementary Effects (parameter x time) of all time series model outputs. Not written if not given (default: None).')
+parser.add_option('-a', '--aggregate', action='store', dest='aggregate', type='choice',
+                  choices=['day', 'month', 'season'], default=aggregate, metavar='aggregate',
+                  help="Time-resolved Elementary Effects for every daily time step (day), for every month of the year (month) or for the seasons DJF, MAM, JJA, SON (season) (default: 'day').")
+parser.add_option('--start', action='store', dest='start', type='string',
+                  default=start, metavar='YYYY-MM-DD',
+                  help="Date of first stored daily time step of time series model outputs, i.e. after warm-up. Used for time-resolved Elementary Effects (default: '1991-01-01').")
+parser.add_option('-n', '--nboot', action='store', dest='nboot', type='int',
+                  default=nboot, metavar='nboot',
+                  help="Number of bootstrap resamples of trajectories. If larger than 0, confidence intervals of mu*, mu and sigma are written to <outfile>_bootstrap.dat (default: 0).")
+parser.add_option('-c', '--confidence', action='store', dest='confidence', type='float',
+                  default=confidence, metavar='confidence',
+                  help="Confidence level of bootstrap percentile intervals (default: 0.95).")
+parser.add_option('--seed', action='store', dest='seed', type='int',
+                  default=seed, metavar='seed',
+                  help="Seed of random number generator of bootstrap (default: None).")
+parser.add_option('-p', '--processes', action='store', dest='processes', type='int',
+                  default=processes, metavar='processes',
+                  help="Number of processes deriving bootstrap intervals; the changes of model outputs of blocks of trajectory steps are split across them, also for a single model output (default: 1).")
 parser.add_option('-o', '--outfile', action='store', dest='outfile', type='string',
                   default=outfile, metavar='File',
                   help='File containing Elementary Effect estimates of all model parameters listed in parameter information file. (default: eee_results.dat).')
@@ -95,6 +129,14 @@ morris_M       = opts.morris_M
 morris_v       = opts.morris_v
 outfile        = opts.outfile
 skip           = opts.skip
+timechunk      = opts.timechunk
+timeresolved   = opts.timeresolved
+aggregate      = opts.aggregate
+start          = opts.start
+nboot          = opts.nboot
+confidence     = opts.confidence
+seed           = opts.seed
+processes      = opts.processes
 
 del parser, opts, args
 
@@ -107,10 +149,13 @@ import os
 dir_path = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(dir_path+'/lib')
 
+import datetime
 import numpy       as np
-import pickle
+from output_store    import load_model_output, output_keys    # in lib/
 from fsread          import fsread              # in lib/
 from autostring      import astr                # in lib/
+from eee_effects     import mean_elementary_effects, time_resolved_elementary_effects, aggregate_elementary_effects   # in lib/
+from eee_effects     import bootstrap_elementary_effects   # in lib/
 
 
 # -------------------------
@@ -143,14 +188,15 @@ para_name_mask   = para_name[np.where(mask_para)]
 # -------------------------
 # read model outputs
 # -------------------------
-model_output = pickle.load( open( modeloutputs, "rb" ) )
-
 if modeloutputkey == 'All':
-    keys = list(model_output.keys())
+    keys = output_keys(modeloutputs)
 else:
     keys = [ modeloutputkey ]
 
-model_output = [ np.array(model_output[ikey]) for ikey in keys ]
+# only requested keys are read; directory stores are memory-mapped and
+# NetCDF variables are read only block by block if timechunk is given (see lib/output_store.py)
+model_output = load_model_output(modeloutputs, keys=keys, lazy=not(timechunk is None))
+model_output = [ model_output[ikey] for ikey in keys ]
 nkeys = len(model_output)
 
 
@@ -187,30 +233,19 @@ parachanged = np.array(parachanged)
 # -------------------------
 # calculate Elementary Effects
 # -------------------------
-ee         = np.zeros([dims_all,nkeys],dtype=float)
-ee_counter = np.zeros([dims_all,nkeys],dtype=int)
 ntraj      = int( np.shape(parasets)[0] / (dims+1) )
 nsets      = np.shape(parasets)[0]
 
-for ikey in range(nkeys):
-    for iset in range(nsets):
-
-        ipara_changed = parachanged[iset]
-        if ipara_changed != -1:
-            ee_counter[ipara_changed,ikey] += 1
-            if ( len(np.shape(model_output[ikey])) == 1):
-                # scalar model output
-                ee[ipara_changed,ikey] += np.abs(model_output[ikey][iset]-model_output[ikey][iset+1]) / np.abs(parasets[iset,ipara_changed] - parasets[iset+1,ipara_changed])
-            elif ( len(np.shape(model_output[ikey])) == 2):
-                # 1D model output
-                ee[ipara_changed,ikey] += np.mean(np.abs(model_output[ikey][iset,:]-model_output[ikey][iset+1,:]) / np.abs(parasets[iset,ipara_changed] - parasets[iset+1,ipara_changed]))
-            else:
-                raise ValueError('Only scalar and 1D model outputs are supported!')
+# effects of all steps and all model outputs are derived as array operations (see lib/eee_effects.py);
+# steps involving failed model runs (NaN outputs) are ignored;
+# the counter then holds the number of valid steps per parameter
+if not(timechunk is None):
+    timechunk = int(timechunk)
+ee, ee_counter, nskipped = mean_elementary_effects(model_output, parasets, parachanged, dims_all, ntchunk=timechunk)
 
 for ikey in range(nkeys):
-    for ipara in range(dims_all):
-        if ee_counter[ipara,ikey] > 0:
-            ee[ipara,ikey] /= ee_counter[ipara,ikey]
+    if nskipped[ikey] > 0:
+        print("model output '"+keys[ikey]+"': ignored "+str(nskipped[ikey])+" steps with failed model runs (NaN)")
 
 # -------------------------
 # write final file
@@ -230,3 +265,94 @@ for ipara in range(dims_all):
     f.write(str(ipara)+'   '+para_name[ipara]+'   '+' '.join(astr(ee[ipara,:],prec=8))+'   '+' '.join(astr(ee_counter[ipara,:]))+'\n')
 f.close()
 print("wrote:   '"+outfile+"'")
+
+
+# -------------------------
+# bootstrap confidence intervals
+# -------------------------
+#     format:
+#     # model output #1: 'out1'
+#     # 1000 bootstrap resamples of 5 trajectories, 95% percentile intervals
+#     # ii  para_name  mustar(ii,jj) mustar_lower(ii,jj) mustar_upper(ii,jj)  mu(...) mu_lower(...) mu_upper(...)  sigma(...) sigma_lower(...) sigma_upper(...), jj=1:1
+#       0   x_1   0.53458196  0.31281947  0.74190538   ...
+if nboot > 0:
+    measures = bootstrap_elementary_effects(model_output, parasets, parachanged, dims_all, nboot=nboot, confidence=confidence,
+                                            seed=seed, njobs=processes, ntchunk=timechunk)
+    bootfile = os.path.splitext(outfile)[0]+'_bootstrap'+os.path.splitext(outfile)[1]
+    f = open(bootfile, 'w')
+    for ikey in range(nkeys):
+        f.write('# model output #'+str(ikey+1)+': '+keys[ikey]+'\n')
+    f.write('# '+str(nboot)+' bootstrap resamples of '+str(ntraj)+' trajectories, '+astr(100.*confidence)+'% percentile intervals\n')
+    head = []
+    for stat in ['mustar', 'mu', 'sigma']:
+        head.append(' '.join([ stat+bound+'(ii,jj)' for bound in ['', '_lower', '_upper'] ]))
+    f.write('# ii     para_name    '+'   '.join(head)+', ii=1:'+str(dims_all)+',jj=1:'+str(nkeys)+' \n')
+    for ipara in range(dims_all):
+        f.write(str(ipara)+'   '+para_name[ipara]+'   '+'   '.join([ ' '.join(astr(measures[istat,ibound,ipara,:],prec=8))
+                                                                   for istat in range(3) for ibound in range(3) ])+'\n')
+    f.close()
+    print("wrote:   '"+bootfile+"'")
+
+
+# -------------------------
+# time-resolved Elementary Effects
+# -------------------------
+# effects of time series outputs for every time step (or month of year or season)
+# are written to NetCDF: variables <key> and <key>_counter [para, time]
+if not(timeresolved is None):
+    tkeys = [ ikey for ikey in range(nkeys) if len(np.shape(model_output[ikey])) == 2 ]
+    if len(tkeys) == 0:
+        raise ValueError('Time-resolved Elementary Effects need time series model outputs but all selected outputs are scalar!')
+
+    import netCDF4 as nc
+    startdate = datetime.datetime.strptime(start, '%Y-%m-%d')
+    ncout = nc.Dataset(timeresolved, 'w')
+    ncout.setncattr('keys', ' '.join([ keys[ikey] for ikey in tkeys ]))
+    ncout.setncattr('aggregate', aggregate)
+    ncout.createDimension('para', dims_all)
+    ncvar = ncout.createVariable('para_name', str, ('para',))
+    for ipara in range(dims_all):
+        ncvar[ipara] = para_name[ipara]
+
+    ntime = -1
+    for ikey in tkeys:
+        ee_t, counter_t = time_resolved_elementary_effects(model_output[ikey], parasets, parachanged, dims_all, ntchunk=timechunk)
+        if ntime == -1:
+            ntime  = np.shape(ee_t)[1]
+            months = np.array([ (startdate + datetime.timedelta(days=ii)).month for ii in range(ntime) ])
+            if aggregate == 'day':
+                ncout.createDimension('time', ntime)
+                ncvar = ncout.createVariable('time', 'i4', ('time',))
+                ncvar.setncattr('units', 'days since '+startdate.strftime('%Y-%m-%d %H:%M:%S'))
+                ncvar[:] = np.arange(ntime)
+            elif aggregate == 'month':
+                ncout.createDimension('time', 12)
+                ncvar = ncout.createVariable('time', 'i4', ('time',))
+                ncvar.setncattr('long_name', 'month of year')
+                ncvar[:] = np.arange(1, 13)
+            else:
+                ncout.createDimension('time', 4)
+                ncvar = ncout.createVariable('time', 'i4', ('time',))
+                ncvar.setncattr('long_name', 'season: 1=djf, 2=mam, 3=jja, 4=son')
+                ncvar[:] = np.arange(1, 5)
+        if np.shape(ee_t)[1] != ntime:
+            raise ValueError("Time series model output '"+keys[ikey]+"' has "+str(np.shape(ee_t)[1])+" time steps but previous outputs "+str(ntime))
+        if aggregate == 'month':
+            labels, ee_t, counter_t = aggregate_elementary_effects(ee_t, counter_t, months)
+        elif aggregate == 'season':
+            labels, ee_t, counter_t = aggregate_elementary_effects(ee_t, counter_t, (months % 12) // 3 + 1)
+        if aggregate != 'day' and len(labels) < ncout.dimensions['time'].size:
+            # months (seasons) not covered by the time series have no effects
+            ee_all      = np.full((dims_all, ncout.dimensions['time'].size), np.nan)
+            counter_all = np.zeros((dims_all, ncout.dimensions['time'].size), dtype=int)
+            ee_all[:, labels-1]      = ee_t
+            counter_all[:, labels-1] = counter_t
+            ee_t, counter_t = ee_all, counter_all
+        ncvar = ncout.createVariable(keys[ikey].replace('/', '_'), 'f8', ('para', 'time'))
+        ncvar.setncattr('long_name', "mean absolute Elementary Effects of model output '"+keys[ikey]+"'")
+        ncvar[:] = ee_t
+        ncvar = ncout.createVariable(keys[ikey].replace('/', '_')+'_counter', 'i4', ('para', 'time'))
+        ncvar.setncattr('long_name', "number of valid trajectory steps of model output '"+keys[ikey]+"'")
+        ncvar[:] = counter_t
+    ncout.close()
+    print("wrote:   '"+timeresolved+"'")
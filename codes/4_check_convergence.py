@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+from __future__ import print_function
+
+# Copyright 2019 Juliane Mai - juliane.mai(at)uwaterloo.ca
+#
+# License
+# This file is part of the EEE code library for "Computationally inexpensive identification
+# of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+#
+# The EEE code library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The MVA code library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with The EEE code library.
+# If not, see <https://github.com/julemai/EEE/blob/master/LICENSE>.
+#
+# If you use this method in a publication please cite:
+#
+#    M Cuntz & J Mai et al. (2015).
+#    Computationally inexpensive identification of noninformative model parameters by sequential screening.
+#    Water Resources Research, 51, 6417-6441.
+#    https://doi.org/10.1002/2015WR016907.
+#
+#
+#
+# python 4_check_convergence.py \
+#                       -i example_ishigami-homma/model_output.pkl \
+#                       -d example_ishigami-homma/parameters.dat \
+#                       -m example_ishigami-homma/parameter_sets_1_para3_M.dat \
+#                       -v example_ishigami-homma/parameter_sets_1_para3_v.dat  \
+#                       -c 0.5 -t 0.05 \
+#                       -o example_ishigami-homma/convergence.dat
+
+"""
+Checks if the screening of the parameters analysed in the current iteration (option -d) is converged
+with respect to the number of Morris trajectories (options -m and -v) of the model outputs (option -i).
+The trajectories are resampled (option -n) and mu* of the parameters is derived for every resample.
+The screening is converged if the split into informative and non-informative parameters given the
+cutoffs (option -c) and the ranking of the parameters agree between the resamples and the estimate of
+all trajectories, i.e. if the fraction of resamples with the same split and the mean rank correlation
+with the estimate both are at least 1-tolerance (option -t). Only distinct resamples count and there
+need to be at least a minimum number of them (option -r): with few trajectories, the few possible draws
+agree trivially with the estimate, e.g. 2 trajectories give only 3 distinct resamples. The number of
+trajectories and of distinct resamples, both agreements and 1 (converged) or 0 are appended to a file
+(option -o). Used by option -a of __run_eee.sh.
+
+History
+-------
+Written,  JM, Oct 2026
+"""
+
+
+
+# -------------------------------------------------------------------------
+# Command line arguments
+#
+modeloutputs   = 'example_ishigami-homma/model_output.pkl'
+modeloutputkey = 'All'
+maskfile       = 'example_ishigami-homma/parameters.dat'
+morris_M       = 'example_ishigami-homma/parameter_sets_1_para3_M.dat'
+morris_v       = 'example_ishigami-homma/parameter_sets_1_para3_v.dat'
+outfile        = 'example_ishigami-homma/convergence.dat'
+skip           = None                                                              # number of lines to skip in Morris files
+cutoff         = '-1'                                                              # cutoffs of model outputs separated by colons
+nboot          = 200                                                               # number of bootstrap resamples of trajectories
+tolerance      = 0.05                                                              # converged if agreements are at least 1-tolerance
+minresamples   = 20                                                                # minimal number of distinct resamples for convergence
+seed           = None                                                              # seed of bootstrap resampling
+
+import optparse
+parser = optparse.OptionParser(usage='%prog [options]',
+                               description="Checks if the screening of the parameters analysed in the current iteration (option -d) is converged with respect to the number of Morris trajectories (options -m and -v). The split into informative and non-informative parameters given the cutoffs (option -c) and the parameter ranking of bootstrap resamples of trajectories need to agree with the estimate of all trajectories within a tolerance (option -t). The result is appended to a file (option -o).")
+
+parser.add_option('-i', '--modeloutputs', action='store',
+                    default=modeloutputs, dest='modeloutputs', metavar='modeloutputs',
+                    help="Name of model output store: pickle file (*.pkl), NetCDF file (*.nc) or directory of .npy files written by 2_run_model_*.py (default: 'model_output.pkl').")
+parser.add_option('-k', '--modeloutputkey', action='store',
+                    default=modeloutputkey, dest='modeloutputkey', metavar='modeloutputkey',
+                    help="Key of model output stored in model output store. If 'All', all model outputs are taken into account and multi-objective EEE is applied. (default: 'All').")
+parser.add_option('-d', '--maskfile', action='store', dest='maskfile', type='string',
+                  default=maskfile, metavar='File',
+                  help='Name of file where all model parameters are specified including their distribution, distribution parameters, default value and if included in analysis or not. (default: maskfile=parameters.dat).')
+parser.add_option('-m', '--morris_M', action='store', dest='morris_M', type='string',
+                  default=morris_M, metavar='morris_M',
+                  help="Morris trajectory information: The UNSCALED parameter sets. (default: 'parameter_sets_1_para3_M.dat').")
+parser.add_option('-v', '--morris_v', action='store', dest='morris_v', type='string',
+                  default=morris_v, metavar='morris_v',
+                  help="Morris trajectory information: The indicator which parameter changed between subsequent sets in a trajectory. (default: 'parameter_sets_1_para3_v.dat').")
+parser.add_option('-s', '--skip', action='store',
+                    default=skip, dest='skip', metavar='skip',
+                    help="Number of lines to skip in Morris output files (default: None).")
+parser.add_option('-c', '--cutoff', action='store', dest='cutoff', type='string',
+                  default=cutoff, metavar='Cutoff value',
+                  help='Cut-off values of all model outputs separated by colons, e.g. written by 4_derive_threshold.py to cutoff_*.dat (default: cutoff=-1).')
+parser.add_option('-n', '--nboot', action='store', dest='nboot', type='int',
+                  default=nboot, metavar='nboot',
+                  help="Number of bootstrap resamples of trajectories (default: 200).")
+parser.add_option('-t', '--tolerance', action='store', dest='tolerance', type='float',
+                  default=tolerance, metavar='tolerance',
+                  help="Screening is converged if the fraction of resamples with the same split into informative and non-informative parameters and the mean rank correlation of mu* with the estimate are both at least 1-tolerance (default: 0.05).")
+parser.add_option('-r', '--min-resamples', action='store', dest='minresamples', type='int',
+                  default=minresamples, metavar='minresamples',
+                  help="Minimal number of distinct bootstrap resamples of trajectories needed for convergence, e.g. 3 trajectories allow only 10 distinct resamples, 4 allow 35, 5 allow 126 (default: 20).")
+parser.add_option('--seed', action='store', dest='seed', type='int',
+                  default=seed, metavar='seed',
+                  help="Seed of random number generator of bootstrap (default: None).")
+parser.add_option('-o', '--outfile', action='store', dest='outfile', type='string',
+                  default=outfile, metavar='File',
+                  help='File to which number of trajectories, number of distinct resamples, split agreement, rank agreement and 1 (converged) or 0 are appended. (default: convergence.dat).')
+(opts, args) = parser.parse_args()
+
+modeloutputs   = opts.modeloutputs
+modeloutputkey = opts.modeloutputkey
+maskfile       = opts.maskfile
+morris_M       = opts.morris_M
+morris_v       = opts.morris_v
+outfile        = opts.outfile
+skip           = opts.skip
+cutoff         = opts.cutoff
+nboot          = opts.nboot
+tolerance      = opts.tolerance
+minresamples   = opts.minresamples
+seed           = opts.seed
+
+del parser, opts, args
+
+
+# -----------------------
+# add subolder scripts/lib to search path
+# -----------------------
+import sys
+import os
+dir_path = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(dir_path+'/lib')
+
+import numpy       as np
+from output_store    import load_model_output, output_keys    # in lib/
+from fsread          import fsread              # in lib/
+from autostring      import astr                # in lib/
+from eee_effects     import bootstrap_elementary_effects, screening_agreement, read_morris_trajectories   # in lib/
+
+
+# -------------------------
+# read parameter info file
+# -------------------------
+nc,snc = fsread(maskfile, comment="#",cskip=1,snc=[0,1],nc=[2,3,4,5])
+# only parameters analysed in this iteration (noninformative(1) in parameter info file) are screened
+mask_para = np.where((nc[:,3].flatten())==1.,True,False)
+dims_all  = np.shape(mask_para)[0]
+idx_para  = np.arange(dims_all)[mask_para]
+
+# -------------------------
+# read model outputs and Morris trajectories
+# -------------------------
+if modeloutputkey == 'All':
+    keys = output_keys(modeloutputs)
+else:
+    keys = [ modeloutputkey ]
+model_output = load_model_output(modeloutputs, keys=keys)
+model_output = [ model_output[ikey] for ikey in keys ]
+nkeys = len(model_output)
+
+parasets, parachanged = read_morris_trajectories(morris_M, morris_v, skip=skip)
+ntraj = int(np.sum(parachanged == -1))
+
+cutoffs = np.array([ float(cc) for cc in cutoff.split(':') if cc.strip() != '' ])
+if (len(cutoffs) != nkeys) or np.any(cutoffs <= 0.):
+    raise ValueError('Need one positive cutoff for each of the '+str(nkeys)+' model outputs but got: '+cutoff)
+
+# -------------------------
+# agreement of resamples with estimate
+# -------------------------
+# repeated draws of the same trajectories are counted once
+mustar = bootstrap_elementary_effects(model_output, parasets, parachanged, dims_all, nboot=nboot,
+                                      seed=seed, replicates=True, distinct=True)
+ndistinct   = mustar.shape[0] - 1
+split, rank = screening_agreement(mustar[:,idx_para,:], cutoffs)
+converged   = (ndistinct >= minresamples) and (split >= 1.-tolerance) and (rank >= 1.-tolerance)
+
+# -------------------------
+# append to convergence file
+# -------------------------
+#     format:
+#     # ntraj  distinct_resamples  split_agreement  rank_agreement  converged
+#       3      10                  1.0              1.0             0
+#       5      109                 0.97             0.98            1
+newfile = not(os.path.exists(outfile))
+f = open(outfile, 'a')
+if newfile:
+    f.write('# ntraj  distinct_resamples  split_agreement  rank_agreement  converged (tolerance '+str(tolerance)+', '+
+            str(nboot)+' bootstrap resamples, at least '+str(minresamples)+' distinct)\n')
+f.write(str(ntraj)+'   '+str(ndistinct)+'   '+astr(split,prec=4)+'   '+astr(rank,prec=4)+'   '+str(int(converged))+'\n')
+f.close()
+print("trajectories: "+str(ntraj)+"   distinct resamples: "+str(ndistinct)+"   split agreement: "+astr(split,prec=4)+"   rank agreement: "+astr(rank,prec=4)+
+      "   converged: "+str(converged))
+print("wrote:   '"+outfile+"'")
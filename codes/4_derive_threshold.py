@@ -322,11 +322,12 @@ for iobj in range(nobj):
             gx_scaled = np.min(ee_masked[:,iobj]) / mumax
         cutoff1 = gx_scaled                                                # in 0-1 range # g(n_thresh)
         cutoff_obj[iobj]  = cutoff1*mumax                                  # in EE range  # g(n_thresh)*mu_thresh
-        x33 = np.arange(0.0125,1.03,0.0345)
-        y33 = np.array([curvatures for ii in range(np.shape(x33)[0])])
-        line6 = plt.plot(x33, y33)
-        plt.setp(line6, linestyle='None', linewidth=lwidth, color=lcol1, marker='x', markeredgecolor=mcol1, markerfacecolor='None',
-                 markersize=msize/2, markeredgewidth=mwidth/2, label=str2tex('$L(x_k)$',usetex=usetex))
+        if (not(noplot)):
+            x33 = np.arange(0.0125,1.03,0.0345)
+            y33 = np.array([curvatures for ii in range(np.shape(x33)[0])])
+            line6 = plt.plot(x33, y33)
+            plt.setp(line6, linestyle='None', linewidth=lwidth, color=lcol1, marker='x', markeredgecolor=mcol1, markerfacecolor='None',
+                     markersize=msize/2, markeredgewidth=mwidth/2, label=str2tex('$L(x_k)$',usetex=usetex))
 
         print('Cutoff(s): ', astr(cutoff_obj[iobj],prec=4))
 
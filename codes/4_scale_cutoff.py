@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+from __future__ import print_function
+
+# Copyright 2019 Juliane Mai - juliane.mai(at)uwaterloo.ca
+#
+# License
+# This file is part of the EEE code library for "Computationally inexpensive identification
+# of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+#
+# The EEE code library is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# The MVA code library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public License
+# along with The EEE code library.
+# If not, see <https://github.com/julemai/EEE/blob/master/LICENSE>.
+#
+# If you use this method in a publication please cite:
+#
+#    M Cuntz & J Mai et al. (2015).
+#    Computationally inexpensive identification of noninformative model parameters by sequential screening.
+#    Water Resources Research, 51, 6417-6441.
+#    https://doi.org/10.1002/2015WR016907.
+#
+#
+#
+# python 4_scale_cutoff.py \
+#                       -e example_raven-hmets/iter_1/eee_results.dat \
+#                       -f example_raven-hmets/iter_1/fidelity_0.25/eee_results.dat \
+#                       -d example_raven-hmets/iter_1/parameters.dat \
+#                       -c 0.0123 \
+#                       -o example_raven-hmets/iter_1/cutoff_fidelity_0.25.dat
+
+"""
+Scales the cutoffs (option -c) derived from the Elementary Effects of the first EEE iteration at full
+fidelity (option -e) to a reduced fidelity, i.e. a shortened simulation period. The parameter sets of the
+first iteration are run again at the reduced fidelity and their Elementary Effects (option -f) are compared
+with those at full fidelity: the cutoff of every model output is multiplied by the ratio of the sums of the
+Elementary Effects of all parameters analysed (option -d) at reduced and at full fidelity. The scaled
+cutoffs, separated by colons, are written to a file (option -o). Used by option -f of __run_eee.sh.
+
+The scaling assumes that the Elementary Effects of all parameters change by the same factor with the
+length of the simulation period. Parameters whose influence depends on the period, e.g. snow parameters
+if the shortened period has no winter, can still be misclassified at reduced fidelity.
+
+History
+-------
+Written,  JM, Oct 2026
+"""
+
+
+
+# -------------------------------------------------------------------------
+# Command line arguments
+#
+eefile         = 'example_raven-hmets/iter_1/eee_results.dat'
+fidelityfile   = 'example_raven-hmets/iter_1/fidelity_0.25/eee_results.dat'
+maskfile       = 'example_raven-hmets/iter_1/parameters.dat'
+cutoff         = '-1'                                                              # cutoffs of model outputs separated by colons
+outfile        = 'example_raven-hmets/iter_1/cutoff_fidelity_0.25.dat'
+
+import optparse
+parser = optparse.OptionParser(usage='%prog [options]',
+                               description="Scales the cutoffs (option -c) fitted to the Elementary Effects at full fidelity (option -e) to a reduced fidelity by the ratio of the sums of the Elementary Effects of the same parameter sets at reduced (option -f) and full fidelity. The scaled cutoffs are written to a file (option -o).")
+
+parser.add_option('-e', '--eefile', action='store', dest='eefile', type='string',
+                  default=eefile, metavar='File',
+                  help='File with Elementary Effects of the first iteration at full fidelity written by 3_derive_elementary_effects.py (default: eee_results.dat).')
+parser.add_option('-f', '--fidelityfile', action='store', dest='fidelityfile', type='string',
+                  default=fidelityfile, metavar='File',
+                  help='File with Elementary Effects of the same parameter sets at reduced fidelity (default: fidelity_0.25/eee_results.dat).')
+parser.add_option('-d', '--maskfile', action='store', dest='maskfile', type='string',
+                  default=maskfile, metavar='File',
+                  help='Name of file where all model parameters are specified including their distribution, distribution parameters, default value and if included in analysis or not. (default: maskfile=parameters.dat).')
+parser.add_option('-c', '--cutoff', action='store', dest='cutoff', type='string',
+                  default=cutoff, metavar='Cutoff value',
+                  help='Cut-off values at full fidelity of all model outputs separated by colons, e.g. written by 4_derive_threshold.py to cutoff_*.dat (default: cutoff=-1).')
+parser.add_option('-o', '--outfile', action='store', dest='outfile', type='string',
+                  default=outfile, metavar='File',
+                  help='File to which the scaled cutoffs separated by colons are written. (default: cutoff_fidelity_0.25.dat).')
+(opts, args) = parser.parse_args()
+
+eefile         = opts.eefile
+fidelityfile   = opts.fidelityfile
+maskfile       = opts.maskfile
+cutoff         = opts.cutoff
+outfile        = opts.outfile
+
+del parser, opts, args
+
+
+# -----------------------
+# add subolder scripts/lib to search path
+# -----------------------
+import sys
+import os
+dir_path = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(dir_path+'/lib')
+
+import numpy       as np
+from fsread          import fsread              # in lib/
+from autostring      import astr                # in lib/
+
+
+# -------------------------
+# read parameter info file
+# -------------------------
+nc,snc = fsread(maskfile, comment="#",cskip=1,snc=[0,1],nc=[2,3,4,5])
+# parameters analysed in the first iteration (noninformative(1) in parameter info file)
+mask_para = np.where((nc[:,3].flatten())==1.,True,False)
+
+# -------------------------
+# read Elementary Effects at full and reduced fidelity
+# -------------------------
+ees = []
+for ff in [eefile, fidelityfile]:
+    ee   = fsread(ff, cskip=2, comment='#')
+    nobj = int(np.shape(ee)[1]/2)
+    ees.append(ee[mask_para, 0:nobj])
+if ees[0].shape != ees[1].shape:
+    raise ValueError('Elementary Effects at full and reduced fidelity need the same parameters and model outputs: '+
+                     str(ees[0].shape)+' and '+str(ees[1].shape))
+nobj = ees[0].shape[1]
+
+cutoffs = np.array([ float(cc) for cc in cutoff.split(':') if cc.strip() != '' ])
+if (len(cutoffs) != nobj) or np.any(cutoffs <= 0.):
+    raise ValueError('Need one positive cutoff for each of the '+str(nobj)+' model outputs but got: '+cutoff)
+
+# -------------------------
+# ratio of Elementary Effects at reduced and full fidelity per model output
+# -------------------------
+valid = np.isfinite(ees[0]) & np.isfinite(ees[1])
+full  = np.sum(np.where(valid, ees[0], 0.), axis=0)
+short = np.sum(np.where(valid, ees[1], 0.), axis=0)
+ratio = np.where(full > 0., short / np.where(full > 0., full, 1.), 1.)
+scaled = cutoffs * ratio
+
+# -------------------------
+# write scaled cutoffs
+# -------------------------
+f = open(outfile, 'w')
+f.write(':'.join([ repr(float(cc)) for cc in scaled ])+':\n')
+f.close()
+print("ratio of Elementary Effects at reduced to full fidelity: "+' '.join([ astr(rr,prec=4) for rr in ratio ]))
+print("wrote:   '"+outfile+"'")
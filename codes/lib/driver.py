@@ -0,0 +1,480 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import json
+import os
+import shutil
+import numpy as np
+
+from model_process import call_with_retries, record_failure
+from output_store  import ModelOutputStore, chunk_rows, store_format
+from eee_effects   import OnlineElementaryEffects, read_morris_trajectories
+from parallel_runs import run_parallel, parse_procs
+from job_queue     import JobQueue, queue_worker
+from telemetry     import Telemetry, Progress, summarize_telemetry
+from scratch       import ScratchDir
+
+__all__ = ['add_run_options', 'ModelRuns']
+
+
+def add_run_options(parser, queue=True, external=False):
+    """
+        Add the options of running the model for all parameter sets, which are shared
+        by all model drivers 2_run_model_*.py, to their argument parser.
+
+
+        The options are
+
+            --float32, --compress       precision and compression of the model output store
+            --chunk                     run only one block of the parameter sets
+            --online                    partial Elementary Effects updated while runs complete
+
+        with queue also
+
+            -q/--queue, --worker, --lease
+                                        job queue of worker daemons (see lib/job_queue.py)
+            --retries, --retry-delay    retries of failed model runs
+            -p/--processes              parallel local processes (see lib/parallel_runs.py)
+
+        and with external also
+
+            -t/--timeout, -l/--logdir   time limit and log files of external model executables
+            -w/--scratch, --keep-scratch
+                                        scratch space of model run folders (see lib/scratch.py)
+            --telemetry                 per-run phase timings and resource usage (see lib/telemetry.py)
+
+        The options -i/--infile, -s/--skip and -o/--outfile with their dests infile,
+        skip and outfile are added by the drivers themselves.
+
+
+        Definition
+        ----------
+        def add_run_options(parser, queue=True, external=False):
+
+
+        Input
+        -----
+        parser       argparse.ArgumentParser of model driver
+
+
+        Optional Input
+        --------------
+        queue        True:  model is run one parameter set at a time, i.e. serially,
+                            by parallel local processes or by worker daemons (default)
+                     False: model runs all parameter sets itself, e.g. vectorized
+        external     True:  model runs an external executable in a run folder
+                     False: model is a Python function (default)
+
+
+        Examples
+        --------
+        >>> import argparse
+        >>> parser = argparse.ArgumentParser()
+        >>> add_run_options(parser, external=True)
+        >>> args = parser.parse_args(['-p', '2:8', '--retries', '2', '--keep-scratch'])
+        >>> print(args.nprocs, args.retries, args.keepscratch, args.queue, args.telfile)
+        2:8 2 True None None
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    parser.add_argument('--float32', action='store_true',
+                        default=False, dest='float32',
+                        help="Store model outputs in single precision (default: False, i.e. double precision).")
+    parser.add_argument('--compress', action='store_true',
+                        default=False, dest='compress',
+                        help="Compress model outputs (zlib); only for NetCDF outfile *.nc (default: False).")
+    if queue:
+        parser.add_argument('-q', '--queue', action='store',
+                            default=None, dest='queue', metavar='queue',
+                            help="Directory of job queue (e.g. on shared file system). Parameter sets are submitted as jobs, run by worker daemons started with --worker on any node, and collected into outfile (default: None, i.e. runs are done by this process).")
+        parser.add_argument('--worker', action='store',
+                            default=None, dest='worker', metavar='queue',
+                            help="Run as worker daemon pulling jobs from this job queue directory until all jobs are done; options -i, -s, -o are not used (default: None).")
+        parser.add_argument('--lease', action='store',
+                            default=600., dest='lease', metavar='lease',
+                            help="Seconds without heartbeat after which a job of a dead worker is requeued (default: 600).")
+    parser.add_argument('--chunk', action='store',
+                        default=None, dest='chunk', metavar='i/n',
+                        help="Run only the i-th of n contiguous blocks of parameter sets (i=1,...,n), e.g. one per SLURM/PBS array task. Outfile is then a partial output holding the design rows; merge all blocks with 2_merge_model_output.py (default: None, i.e. all parameter sets).")
+    if queue:
+        parser.add_argument('--retries', action='store',
+                            default=0, dest='retries', metavar='retries',
+                            help="Number of retries of a failed model run. Runs failing all attempts are stored as NaN and recorded in failed_runs.log; their steps are ignored when deriving Elementary Effects (default: 0).")
+        parser.add_argument('--retry-delay', action='store',
+                            default=0., dest='retrydelay', metavar='seconds',
+                            help="Seconds before first retry of a failed model run; doubled for every further retry (default: 0).")
+        parser.add_argument('-p', '--processes', action='store',
+                            default=1, dest='nprocs', metavar='n|nmin:nmax',
+                            help="Number of parallel local processes. Each process writes the outputs of its runs directly into shared memory-mapped result slots; with a directory of .npy files as outfile these are the final outputs. 'nmin:nmax' adapts the number of processes between nmin and nmax to maximize runs per second, based on the measured CPU time, peak memory and I/O of the model runs (see lib/parallel_runs.py) (default: 1).")
+    if external:
+        parser.add_argument('-t', '--timeout', action='store',
+                            default=None, dest='timeout', metavar='timeout',
+                            help="Wall-clock time limit of a single model run in seconds. Runs exceeding it are killed (default: None, i.e. no limit).")
+        parser.add_argument('-l', '--logdir', action='store',
+                            default=None, dest='logdir', metavar='logdir',
+                            help="Directory where standard output and error of each model run are written to <run_id>.log (default: 'model_logs' in directory of outfile).")
+        parser.add_argument('-w', '--scratch', action='store',
+                            default=None, dest='scratch', metavar='scratch',
+                            help="Root directory of scratch space in which a unique folder for this analysis is created. 'shm' uses the RAM disk /dev/shm (default: $EEE_SCRATCH or system temporary directory).")
+        parser.add_argument('--keep-scratch', action='store_true',
+                            default=False, dest='keepscratch',
+                            help="Keep scratch folders of model runs after the analysis (default: False).")
+        parser.add_argument('--telemetry', action='store',
+                            default=None, dest='telfile', metavar='telfile',
+                            help="File of JSON lines with phase timings (setup, model, parse, cleanup), exit status, CPU time and peak memory of every model run; a summary is written to <telfile>_summary.json at the end. 'none' switches telemetry off (default: telemetry.jsonl in log directory, telemetry_<i>of<n>.jsonl with --chunk i/n, or in queue directory with -q/--worker).")
+    parser.add_argument('--online', action='store',
+                        default=None, dest='onlinefile', metavar='onlinefile',
+                        help="File of partial Elementary Effects (mu*, mu and sigma of all model outputs) updated at most every 10 s while model runs complete, e.g. to watch convergence. Needs the UNSCALED Morris files belonging to infile, e.g. parameter_sets_1_para3_M.dat and parameter_sets_1_para3_v.dat for parameter_sets_1_scaled_para3_M.dat (default: None).")
+
+
+class ModelRuns(object):
+    """
+        Runs of a model for all parameter sets of a model driver 2_run_model_*.py.
+
+
+        The parameter sets (lines of infile after skip header lines, or after the number
+        of lines given in the first line 'header lines: n') are run by model_function,
+        either one after the other, by parallel local processes writing into shared result
+        slots (option -p), or by worker daemons pulling them from a job queue (options -q
+        and --worker). Failed runs are retried (option --retries); runs failing all attempts
+        are recorded in failed_runs.log and stored as NaN. The outputs are collected in a
+        preallocated ModelOutputStore saved to outfile, optionally also feeding online
+        Elementary Effects (option --online). With external, runs get a scratch space,
+        per-run log files and telemetry (see add_run_options).
+
+        A driver only defines its model_function(paraset, run_id=None) returning the
+        dictionary of model outputs of one parameter set and calls run. Drivers running all
+        parameter sets at once, e.g. vectorized, use read, done and finish instead.
+
+
+        Definition
+        ----------
+        class ModelRuns(args, external=False):
+
+
+        Input
+        -----
+        args         parsed arguments with infile, skip, outfile and the options of add_run_options
+
+
+        Optional Input
+        --------------
+        external     as in add_run_options (default: False)
+
+
+        Methods
+        -------
+        run(model_function)       run all parameter sets, or jobs of a queue as worker daemon (--worker),
+                                  and finish
+        read()                    parameter sets of this task (option --chunk) as lists of floats;
+                                  allocates store and online Elementary Effects
+        run_id(iparaset)          name of run of parameter set iparaset, i.e. 'run_set_<design row>'
+        done(iparaset, model=None, errors=None)
+                                  finished run: stores model outputs (if not already in shared slots)
+                                  or records failure if only errors is given; updates progress and
+                                  online Elementary Effects
+        finish()                  report failures and save store, online Elementary Effects and telemetry
+
+
+        Attributes
+        ----------
+        outfile, queue, worker, retries, retrydelay, timeout
+                                  options
+        logdir                    directory of per-run log files (external only)
+        failedlog                 log file of failed runs
+        telemetry                 Telemetry of model runs (see lib/telemetry.py)
+        scratchdir                ScratchDir of model run folders (external only, else None)
+        rows                      design rows of parameter sets of this task
+        store                     ModelOutputStore
+        nfailed                   number of failed runs
+
+
+        Examples
+        --------
+        >>> import argparse, tempfile, multiprocessing
+        >>> from output_store import load_model_output
+        >>> tmpdir = tempfile.mkdtemp()
+        >>> infile = os.path.join(tmpdir, 'parameter_sets_1_scaled_para2_M.dat')
+        >>> ff = open(infile, 'w')
+        >>> _ = ff.write('header lines: 1\\n1.0 2.0\\n3.0 4.0\\n5.0 6.0\\n')
+        >>> ff.close()
+        >>> def model(paraset, run_id=None):
+        ...     if paraset[0] == 3.:
+        ...         raise ValueError('model crashed in '+run_id)
+        ...     return {'sum': sum(paraset)}
+        >>> parser = argparse.ArgumentParser()
+        >>> _ = parser.add_argument('-i', dest='infile')
+        >>> _ = parser.add_argument('-s', dest='skip')
+        >>> _ = parser.add_argument('-o', dest='outfile')
+        >>> add_run_options(parser)
+        >>> outfile = os.path.join(tmpdir, 'model_output.pkl')
+
+        >>> # serial and parallel runs
+        >>> for procs in ['1', '2']:
+        ...     ModelRuns(parser.parse_args(['-i', infile, '-o', outfile, '-p', procs])).run(model)
+        ...     print(load_model_output(outfile)['sum'])
+        failed:  1 of 3 model runs stored as NaN; see '.../failed_runs.log'
+        wrote:   '.../model_output.pkl'
+        [ 3. nan 11.]
+        failed:  1 of 3 model runs stored as NaN; see '.../failed_runs.log'
+        wrote:   '.../model_output.pkl'
+        [ 3. nan 11.]
+        >>> print(open(os.path.join(tmpdir, 'failed_runs.log')).read().splitlines()[-1])
+            ValueError: model crashed in run_set_1
+
+        >>> # runs by a worker daemon of a job queue; second block of parameter sets only,
+        >>> # runs are named by rows of the parameter set file as in serial and parallel runs
+        >>> def row(paraset, run_id=None):
+        ...     return {'sum': float(run_id.split('_')[-1])}
+        >>> qdir   = os.path.join(tmpdir, 'queue')
+        >>> worker = multiprocessing.Process(target=ModelRuns(parser.parse_args(['-o', outfile, '--worker', qdir])).run, args=(row,))
+        >>> worker.start()
+        >>> runs = ModelRuns(parser.parse_args(['-i', infile, '-o', outfile, '-q', qdir, '--chunk', '2/2']))
+        >>> runs.run(model)
+        submitted 1 jobs to queue '.../queue'
+        wrote:   '.../model_output.pkl'
+        >>> worker.join()
+        >>> print(runs.rows, runs.store['sum'])
+        [2] [2.]
+
+        >>> # tasks of blocks of external models keep their own telemetry next to the per-run logs
+        >>> external = argparse.ArgumentParser()
+        >>> _ = external.add_argument('-i', dest='infile')
+        >>> _ = external.add_argument('-s', dest='skip')
+        >>> _ = external.add_argument('-o', dest='outfile')
+        >>> add_run_options(external, external=True)
+        >>> print([ os.path.basename(ModelRuns(external.parse_args(['-i', infile, '-o', outfile, '--chunk', chunk]),
+        ...                                    external=True).telemetry.telfile) for chunk in ['1/2', '2/2'] ])
+        ['telemetry_1of2.jsonl', 'telemetry_2of2.jsonl']
+
+        >>> # vectorized model
+        >>> runs     = ModelRuns(parser.parse_args(['-i', infile, '-o', outfile]))
+        >>> parasets = np.array(runs.read())
+        >>> for iparaset, total in enumerate(np.sum(parasets, axis=1)):
+        ...     runs.done(iparaset, {'sum': total})
+        >>> runs.finish()
+        wrote:   '.../model_output.pkl'
+        >>> print(load_model_output(outfile)['sum'])
+        [ 3.  7. 11.]
+
+        >>> # Clean up doctest
+        >>> shutil.rmtree(tmpdir)
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+
+    def __init__(self, args, external=False):
+        self.infile     = args.infile
+        self.outfile    = args.outfile
+        self.skip       = args.skip
+        self.dtype      = np.float32 if args.float32 else None
+        self.compress   = args.compress
+        self.chunk      = args.chunk
+        self.onlinefile = args.onlinefile
+        self.queue      = getattr(args, 'queue', None)
+        self.worker     = getattr(args, 'worker', None)
+        self.lease      = float(getattr(args, 'lease', 600.))
+        self.retries    = int(getattr(args, 'retries', 0))
+        self.retrydelay = float(getattr(args, 'retrydelay', 0.))
+        self.minprocs, self.maxprocs = parse_procs(getattr(args, 'nprocs', 1))
+        self.external   = external
+        self.timeout    = None
+        self.logdir     = None
+        self.scratchdir = None
+        self.progress   = None
+        self.store      = None
+        self.online     = None
+        self.rows       = None
+        self.nfailed    = 0
+        if not external:
+            self.failedlog = os.path.join(self._outdir(), "failed_runs.log")     # failed model runs stored as NaN
+            self.telemetry = Telemetry(None)
+            return
+
+        if not(args.timeout is None):
+            self.timeout = float(args.timeout)
+        self.logdir = args.logdir
+        if self.logdir is None:
+            if self.worker is None:
+                self.logdir = os.path.join(self._outdir(), "model_logs")
+            else:
+                self.logdir = os.path.join(os.path.abspath(self.worker), "model_logs")
+        self.failedlog = os.path.join(self.logdir, "failed_runs.log")     # failed model runs stored as NaN
+
+        # per-run phase timings and resource usage written by whichever process runs the model (see lib/telemetry.py)
+        telfile = args.telfile
+        if telfile is None:
+            if not(self.worker is None):
+                telfile = os.path.join(os.path.abspath(self.worker), "telemetry.jsonl")
+            elif not(self.queue is None):
+                telfile = os.path.join(os.path.abspath(self.queue), "telemetry.jsonl")
+            elif self.chunk is None:
+                telfile = os.path.join(self.logdir, "telemetry.jsonl")
+            else:
+                # tasks of other blocks (option --chunk) share the log directory and run at the same time
+                telfile = os.path.join(self.logdir, "telemetry_"+str(self.chunk).replace('/', 'of')+".jsonl")
+        self.telemetry = Telemetry(None if telfile == 'none' else telfile)
+
+        # unique scratch namespace of this analysis; removed at exit unless --keep-scratch
+        self.scratchdir = ScratchDir(root=args.scratch, keep=args.keepscratch)
+
+    def run(self, model_function):
+        if not(self.worker is None):
+            # worker daemon: pulls parameter sets from the job queue (option -q of master) until all jobs are done;
+            # any number of workers can be started on any node sharing the queue directory (see lib/job_queue.py)
+            njobs = queue_worker(self.worker, lambda irow, paraset: model_function(paraset, run_id='run_set_'+str(irow)),
+                                 lease=self.lease, retries=self.retries, delay=self.retrydelay)
+            print("worker finished "+str(njobs)+" model runs of queue '"+self.worker+"'")
+            if not(self.scratchdir is None):
+                print(self.scratchdir.summary())
+            return
+
+        parasets = self.read()
+        if self.queue is None and self.maxprocs > 1:
+            # parallel local processes write outputs directly into shared memory-mapped result slots
+            # (only failures are sent back); a .npy directory outfile is itself the slots (see lib/parallel_runs.py)
+            slotdir = self.outfile if store_format(self.outfile) == 'npy' else self.outfile+'.slots'
+            for iparaset, errors in run_parallel(lambda irun: model_function(parasets[irun], run_id=self.run_id(irun)),
+                                                 self.store, self.minprocs, slotdir, retries=self.retries,
+                                                 delay=self.retrydelay, dtype=self.dtype, maxprocs=self.maxprocs):
+                self.done(iparaset, errors=errors)
+        elif self.queue is None:
+            for iparaset, paraset in enumerate(parasets):
+                model, errors = call_with_retries(lambda: model_function(paraset, run_id=self.run_id(iparaset)),
+                                                  retries=self.retries, delay=self.retrydelay)
+                self.done(iparaset, model, errors)
+        else:
+            # model runs are done by worker daemons: python 2_run_model_*.py --worker <queue>
+            jobqueue = JobQueue(self.queue, lease=self.lease)
+            # jobs are numbered by rows of the parameter set file so that workers name runs as the other paths do
+            jobqueue.submit(parasets, ijobs=self.rows)
+            print("submitted "+str(len(parasets))+" jobs to queue '"+self.queue+"'")
+            iparasets = dict(zip(self.rows, range(len(self.rows))))
+            for irow, model in jobqueue.collect(allow_failed=True):
+                self.done(iparasets[irow], model, None if not(model is None) else jobqueue.errors(irow))
+        self.finish()
+
+    def read(self):
+        ff = open(self.infile, "r")
+        parasets = ff.readlines()
+        ff.close()
+        if self.skip is None:
+            skip = int(parasets[0].strip().split(':')[1])
+        else:
+            skip = int(self.skip)
+        parasets = parasets[skip:]
+
+        # block of design rows of this task (option --chunk)
+        ndesign   = len(parasets)
+        self.rows = chunk_rows(ndesign, self.chunk)
+        parasets  = [ list(map(float, parasets[irow].strip().split())) for irow in self.rows ]
+
+        # preallocated arrays per output key (see lib/output_store.py);
+        # partial outputs of blocks also store their design rows
+        if self.chunk is None:
+            self.store = ModelOutputStore(len(parasets))
+        else:
+            self.store = ModelOutputStore(len(parasets), rows=self.rows, ndesign=ndesign)
+
+        # online Elementary Effects updated while model runs complete (option --online);
+        # steps are evaluated as soon as both of their runs are done (see lib/eee_effects.py)
+        if not(self.onlinefile is None):
+            morris_M    = self.infile.replace('_scaled', '')
+            self.online = OnlineElementaryEffects(*read_morris_trajectories(morris_M, morris_M[:-len('_M.dat')]+'_v.dat'))
+
+        self.nfailed = 0
+        self.telemetry.clear()
+        if self.external:
+            self.progress = Progress(len(parasets))     # live progress and ETA on stderr
+        return parasets
+
+    def run_id(self, iparaset):
+        return 'run_set_'+str(self.rows[iparaset])
+
+    def done(self, iparaset, model=None, errors=None):
+        failed = (model is None) and not(errors is None)
+        if failed:
+            # failed model run: outputs stay NaN (see lib/output_store.py)
+            run_id  = self.run_id(iparaset)
+            logfile = None
+            if self.external and self.queue is None:
+                logfile = os.path.join(self.logdir, run_id+'.log')
+            record_failure(self.failedlog, run_id, errors, logfile=logfile)
+            self.nfailed += 1
+        elif not(model is None):
+            self.store.set(iparaset, model)
+        if not(self.progress is None):
+            self.progress.update(failed=failed)
+        if not(self.online is None):
+            # outputs of completed run as stored, e.g. in single precision
+            self.online.add(self.rows[iparaset], None if failed else
+                            dict([ (ikey, self.store[ikey][iparaset]) for ikey in self.store.keys() ]))
+            self.online.write(self.onlinefile, wait=10.)
+
+    def finish(self):
+        nruns = self.store.nruns
+        if self.nfailed == nruns:
+            raise ValueError("All "+str(self.nfailed)+" model runs failed. See '"+self.failedlog+"'.")
+        if self.nfailed > 0:
+            print("failed:  "+str(self.nfailed)+" of "+str(nruns)+" model runs stored as NaN; see '"+self.failedlog+"'")
+
+        if not(self.online is None):
+            self.online.write(self.onlinefile)
+            print("wrote:   '"+self.onlinefile+"'")
+
+        self.store.save(self.outfile, dtype=self.dtype, zlib=self.compress)
+        if not(self.store.shared is None) and self.store.shared != os.path.abspath(self.outfile):
+            shutil.rmtree(self.store.shared)
+        print("wrote:   '"+self.outfile+"'")
+
+        telfile = self.telemetry.telfile
+        if not(self.progress is None) and not(telfile is None) and os.path.exists(telfile):
+            summary = summarize_telemetry(telfile, walltime=self.progress.elapsed())
+            sumfile = os.path.splitext(telfile)[0]+'_summary.json'
+            ff = open(sumfile, 'w')
+            json.dump(summary, ff, indent=1)
+            ff.close()
+            print("telemetry: {:.3f} runs/s, run time p50 {:.2f} s, p95 {:.2f} s, overhead {:.1%} (see '{:s}')".format(
+                summary.get('runs_per_s', 0.), summary.get('run_p50', 0.), summary.get('run_p95', 0.),
+                summary.get('overhead_fraction', 0.), sumfile))
+        if not(self.scratchdir is None):
+            print(self.scratchdir.summary())
+
+    def _outdir(self):
+        return os.path.dirname(os.path.abspath(self.outfile))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
@@ -0,0 +1,812 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import numpy as np
+
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from autostring import astr
+
+__all__ = ['trajectory_steps', 'mean_elementary_effects', 'time_resolved_elementary_effects',
+           'aggregate_elementary_effects', 'bootstrap_elementary_effects', 'screening_agreement',
+           'OnlineElementaryEffects', 'read_morris_trajectories']
+
+
+def trajectory_steps(parasets, parachanged):
+    """
+        Steps of Morris trajectories: the parameter sets before each step, the parameter
+        changed in the step and the absolute change of this parameter.
+
+
+        Definition
+        ----------
+        def trajectory_steps(parasets, parachanged):
+
+
+        Input
+        -----
+        parasets     UNSCALED parameter sets of all trajectories [nsets, npara] (Morris M file)
+        parachanged  index of parameter changed between set i and set i+1 [nsets];
+                     -1 for the last set of a trajectory (Morris v file)
+
+
+        Output
+        ------
+        iset         index of parameter set before step [nsteps]
+        ipara        index of changed parameter [nsteps]
+        dpara        absolute change of changed parameter [nsteps]
+
+
+        Examples
+        --------
+        >>> parasets = np.array([[0., 0.], [0.5, 0.], [0.5, 0.25], [1., 1.], [1., 0.75], [0.5, 0.75]])
+        >>> iset, ipara, dpara = trajectory_steps(parasets, np.array([0, 1, -1, 1, 0, -1]))
+        >>> print(iset, ipara, dpara)
+        [0 1 3 4] [0 1 1 0] [0.5  0.25 0.25 0.5 ]
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    parachanged = np.asarray(parachanged, dtype=int)
+    iset  = np.where(parachanged != -1)[0]
+    ipara = parachanged[iset]
+    dpara = np.abs(parasets[iset, ipara] - parasets[iset+1, ipara])
+    return iset, ipara, dpara
+
+
+def mean_elementary_effects(outputs, parasets, parachanged, npara, nblock=256, ntchunk=None):
+    """
+        Mean absolute Elementary Effects of all parameters for many model outputs at once.
+
+
+        The elementary effect of a step of a trajectory is the absolute change of the model
+        output divided by the absolute change of the parameter changed in the step; for time
+        series outputs it is the mean over time of the absolute changes divided by the
+        parameter change. Effects of all steps are computed as array operations and summed
+        per changed parameter with np.bincount; scalar outputs are processed nblock keys at
+        a time as one matrix. Steps with NaN effects (failed model runs) are ignored; the
+        counter then holds the number of valid steps per parameter.
+
+        Time series outputs are read in blocks of ntchunk time steps, so that outputs larger
+        than memory can be streamed from memory-mapped .npy files or NetCDF variables (see
+        load_model_output of lib/output_store.py). The absolute changes of each step are
+        summed time step after time step, so results do not depend on ntchunk.
+
+
+        Definition
+        ----------
+        def mean_elementary_effects(outputs, parasets, parachanged, npara, nblock=256, ntchunk=None):
+
+
+        Input
+        -----
+        outputs      list of model outputs, each [nsets] (scalar) or [nsets, ntime] (time series)
+        parasets     UNSCALED parameter sets of all trajectories [nsets, npara] (Morris M file)
+        parachanged  index of parameter changed between set i and set i+1 [nsets];
+                     -1 for the last set of a trajectory (Morris v file)
+        npara        number of parameters
+
+
+        Optional Input
+        --------------
+        nblock       number of scalar outputs processed together (default: 256)
+        ntchunk      number of time steps of time series outputs read at once; memory needed
+                     is about 6*nsets*ntchunk*8 bytes (default: None, i.e. all time steps)
+
+
+        Output
+        ------
+        ee           mean absolute elementary effects [npara, nkeys]
+        counter      number of valid steps per parameter and output [npara, nkeys]
+        nskipped     number of steps ignored because of NaN per output [nkeys]
+
+
+        Examples
+        --------
+        >>> parasets = np.array([[0., 0.], [0.5, 0.], [0.5, 0.25], [1., 1.], [1., 0.75], [0.5, 0.75]])
+        >>> parachanged = np.array([0, 1, -1, 1, 0, -1])
+        >>> out1 = parasets[:, 0] + 4.*parasets[:, 1]
+        >>> out2 = np.array([1., 2., np.nan, 1., 1., 1.])
+        >>> out3 = np.outer(out1, [1., 2.])
+        >>> ee, counter, nskipped = mean_elementary_effects([out1, out2, out3], parasets, parachanged, 2)
+        >>> print(ee)
+        [[1.  1.  1.5]
+         [4.  0.  6. ]]
+        >>> print(counter, nskipped)
+        [[2 2 2]
+         [2 1 2]] [0 1 0]
+        >>> out4 = np.sin(np.outer(out1, np.arange(100.)))
+        >>> ee1 = mean_elementary_effects([out4], parasets, parachanged, 2)[0]
+        >>> ee7 = mean_elementary_effects([out4], parasets, parachanged, 2, ntchunk=7)[0]
+        >>> print(np.array_equal(ee1, ee7))
+        True
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    iset, ipara, dpara = trajectory_steps(parasets, parachanged)
+    nkeys = len(outputs)
+    for ikey in range(nkeys):
+        if not(np.ndim(outputs[ikey]) in [1, 2]):
+            raise ValueError('Only scalar and 1D model outputs are supported!')
+
+    ee       = np.zeros((npara, nkeys))
+    counter  = np.zeros((npara, nkeys), dtype=int)
+    nskipped = np.zeros(nkeys, dtype=int)
+    nsteps   = np.bincount(ipara, minlength=npara)
+
+    # effects [nkeys, nsteps] of blocks of scalar outputs and of each time series output
+    scalar = [ ikey for ikey in range(nkeys) if np.ndim(outputs[ikey]) == 1 ]
+    for iblock in range(0, len(scalar), nblock):
+        ikeys = scalar[iblock:iblock+nblock]
+        out   = np.empty((len(ikeys), np.shape(parasets)[0]))
+        for ii, ikey in enumerate(ikeys):
+            out[ii] = outputs[ikey][:]
+        # np.take keeps rows contiguous, unlike fancy indexing out[:, iset]
+        effects = np.abs(np.take(out, iset+1, axis=1) - np.take(out, iset, axis=1)) / dpara
+        _sum_effects(effects, ipara, nsteps, ee, counter, nskipped, ikeys)
+    for ikey in range(nkeys):
+        if np.ndim(outputs[ikey]) == 2:
+            effects = _mean_changes(outputs[ikey], iset, ntchunk) / dpara
+            _sum_effects(effects[np.newaxis, :], ipara, nsteps, ee, counter, nskipped, [ikey])
+
+    ee = np.where(counter > 0, ee / np.maximum(counter, 1), ee)
+    return ee, counter, nskipped
+
+
+
+def time_resolved_elementary_effects(output, parasets, parachanged, npara, ntchunk=None):
+    """
+        Mean absolute Elementary Effects of all parameters for every time step of a time series output.
+
+
+        The elementary effect of a step of a trajectory at time t is the absolute change of the
+        output at t divided by the absolute change of the parameter changed in the step. The
+        effects of all steps are averaged per changed parameter and time step; steps with NaN
+        outputs at a time step are ignored at this time step. The output is read in blocks of
+        ntchunk time steps (see mean_elementary_effects).
+
+
+        Definition
+        ----------
+        def time_resolved_elementary_effects(output, parasets, parachanged, npara, ntchunk=None):
+
+
+        Input
+        -----
+        output       time series model output [nsets, ntime]
+        parasets     UNSCALED parameter sets of all trajectories [nsets, npara] (Morris M file)
+        parachanged  index of parameter changed between set i and set i+1 [nsets];
+                     -1 for the last set of a trajectory (Morris v file)
+        npara        number of parameters
+
+
+        Optional Input
+        --------------
+        ntchunk      number of time steps read at once (default: None, i.e. all time steps)
+
+
+        Output
+        ------
+        ee           mean absolute elementary effects [npara, ntime]
+        counter      number of valid steps per parameter and time step [npara, ntime]
+
+
+        Examples
+        --------
+        >>> parasets = np.array([[0., 0.], [0.5, 0.], [0.5, 0.25], [1., 1.], [1., 0.75], [0.5, 0.75]])
+        >>> parachanged = np.array([0, 1, -1, 1, 0, -1])
+        >>> out = np.outer(parasets[:, 0] + 4.*parasets[:, 1], [1., 2., 0.])
+        >>> out[2, 1] = np.nan
+        >>> ee, counter = time_resolved_elementary_effects(out, parasets, parachanged, 2, ntchunk=2)
+        >>> print(ee)
+        [[1. 2. 0.]
+         [4. 8. 0.]]
+        >>> print(counter)
+        [[2 2 2]
+         [2 1 2]]
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    iset, ipara, dpara = trajectory_steps(parasets, parachanged)
+    ntime   = np.shape(output)[1]
+    nt      = ntime if ntchunk is None else max(1, int(ntchunk))
+    steps   = [ np.where(ipara == ip)[0] for ip in range(npara) ]
+    ee      = np.zeros((npara, ntime))
+    counter = np.zeros((npara, ntime), dtype=int)
+    for it in range(0, ntime, nt):
+        out     = np.asarray(output[:, it:it+nt], dtype=float)
+        effects = np.abs(out[iset+1] - out[iset]) / dpara[:, np.newaxis]
+        valid   = ~np.isnan(effects)
+        effects[~valid] = 0.
+        for ip in range(npara):
+            ee[ip, it:it+nt]      = np.sum(effects[steps[ip]], axis=0)
+            counter[ip, it:it+nt] = np.sum(valid[steps[ip]], axis=0)
+    ee = np.where(counter > 0, ee / np.maximum(counter, 1), ee)
+    return ee, counter
+
+
+def aggregate_elementary_effects(ee, counter, groups):
+    """
+        Mean absolute Elementary Effects of groups of time steps, e.g. months or seasons.
+
+
+        Time-resolved effects are averaged over all time steps of a group weighted by
+        the number of valid trajectory steps at each time step, i.e. the result is the
+        mean effect of all valid (trajectory step, time step) pairs of the group.
+
+
+        Definition
+        ----------
+        def aggregate_elementary_effects(ee, counter, groups):
+
+
+        Input
+        -----
+        ee           mean absolute elementary effects [npara, ntime]
+        counter      number of valid steps per parameter and time step [npara, ntime]
+        groups       group label of every time step [ntime], e.g. month of year
+
+
+        Output
+        ------
+        labels       sorted unique group labels [ngroups]
+        ee           mean absolute elementary effects [npara, ngroups]
+        counter      number of valid (trajectory step, time step) pairs [npara, ngroups]
+
+
+        Examples
+        --------
+        >>> ee      = np.array([[1., 2., 0., 4.], [4., 8., 0., 2.]])
+        >>> counter = np.array([[2, 2, 2, 2], [2, 1, 2, 0]])
+        >>> labels, eeg, countg = aggregate_elementary_effects(ee, counter, np.array([1, 1, 2, 2]))
+        >>> print(labels, eeg[0], eeg[1], countg[1])
+        [1 2] [1.5 2. ] [5.33333333 0.        ] [3 2]
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    groups  = np.asarray(groups)
+    labels  = np.unique(groups)
+    sums    = np.where(counter > 0, ee * counter, 0.)
+    eeg     = np.zeros((np.shape(ee)[0], len(labels)))
+    countg  = np.zeros((np.shape(ee)[0], len(labels)), dtype=int)
+    for ig, label in enumerate(labels):
+        countg[:, ig] = np.sum(counter[:, groups == label], axis=1)
+        eeg[:, ig]    = np.sum(sums[:, groups == label], axis=1)
+    eeg = np.where(countg > 0, eeg / np.maximum(countg, 1), eeg)
+    return labels, eeg, countg
+
+
+def bootstrap_elementary_effects(outputs, parasets, parachanged, npara, nboot=1000, confidence=0.95,
+                                 seed=None, njobs=1, ntchunk=None, replicates=False, distinct=False):
+    """
+        Bootstrap confidence intervals of the Morris measures mu*, mu and sigma of all parameters
+        and model outputs by resampling trajectories.
+
+
+        The signed elementary effect of a step is the change of the model output divided by
+        the change of the parameter (mean over time for time series outputs); mu* is the mean
+        of the absolute effects, mu the mean and sigma the standard deviation of the signed
+        effects. Per trajectory, the sums of absolute, signed and squared effects and the
+        number of valid steps of each parameter are computed once. All nboot resamples of
+        trajectories are then drawn at once as a matrix of multiplicities [nboot, ntraj] so
+        that the sums of all resamples are one matrix product per output. Confidence
+        intervals are percentile intervals of the resampled measures. The changes of the
+        model outputs, the bulk of the work for time series outputs, are computed for blocks
+        of steps by njobs forked processes, also if there is only one output.
+
+
+        Definition
+        ----------
+        def bootstrap_elementary_effects(outputs, parasets, parachanged, npara, nboot=1000, confidence=0.95,
+                                         seed=None, njobs=1, ntchunk=None, replicates=False, distinct=False):
+
+
+        Input
+        -----
+        outputs      list of model outputs, each [nsets] (scalar) or [nsets, ntime] (time series)
+        parasets     UNSCALED parameter sets of all trajectories [nsets, npara] (Morris M file)
+        parachanged  index of parameter changed between set i and set i+1 [nsets];
+                     -1 for the last set of a trajectory (Morris v file)
+        npara        number of parameters
+
+
+        Optional Input
+        --------------
+        nboot        number of bootstrap resamples (default: 1000)
+        confidence   confidence level of intervals (default: 0.95)
+        seed         seed of random number generator (default: None)
+        njobs        number of processes (default: 1)
+        ntchunk      number of time steps of time series outputs read at once (default: None, i.e. all)
+        replicates   if True, return mu* of the estimate and of all resamples instead of
+                     the measures (default: False)
+        distinct     if True, resamples drawing the same trajectories as an earlier resample
+                     (in any order) are dropped, e.g. with few trajectories, where only few distinct
+                     resamples exist: 3 for 2 trajectories, 10 for 3, 35 for 4 (default: False)
+
+
+        Output
+        ------
+        measures     array [3, 3, npara, nkeys]: first index mu*, mu, sigma;
+                     second index estimate from all trajectories, lower and upper bound
+        or if replicates
+        mustar       array [nboot+1, npara, nkeys]: first row estimate from all trajectories,
+                     other rows resamples; fewer rows if distinct
+
+
+        Examples
+        --------
+        >>> parasets = np.array([[0., 0.], [0.5, 0.], [0.5, 0.25], [1., 1.], [1., 0.75], [0.5, 0.75],
+        ...                      [0., 1.], [0., 0.5], [0.5, 0.5]])
+        >>> parachanged = np.array([0, 1, -1, 1, 0, -1, 1, 0, -1])
+        >>> out1 = parasets[:, 0]**2 - 4.*parasets[:, 1]
+        >>> measures = bootstrap_elementary_effects([out1], parasets, parachanged, 2, nboot=200, seed=1)
+        >>> print(measures[:, 0, :, 0])
+        [[ 0.83333333  4.        ]
+         [ 0.83333333 -4.        ]
+         [ 0.57735027  0.        ]]
+        >>> print(np.all(measures[:, 1] <= measures[:, 0]), np.all(measures[:, 0] <= measures[:, 2]))
+        True True
+        >>> print(np.array_equal(measures, bootstrap_elementary_effects([out1], parasets, parachanged, 2,
+        ...                                                               nboot=200, seed=1, njobs=2)))
+        True
+        >>> # one time series output: steps are split across processes
+        >>> series = out1[:, np.newaxis] * np.linspace(0., 2., 5)
+        >>> print(np.array_equal(bootstrap_elementary_effects([series], parasets, parachanged, 2, nboot=200, seed=1),
+        ...                      bootstrap_elementary_effects([series], parasets, parachanged, 2, nboot=200, seed=1,
+        ...                                                   njobs=3, ntchunk=2)))
+        True
+        >>> mustar = bootstrap_elementary_effects([out1], parasets, parachanged, 2, nboot=200, seed=1, replicates=True)
+        >>> print(mustar.shape, np.array_equal(mustar[0], measures[0, 0]))
+        (201, 2, 1) True
+        >>> # 3 trajectories allow only 10 distinct resamples
+        >>> print(bootstrap_elementary_effects([out1], parasets, parachanged, 2, nboot=200, seed=1, replicates=True,
+        ...                                    distinct=True).shape)
+        (11, 2, 1)
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    iset, ipara, dpara = trajectory_steps(parasets, parachanged)
+    parachanged = np.asarray(parachanged, dtype=int)
+    # trajectory of each step: trajectories end with -1 in parachanged
+    itraj = np.cumsum(np.concatenate(([0], parachanged[:-1] == -1)))[iset]
+    ntraj = int(np.max(itraj)) + 1 if len(iset) > 0 else 0
+
+    # multiplicities of trajectories in all resamples [nboot+1, ntraj]; first row is the estimate
+    rng     = np.random.RandomState(seed)
+    isample = rng.randint(0, ntraj, size=(nboot, ntraj))
+    weights = np.ones((nboot+1, ntraj))
+    weights[1:] = np.bincount((isample + ntraj*np.arange(nboot)[:, np.newaxis]).ravel(),
+                              minlength=nboot*ntraj).reshape(nboot, ntraj)
+    if distinct and nboot > 0:
+        # same multiplicities: same trajectories drawn
+        _, first = np.unique(weights[1:], axis=0, return_index=True)
+        weights  = np.concatenate([weights[:1], weights[1:][np.sort(first)]])
+
+    _boot.update({'outputs':outputs, 'parasets':parasets, 'iset':iset, 'ipara':ipara, 'dpara':dpara, 'itraj':itraj, 'ntraj':ntraj,
+                  'npara':npara, 'weights':weights, 'confidence':confidence, 'ntchunk':ntchunk,
+                  'replicates':replicates})
+    # changes of model outputs of blocks of steps: for time series outputs the bulk of the work,
+    # split across processes also for a single output; results do not depend on the blocks
+    nsteps = len(iset)
+    blocks = [ (int(bb[0]), int(bb[-1])+1) for bb in np.array_split(np.arange(nsteps), max(1, min(int(njobs), nsteps)))
+               if len(bb) > 0 ]
+    tasks  = [ (ikey, first, last) for ikey in range(len(outputs)) for first, last in (blocks if len(blocks) > 0 else [(0, 0)]) ]
+    try:
+        if int(njobs) > 1:
+            try:
+                context = multiprocessing.get_context('fork')
+            except AttributeError:     # Python 2 always forks
+                context = multiprocessing
+            pool = context.Pool(int(njobs))
+            try:
+                changes = pool.map(_step_changes, tasks)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            changes = [ _step_changes(task) for task in tasks ]
+        results = []
+        for ikey in range(len(outputs)):
+            parts = [ cc for tt, cc in zip(tasks, changes) if tt[0] == ikey ]
+            results.append(_bootstrap_key(np.concatenate([ pp[0] for pp in parts ]),
+                                          np.concatenate([ pp[1] for pp in parts ])))
+    finally:
+        _boot.clear()
+    return np.stack(results, axis=-1)
+
+
+def screening_agreement(mustar, cutoffs):
+    """
+        Agreement of bootstrap resamples with the screening result of all trajectories:
+        the split into informative and non-informative parameters and the parameter ranking.
+
+
+        A parameter is non-informative if its mu* of all model outputs lie below the hyperplane
+        through the cutoffs, i.e. sum_k mu*_k/cutoff_k < 1 (triangle rule of 4_derive_threshold.py).
+        The split agreement is the fraction of resamples with exactly the same set of
+        non-informative parameters as the estimate. The rank agreement is the mean Spearman
+        rank correlation between the mu* of a resample and of the estimate over all resamples
+        and model outputs. Both are 1 if the screening does not depend on the trajectories drawn.
+
+
+        Definition
+        ----------
+        def screening_agreement(mustar, cutoffs):
+
+
+        Input
+        -----
+        mustar       mu* of estimate and resamples [nboot+1, npara, nkeys]
+                     (bootstrap_elementary_effects with replicates=True)
+        cutoffs      cutoff of each model output [nkeys]
+
+
+        Output
+        ------
+        split_agreement, rank_agreement
+
+
+        Examples
+        --------
+        >>> mustar = np.array([[[4.], [1.], [0.2]], [[3.], [2.], [0.1]], [[0.5], [0.8], [2.]]])
+        >>> print(screening_agreement(mustar, [1.]))
+        (0.5, 0.0)
+        >>> print(screening_agreement(mustar[:2], [1.]))
+        (1.0, 1.0)
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    mustar  = np.where(np.isnan(mustar), 0., mustar)
+    cutoffs = np.asarray(cutoffs, dtype=float)
+    nboot   = mustar.shape[0] - 1
+    if nboot < 1:
+        return np.nan, np.nan
+
+    noninf = np.sum(mustar / cutoffs, axis=2) < 1.
+    split  = np.mean(np.all(noninf[1:] == noninf[0], axis=1))
+
+    # Spearman rank correlation with the estimate [nboot, nkeys]; one parameter is always ranked alike
+    if mustar.shape[1] < 2:
+        return float(split), 1.
+    rank = np.argsort(np.argsort(mustar, axis=1), axis=1).astype(float)
+    rank = rank - np.mean(rank, axis=1)[:, np.newaxis, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = (np.sum(rank[1:] * rank[0], axis=1) /
+                np.sqrt(np.sum(rank[1:]**2, axis=1) * np.sum(rank[0]**2, axis=0)))
+    return float(split), float(np.mean(corr))
+
+
+
+class OnlineElementaryEffects(object):
+    """
+        Online accumulator of Elementary Effects fed by model runs as they complete.
+
+
+        A step of a trajectory is evaluated as soon as the model outputs of both of its
+        parameter sets are available; outputs of a run are kept only until all steps
+        it belongs to are evaluated. For every parameter and model output the number
+        of valid steps, the sum of absolute effects (mu*) and the running mean and
+        sum of squared deviations of the signed effects (Welford) are updated, so that
+        partial estimates of mu*, mu and sigma can be queried at any time. Effects are
+        defined as in bootstrap_elementary_effects. Steps involving failed runs (None
+        or NaN outputs) are ignored.
+
+
+        Definition
+        ----------
+        class OnlineElementaryEffects(parasets, parachanged):
+
+
+        Input
+        -----
+        parasets     UNSCALED parameter sets of all trajectories [nsets, npara] (Morris M file)
+        parachanged  index of parameter changed between set i and set i+1 [nsets];
+                     -1 for the last set of a trajectory (Morris v file)
+
+
+        Methods
+        -------
+        add(iset, model)             outputs of run of parameter set iset (dictionary or None if
+                                     failed); returns number of steps evaluated with it
+        keys()                       list of output keys
+        measures(key)                partial mu*, mu, sigma and number of valid steps [npara] of key
+        write(outfile, para_name=None, wait=0.)
+                                     write partial estimates of all keys (atomically), but only if
+                                     last write is at least wait seconds ago; returns True if written
+        nsteps                       number of steps of all trajectories
+        ndone                        number of evaluated steps
+
+
+        Examples
+        --------
+        >>> parasets = np.array([[0., 0.], [0.5, 0.], [0.5, 0.25], [1., 1.], [1., 0.75], [0.5, 0.75],
+        ...                      [0., 1.], [0., 0.5], [0.5, 0.5]])
+        >>> parachanged = np.array([0, 1, -1, 1, 0, -1, 1, 0, -1])
+        >>> out1 = parasets[:, 0]**2 - 4.*parasets[:, 1]
+        >>> online = OnlineElementaryEffects(parasets, parachanged)
+        >>> for iset in [4, 0, 8, 1, 5, 7, 2, 3]:
+        ...     nnew = online.add(iset, {'out1':out1[iset], 'out2':np.outer(out1, [1., 2.])[iset]})
+        >>> print(online.ndone, online.nsteps, len(online.outputs))
+        5 6 1
+        >>> nnew = online.add(6, None)
+        >>> print(online.ndone, len(online.outputs), online.keys())
+        6 0 ['out1', 'out2']
+        >>> mustar, mu, sigma, count = online.measures('out1')
+        >>> print(mustar, mu, sigma, count)
+        [0.83333333 4.        ] [ 0.83333333 -4.        ] [0.57735027 0.        ] [3 2]
+        >>> print(online.measures('out2')[0])
+        [1.25 6.  ]
+        >>> import tempfile, shutil
+        >>> tmpdir = tempfile.mkdtemp()
+        >>> print(online.write(os.path.join(tmpdir, 'eee_online.dat')), online.write(os.path.join(tmpdir, 'eee_online.dat'), wait=60.))
+        True False
+        >>> print(open(os.path.join(tmpdir, 'eee_online.dat')).read())
+        # 6 of 6 steps of Morris trajectories evaluated
+        # model output #1: out1
+        # model output #2: out2
+        # ii     para_name    mustar(ii,jj) mu(ii,jj) sigma(ii,jj) counter(ii,jj), ii=1:2,jj=1:2
+        0   x_1   0.83333333 1.25000000   0.83333333 1.25000000   0.57735027 0.86602540   3 3
+        1   x_2   4.00000000 6.00000000   -4.00000000 -6.00000000   0.00000000 0.00000000   2 2
+        >>> shutil.rmtree(tmpdir)
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+
+    def __init__(self, parasets, parachanged):
+        self.parasets    = np.asarray(parasets, dtype=float)
+        self.parachanged = np.asarray(parachanged, dtype=int)
+        self.npara       = self.parasets.shape[1]
+        self.nsteps      = int(np.sum(self.parachanged[:-1] != -1))
+        self.ndone       = 0
+        self.outputs     = {}                   # outputs of runs needed by steps not yet evaluated
+        self.done        = np.zeros(len(self.parachanged), dtype=bool)   # step iset -> iset+1 evaluated
+        self.done[self.parachanged == -1] = True
+        self.stats       = OrderedDict()        # per key: count, sum of absolute effects, mean, M2
+        self.lastwrite   = None
+
+    def keys(self):
+        return list(self.stats.keys())
+
+    def add(self, iset, model):
+        iset = int(iset)
+        self.outputs[iset] = model if not(model is None) else {}
+        nnew = 0
+        for istep in [iset-1, iset]:
+            if istep >= 0 and not(self.done[istep]) and istep in self.outputs and istep+1 in self.outputs:
+                self._step(istep)
+                nnew += 1
+        # free outputs of runs whose steps are all evaluated
+        for irun in [iset-1, iset, iset+1]:
+            if irun in self.outputs and self.done[irun] and (irun == 0 or self.done[irun-1]):
+                del self.outputs[irun]
+        return nnew
+
+    def measures(self, key):
+        count, sabs, mean, m2 = self.stats[key]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mustar = np.where(count > 0, sabs / np.maximum(count, 1), np.nan)
+            mu     = np.where(count > 0, mean, np.nan)
+            sigma  = np.where(count > 1, np.sqrt(m2 / np.maximum(count - 1, 1)), np.nan)
+        return mustar, mu, sigma, count.copy()
+
+    def write(self, outfile, para_name=None, wait=0.):
+        if not(self.lastwrite is None) and time.time() - self.lastwrite < wait:
+            return False
+        keys  = self.keys()
+        names = para_name if not(para_name is None) else [ 'x_'+str(ipara+1) for ipara in range(self.npara) ]
+        lines = [ '# '+str(self.ndone)+' of '+str(self.nsteps)+' steps of Morris trajectories evaluated' ]
+        for ikey, key in enumerate(keys):
+            lines.append('# model output #'+str(ikey+1)+': '+key)
+        lines.append('# ii     para_name    mustar(ii,jj) mu(ii,jj) sigma(ii,jj) counter(ii,jj), ii=1:'+
+                     str(self.npara)+',jj=1:'+str(len(keys)))
+        measures = [ self.measures(key) for key in keys ]
+        for ipara in range(self.npara if len(keys) > 0 else 0):
+            cols = [ ' '.join(astr(np.array([ mm[istat][ipara] for mm in measures ], dtype=float), prec=8))
+                     for istat in range(3) ]
+            cols.append(' '.join(astr(np.array([ mm[3][ipara] for mm in measures ], dtype=int))))
+            lines.append(str(ipara)+'   '+str(names[ipara])+'   '+'   '.join(cols))
+        # readers, e.g. operators watching convergence, never see partial files
+        tmp = os.path.join(os.path.dirname(os.path.abspath(outfile)), '.'+os.path.basename(outfile)+'.'+str(os.getpid()))
+        ff = open(tmp, 'w')
+        ff.write('\n'.join(lines)+'\n')
+        ff.close()
+        os.rename(tmp, outfile)
+        self.lastwrite = time.time()
+        return True
+
+    # evaluate step istep -> istep+1: Welford update of signed effects of all keys
+    def _step(self, istep):
+        self.done[istep] = True
+        self.ndone += 1
+        ipara  = self.parachanged[istep]
+        change = self.parasets[istep+1, ipara] - self.parasets[istep, ipara]
+        out0, out1 = self.outputs[istep], self.outputs[istep+1]
+        for key in list(out0.keys()) + list(out1.keys()):
+            if not(key in self.stats):
+                self.stats[key] = [ np.zeros(self.npara, dtype=int), np.zeros(self.npara),
+                                    np.zeros(self.npara), np.zeros(self.npara) ]
+        for key in self.stats:
+            if not(key in out0 and key in out1):
+                continue
+            diff   = np.asarray(out1[key], dtype=float) - np.asarray(out0[key], dtype=float)
+            effect = np.mean(diff) / change
+            if np.isnan(effect):
+                continue
+            count, sabs, mean, m2 = self.stats[key]
+            count[ipara] += 1
+            sabs[ipara]  += np.mean(np.abs(diff)) / np.abs(change)
+            delta         = effect - mean[ipara]
+            mean[ipara]  += delta / count[ipara]
+            m2[ipara]    += delta * (effect - mean[ipara])
+
+
+def read_morris_trajectories(morris_M, morris_v, skip=None):
+    """
+        UNSCALED parameter sets and changed parameters of Morris trajectories as written
+        by 1_create_parameter_sets.py.
+
+
+        Definition
+        ----------
+        def read_morris_trajectories(morris_M, morris_v, skip=None):
+
+
+        Input
+        -----
+        morris_M     file of UNSCALED parameter sets (Morris M file)
+        morris_v     file of parameter changed between subsequent sets (Morris v file)
+
+
+        Optional Input
+        --------------
+        skip         number of header lines (default: None, i.e. read from first line '# skip: n')
+
+
+        Output
+        ------
+        parasets [nsets, npara], parachanged [nsets]
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    out = []
+    for ifile, fname in enumerate([morris_M, morris_v]):
+        ff = open(fname, 'r')
+        lines = ff.readlines()
+        ff.close()
+        nskip = int(lines[0].strip().split(':')[1]) if skip is None else int(skip)
+        if ifile == 0:
+            out.append(np.array([ list(map(float, line.strip().split())) for line in lines[nskip:] ]))
+        else:
+            out.append(np.array([ int(line.strip()) for line in lines[nskip:] ]))
+    return out[0], out[1]
+
+# data shared with forked processes of bootstrap_elementary_effects
+_boot = {}
+
+
+# absolute and signed changes of model output ikey of the steps first to last-1
+def _step_changes(task):
+    ikey, first, last = task
+    output = _boot['outputs'][ikey]
+    iset   = _boot['iset'][first:last]
+    if np.ndim(output) == 2:
+        return _mean_changes(output, iset, _boot['ntchunk'], signed=True)
+    out    = np.asarray(output[:], dtype=float)
+    signed = out[iset+1] - out[iset]
+    return np.abs(signed), signed
+
+
+# mu*, mu, sigma [3, 3, npara] of one model output from the changes of all steps: estimate,
+# lower and upper bound; mu* of estimate and all resamples [nboot+1, npara] if replicates
+def _bootstrap_key(absolute, signed):
+    iset, ipara, itraj = _boot['iset'], _boot['ipara'], _boot['itraj']
+    ntraj, npara = _boot['ntraj'], _boot['npara']
+    absolute = absolute / _boot['dpara']
+    signed   = signed / (_boot['parasets'][iset+1, ipara] - _boot['parasets'][iset, ipara])
+    valid    = ~np.isnan(signed)
+
+    # sums per trajectory and parameter [ntraj, npara]
+    cell = itraj[valid] * npara + ipara[valid]
+    sums = [ np.bincount(cell, weights=ww, minlength=ntraj*npara).reshape(ntraj, npara)
+             for ww in [ np.ones(np.sum(valid)), absolute[valid], signed[valid], signed[valid]**2 ] ]
+
+    # sums of all resamples [nboot+1, npara]
+    count, sabs, ssig, ssq = [ np.dot(_boot['weights'], ss) for ss in sums ]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mustar = sabs / count
+        mu     = ssig / count
+        sigma  = np.sqrt(np.maximum(ssq - count * mu**2, 0.) / (count - 1.))
+    sigma[count < 2] = np.nan
+    if _boot['replicates']:
+        return mustar
+    alpha = 100. * (1. - _boot['confidence']) / 2.
+    out   = np.empty((3, 3, npara))
+    for istat, stat in enumerate([mustar, mu, sigma]):
+        out[istat, 0] = stat[0]
+        if stat.shape[0] > 1:
+            with np.errstate(invalid='ignore'):
+                out[istat, 1:] = np.nanpercentile(stat[1:], [alpha, 100.-alpha], axis=0)
+        else:
+            out[istat, 1:] = np.nan
+    return out
+
+
+# mean absolute (and signed) changes over time of time series output of all steps, summed
+# time step after time step in blocks of ntchunk time steps: the running sum is carried into
+# the sequential cumulative sum of the next block, so the order of additions and hence the
+# result are the same for every ntchunk
+def _mean_changes(output, iset, ntchunk, signed=False):
+    ntime    = np.shape(output)[1]
+    nt       = ntime if ntchunk is None else max(1, int(ntchunk))
+    absolute = np.zeros(len(iset))
+    total    = np.zeros(len(iset))
+    # only the rows of the sets of these steps are read
+    first, last = (int(np.min(iset)), int(np.max(iset))+2) if len(iset) > 0 else (0, 0)
+    for it in range(0, ntime, nt):
+        out  = np.asarray(output[first:last, it:it+nt], dtype=float)
+        diff = out[iset-first+1] - out[iset-first]
+        absolute = _carry_sum(absolute, np.abs(diff))
+        if signed:
+            total = _carry_sum(total, diff)
+    if signed:
+        return absolute / ntime, total / ntime
+    return absolute / ntime
+
+
+# running sum [nsets] plus columns of block [nsets, nt] added from left to right
+def _carry_sum(carry, block):
+    return np.cumsum(np.column_stack([carry, block]), axis=1)[:, -1]
+
+# sums of non-NaN effects [len(ikeys), nsteps] per changed parameter, in order of the steps
+def _sum_effects(effects, ipara, nsteps, ee, counter, nskipped, ikeys):
+    npara = ee.shape[0]
+    for ii, ikey in enumerate(ikeys):
+        valid = ~np.isnan(effects[ii])
+        if np.all(valid):
+            ee[:, ikey]      = np.bincount(ipara, weights=effects[ii], minlength=npara)
+            counter[:, ikey] = nsteps
+        else:
+            ee[:, ikey]      = np.bincount(ipara[valid], weights=effects[ii][valid], minlength=npara)
+            counter[:, ikey] = np.bincount(ipara[valid], minlength=npara)
+            nskipped[ikey]   = np.sum(~valid)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import datetime
+from raven_staging import raven_window
+
+__all__ = ['fidelity_end', 'shorten_raven_window']
+
+
+def fidelity_end(start, end, fidelity, warmup=0):
+    """
+        End of a simulation period shortened to a fidelity level.
+
+
+        Multi-fidelity screening runs intermediate EEE iterations with shorter simulation periods:
+        the period after the warm-up is cut to the fraction fidelity of its full length,
+        the warm-up is kept. Fidelity 1 is the full period.
+
+
+        Definition
+        ----------
+        def fidelity_end(start, end, fidelity, warmup=0):
+
+
+        Input
+        -----
+        start        datetime of first simulated day
+        end          datetime of last simulated day of full period
+        fidelity     fraction of period after warm-up that is simulated, 0 < fidelity <= 1
+
+
+        Optional Input
+        --------------
+        warmup       number of warm-up days at the beginning of the period (default: 0)
+
+
+        Output
+        ------
+        datetime of last simulated day; at least one day after warm-up is simulated
+
+
+        Examples
+        --------
+        >>> print(fidelity_end(datetime.datetime(1989, 1, 1), datetime.datetime(2010, 12, 31), 0.25, warmup=730))
+        1995-12-31 00:00:00
+        >>> print(fidelity_end(datetime.datetime(1989, 1, 1), datetime.datetime(2010, 12, 31), 1.))
+        2010-12-31 00:00:00
+        >>> print(fidelity_end(datetime.datetime(2000, 7, 1), datetime.datetime(2000, 7, 7), 0.01))
+        2000-07-01 00:00:00
+        >>> fidelity_end(datetime.datetime(2000, 7, 1), datetime.datetime(2000, 7, 7), 1.5)
+        Traceback (most recent call last):
+        ...
+        ValueError: fidelity_end: fidelity must be in (0,1] but is 1.5
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    if not(0. < fidelity <= 1.):
+        raise ValueError('fidelity_end: fidelity must be in (0,1] but is '+str(fidelity))
+    if fidelity == 1.:
+        return end
+    # days of full period after warm-up, including first and last day
+    ndays = (end - start).days + 1 - warmup
+    if ndays < 1:
+        raise ValueError('fidelity_end: warm-up of '+str(warmup)+' days is longer than period '+str(start)+' to '+str(end))
+    nkeep = max(1, int(round(fidelity*ndays)))
+    return start + datetime.timedelta(days=warmup+nkeep-1)
+
+
+def shorten_raven_window(rvi, fidelity, warmup=0):
+    """
+        Raven RVI file (template) with simulation period shortened to a fidelity level.
+
+
+        :EndDate is set to the end given by fidelity_end; a :Duration is replaced by :EndDate.
+        The RVI is returned unchanged for fidelity 1.
+
+
+        Definition
+        ----------
+        def shorten_raven_window(rvi, fidelity, warmup=0):
+
+
+        Input
+        -----
+        rvi          content (template) of Raven RVI file
+        fidelity     fraction of period after warm-up that is simulated, 0 < fidelity <= 1
+
+
+        Optional Input
+        --------------
+        warmup       number of warm-up days at the beginning of the period (default: 0)
+
+
+        Output
+        ------
+        content (template) of Raven RVI file
+
+
+        Examples
+        --------
+        >>> rvi = ':StartDate   1989-01-01 00:00:00\\n:EndDate     2010-12-31 00:00:00\\n# :Duration 20819\\n'
+        >>> print(shorten_raven_window(rvi, 0.5, warmup=730), end='')
+        :StartDate   1989-01-01 00:00:00
+        :EndDate     2000-12-30 00:00:00
+        # :Duration 20819
+        >>> print(shorten_raven_window(':StartDate 1989-01-01 00:00:00\\n:Duration  365\\n', 0.5), end='')
+        :StartDate 1989-01-01 00:00:00
+        :EndDate   1989-07-02 00:00:00
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    if fidelity == 1.:
+        return rvi
+    start, end = raven_window(rvi)
+    end = fidelity_end(start, end, fidelity, warmup=warmup)
+    lines = rvi.split('\n')
+    for iline, line in enumerate(lines):
+        words = line.split('#')[0].split()
+        if len(words) > 1 and words[0] in [':EndDate', ':Duration']:
+            # keep alignment of value column
+            value = line.index(words[1], len(line)-len(line.lstrip())+len(words[0]))
+            lines[iline] = ':EndDate'.ljust(value) + end.strftime('%Y-%m-%d %H:%M:%S')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
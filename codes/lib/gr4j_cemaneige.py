@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import calendar
+import datetime
+import numpy as np
+
+__all__ = ['gr4j_cemaneige', 'hargreaves_pet', 'gr4j_unit_hydrographs']
+
+
+def gr4j_cemaneige(paras, rainfall, snowfall, tmin, tmax, pet, owpet=None, area=None, nstore=None):
+    """
+        Vectorized emulation of the GR4J hydrologic model with CemaNeige snow module as set up
+        in the Raven example raven-gr4j-cemaneige, stepping many parameter sets through time at once.
+
+
+        All parameter sets are advanced time step by time step as arrays so that the cost of
+        the Python loop over time is shared by all runs. The model follows the processes of the
+        Raven emulation (examples/raven-gr4j-cemaneige/model/raven_templates.py) in their order
+        (:Method ORDERED_SERIES) with one HRU whose elevation is the gauge elevation (i.e. no
+        orographic corrections) and daily time steps:
+
+            snow         rain/snow partitioning of rainfall+snowfall (RAINSNOW_DINGMAN) with
+                         transition temperature x08 between daily minimum and maximum;
+                         degree-day melt x07*T if T > 0 and the snow temperature at the start
+                         of the time step is 0, limited by the snow pack and scaled by
+                         0.9*min(G/x05,1)+0.1; snow temperature eTG += (1-x06)*(T-eTG), eTG <= 0
+            production   evaporation of rain and melt (ponded water) up to the open-water PET
+                         owpet, infiltration Ps of the rest, soil evaporation Es of the
+                         production store with capacity X1 = 1000*x01 mm driven by the PET left
+                         after evaporation of ponded water, percolation
+            routing      90%/10% split to unit hydrographs UH1/UH2 with base time x04,
+                         groundwater exchange x02*min(R/x03,1)^3.5 from the routing store after
+                         adding the output of UH1 and again from the output of UH2,
+                         routing store with capacity x03; exchange losses go to the groundwater
+                         store of Raven (soil layer of 1 m) and stop when it holds 1000 mm
+
+        Initial states are a half-full production store, 15 mm in the routing store and no snow.
+        Discharge is the mean of the outflows at the start and at the end of each time step,
+        as written by Raven to Hydrographs.csv.
+
+        The RVI sets only :Evaporation PET_DATA so that Raven evaporates ponded water with its
+        default open-water PET, PET_HARGREAVES_1985 (see hargreaves_pet).
+
+        The emulation reproduces Raven v4.12.1 to the 6 significant digits of Hydrographs.csv
+        for the reference hydrographs of four parameter sets in
+        examples/raven-gr4j-cemaneige/model/data_ref (see last example). The default parameters
+        of parameters.dat give a KGE of 0.852 for the Salmon River 1991-2010 with Raven v4.12.1;
+        the KGE 0.846 noted in parameters.dat was obtained with the bundled macOS executable of
+        Raven rev373, which cannot be run for comparison.
+
+
+        Definition
+        ----------
+        def gr4j_cemaneige(paras, rainfall, snowfall, tmin, tmax, pet, owpet=None, area=None, nstore=None):
+
+
+        Input
+        -----
+        paras        parameter sets [nruns, 9] or [9] in the order of parameters.dat:
+                     x01 GR4J_X1 [m], x02 GR4J_X2 [mm/d], x03 GR4J_X3 [mm], x04 GR4J_X4 [d],
+                     x05 CEMANEIGE_X1 (average annual snow) [mm], x06 CEMANEIGE_X2 [-],
+                     x07 MELT_FACTOR [mm/d/C], x08 rain/snow transition temperature [C],
+                     x09 rain/snow transition range [C] (not used by RAINSNOW_DINGMAN)
+        rainfall     daily rainfall [ntime] in mm/d
+        snowfall     daily snowfall [ntime] in mm/d
+        tmin         daily minimum temperature [ntime] in C
+        tmax         daily maximum temperature [ntime] in C
+        pet          daily potential evapotranspiration [ntime] in mm/d
+
+
+        Optional Input
+        --------------
+        owpet        daily open-water potential evapotranspiration [ntime] in mm/d,
+                     e.g. of hargreaves_pet as in Raven (default: None, i.e. pet)
+        area         catchment area in km2: discharge in m3/s instead of mm/d (default: None)
+        nstore       number of first time steps for which discharge is not returned,
+                     e.g. warm-up (default: None, i.e. all time steps)
+
+
+        Output
+        ------
+        discharge [nruns, ntime-nstore] (or [ntime-nstore] for one parameter set) in mm/d or m3/s
+
+
+        Examples
+        --------
+        >>> ntime = 730
+        >>> tt    = np.arange(ntime)
+        >>> tmean = -10.*np.cos(2.*np.pi*tt/365.)
+        >>> rain  = np.where(tt % 7 == 0, 10., 0.)
+        >>> snow  = np.zeros(ntime)
+        >>> pet   = np.maximum(0.2*tmean, 0.)
+        >>> paras = np.array([[0.35, -1.0, 100., 2.2, 15., 0.4, 3.0, 0.0, 1.0],
+        ...                   [0.70,  0.5, 300., 5.5, 25., 0.8, 5.0, 1.0, 2.0]])
+        >>> q = gr4j_cemaneige(paras, rain, snow, tmean-3., tmean+3., pet)
+        >>> print(q.shape, np.all(q >= 0.))
+        (2, 730) True
+        >>> print(np.round(q[:, -1], 4))
+        [0.1406 0.3562]
+        >>> # every parameter set gives the same as when run alone
+        >>> print(np.allclose(gr4j_cemaneige(paras[1], rain, snow, tmean-3., tmean+3., pet), q[1]))
+        True
+        >>> print(gr4j_cemaneige(paras, rain, snow, tmean-3., tmean+3., pet, area=4250.6, nstore=365).shape)
+        (2, 365)
+
+        >>> # Salmon River 1991-2010: parity with the reference hydrographs of Raven v4.12.1
+        >>> import os, datetime
+        >>> from raven_output import read_raven_multidata, read_raven_observations
+        >>> from metrics import kge
+        >>> model   = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'examples',
+        ...                        'raven-gr4j-cemaneige', 'model')
+        >>> forcing = read_raven_multidata(os.path.join(model, 'data_obs', 'Salmon-River-Near-Prince-George_meteo_daily.rvt'))
+        >>> start   = datetime.datetime(1989, 1, 1)
+        >>> ifirst  = (start - forcing['start']).days
+        >>> nsteps  = (datetime.datetime(2010, 12, 31) - start).days
+        >>> meteo   = [ forcing['data'][ff][ifirst:ifirst+nsteps]
+        ...             for ff in ['RAINFALL', 'SNOWFALL', 'TEMP_DAILY_MIN', 'TEMP_DAILY_MAX', 'PET'] ]
+        >>> owpet   = hargreaves_pet(meteo[2], meteo[3], 54.4848, start)
+        >>> ref     = os.path.join(model, 'data_ref', 'Salmon-River-Near-Prince-George_Q_raven-v4.12.1.csv')
+        >>> paras   = [ ll.split(':')[1].split('#')[0].split() for ll in open(ref) if ll.startswith('# set_') ]
+        >>> raven   = np.loadtxt(ref, delimiter=',', skiprows=len(paras)+3, usecols=range(1, len(paras)+1)).T
+        >>> q       = gr4j_cemaneige(np.array(paras, dtype=float), *meteo, owpet=owpet, area=4250.6, nstore=2*365-1)
+        >>> print(q.shape == raven.shape, np.max(np.abs(q - raven) / np.max(raven, axis=1)[:, np.newaxis]) < 1e-5)
+        True True
+        >>> # Raven compares the discharge of a time step with the observation of its first day
+        >>> qobs    = read_raven_observations(os.path.join(model, 'data_obs', 'Salmon-River-Near-Prince-George_Qobs_daily.rvt'))
+        >>> iobs    = (datetime.datetime(1990, 12, 31) - qobs['start']).days
+        >>> print(np.round(kge(q, qobs['values'][iobs:iobs+q.shape[1]]), 4))
+        [0.8522 0.3914 0.1352 0.2795]
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+        Modified, JM, Oct 2026 - open-water evaporation, snow cover, exchange and discharge as in Raven
+    """
+    paras  = np.asarray(paras, dtype=float)
+    single = (paras.ndim == 1)
+    paras  = np.atleast_2d(paras)
+    nruns  = paras.shape[0]
+    ntime  = np.size(rainfall)
+    nstore = 0 if nstore is None else int(nstore)
+
+    x1     = paras[:, 0] * 1000.     # production store capacity [mm] = soil layer thickness [m] with porosity 1
+    x2     = paras[:, 1]
+    x3     = paras[:, 2]
+    x4     = paras[:, 3]
+    gthres = paras[:, 4]            # snow pack above which the whole area is snow covered (Raven: not 0.9*x05)
+    ctg    = 1. - paras[:, 5]       # AirSnowCoeff
+    kf     = paras[:, 6]
+    trs    = paras[:, 7]
+    gwmax  = 1000.                  # groundwater store [mm] = soil layer of 1 m with porosity 1
+
+    prod = 0.5 * x1                 # states
+    rout = np.full(nruns, 15.)
+    snow = np.zeros(nruns)
+    etg  = np.zeros(nruns)
+    gw   = np.zeros(nruns)
+
+    precip = np.asarray(rainfall, dtype=float) + np.asarray(snowfall, dtype=float)
+    tmin   = np.asarray(tmin, dtype=float)
+    tmax   = np.asarray(tmax, dtype=float)
+    tmean  = 0.5 * (tmin + tmax)
+    pet    = np.asarray(pet, dtype=float)
+    owpet  = pet if owpet is None else np.asarray(owpet, dtype=float)
+
+    # snow and production store; the effective rainfall pr does not depend on the routing
+    pr = np.empty((ntime, nruns))
+    for it in range(ntime):
+        # rain/snow partitioning (Dingman), melt with the snow temperature at the start of
+        # the time step and snow temperature (CemaNeige)
+        if tmax[it] <= tmin[it]:
+            fsnow = np.where(tmean[it] <= trs, 1., 0.)
+        else:
+            fsnow = np.minimum(np.maximum((trs - tmin[it]) / (tmax[it] - tmin[it]), 0.), 1.)
+        snow += fsnow * precip[it]
+        if tmean[it] > 0.:
+            potmelt = np.where(etg >= 0., np.minimum(snow, kf * tmean[it]), 0.)
+            melt    = potmelt * (0.9 * np.minimum(snow / gthres, 1.) + 0.1)
+            snow   -= melt
+        else:
+            melt    = 0.
+        etg  = np.minimum(etg + ctg * (tmean[it] - etg), 0.)
+        pliq = (1. - fsnow) * precip[it] + melt
+
+        # evaporation of ponded water, infiltration, soil evaporation with the PET left, percolation
+        ew   = np.minimum(pliq, owpet[it])
+        pn   = pliq - ew
+        sr   = prod / x1
+        tpn  = np.tanh(pn / x1)
+        ps   = x1 * (1. - sr * sr) * tpn / (1. + sr * tpn)
+        prod = prod + ps
+        sr   = prod / x1
+        ten  = np.tanh(np.maximum(pet[it] - ew, 0.) / x1)
+        prod = prod - prod * (2. - sr) * ten / (1. + (1. - sr) * ten)
+        sr   = 4./9. * prod / x1
+        sr   = sr * sr
+        perc = prod * (1. - 1. / np.sqrt(np.sqrt(1. + sr * sr)))     # sqrt is much faster than power
+        prod = prod - perc
+        pr[it] = perc + pn - ps
+
+    # unit hydrographs UH1 and UH2 of 90% and 10% of effective rainfall: ordinates in reversed
+    # time order [nlag, nruns] applied to the window of the last nlag time steps of pr
+    uh1, uh2 = gr4j_unit_hydrographs(x4)
+    nlag = uh1.shape[1]
+    uh1  = np.ascontiguousarray(0.9 * uh1[:, ::-1].T)
+    uh2  = np.ascontiguousarray(0.1 * uh2[:, ::-1].T)
+    pr   = np.vstack((np.zeros((nlag-1, nruns)), pr))
+
+    # groundwater exchange and routing store; discharge is the mean of the outflows qlast and
+    # qout at the start and end of the time step
+    qlast = np.zeros(nruns)
+    q = np.empty((ntime-nstore, nruns))
+    for it in range(ntime):
+        q9   = np.einsum('ij,ij->j', uh1, pr[it:it+nlag])
+        q1   = np.einsum('ij,ij->j', uh2, pr[it:it+nlag])
+        rout = rout + q9
+        rx   = np.minimum(rout / x3, 1.)
+        loss = np.minimum(np.minimum(-x2 * rx * rx * rx * np.sqrt(rx), rout), gwmax - gw)
+        rout = rout - loss
+        gw   = gw + loss
+        rx   = np.minimum(rout / x3, 1.)
+        loss = np.minimum(np.minimum(-x2 * rx * rx * rx * np.sqrt(rx), q1), gwmax - gw)
+        q1   = q1 - loss
+        gw   = gw + loss
+        rx   = rout / x3
+        rx   = rx * rx
+        qr   = rout * (1. - 1. / np.sqrt(np.sqrt(1. + rx * rx)))
+        rout = rout - qr
+        qout = qr + q1
+        if it >= nstore:
+            q[it-nstore] = 0.5 * (qlast + qout)
+        qlast = qout
+    q = np.ascontiguousarray(q.T)
+
+    if not(area is None):
+        q *= area / 86.4            # mm/d -> m3/s
+    if single:
+        return q[0]
+    return q
+
+
+def hargreaves_pet(tmin, tmax, latitude, start):
+    """
+        Daily potential evapotranspiration of Hargreaves and Samani (1985) as calculated by Raven
+        (PET_HARGREAVES_1985) from daily temperatures and the extraterrestrial radiation on flat
+        ground, e.g. the open-water PET of the Raven example raven-gr4j-cemaneige.
+
+
+        Definition
+        ----------
+        def hargreaves_pet(tmin, tmax, latitude, start):
+
+
+        Input
+        -----
+        tmin         daily minimum temperature [ntime] in C
+        tmax         daily maximum temperature [ntime] in C
+        latitude     latitude of the HRU in degrees
+        start        datetime of the first day
+
+
+        Output
+        ------
+        potential evapotranspiration [ntime] in mm/d
+
+
+        Examples
+        --------
+        >>> import datetime
+        >>> # open-water PET of Raven for the first days of the Salmon River example
+        >>> tmin = np.array([-16.6807, -16.7675, -9.20294])
+        >>> tmax = np.array([-6.92682, -5.086, -1.18506])
+        >>> print(np.round(hargreaves_pet(tmin, tmax, 54.4848, datetime.datetime(1989, 1, 1)), 4))
+        [0.089  0.1127 0.173 ]
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    tmin  = np.asarray(tmin, dtype=float)
+    tmax  = np.asarray(tmax, dtype=float)
+    days  = [ start + datetime.timedelta(days=ii) for ii in range(np.size(tmin)) ]
+    # day angle at noon, solar declination and eccentricity correction of Raven
+    angle = np.array([ 2. * np.pi * (dd.timetuple().tm_yday - 0.5) / (366. if calendar.isleap(dd.year) else 365.)
+                       for dd in days ])
+    decl  = 0.40928 * np.sin(angle - 1.384)
+    ecc   = (1.000110 + 0.034221 * np.cos(angle) + 0.001280 * np.sin(angle) +
+             0.000719 * np.cos(2. * angle) + 0.000077 * np.sin(2. * angle))
+    lat   = np.deg2rad(latitude)
+    ws    = np.arccos(np.minimum(np.maximum(-np.tan(decl) * np.tan(lat), -1.), 1.))    # sunset hour angle
+    etrad = 118.1 / np.pi * ecc * (ws * np.sin(decl) * np.sin(lat) + np.cos(decl) * np.cos(lat) * np.sin(ws))
+    return np.maximum(0.0023 * etrad / 2.501 * np.sqrt(np.maximum(tmax - tmin, 0.)) * (0.5 * (tmin + tmax) + 17.8), 0.)
+
+
+def gr4j_unit_hydrographs(x4):
+    """
+        Ordinates of the GR4J unit hydrographs UH1 (base time x4) and UH2 (base time 2*x4)
+        of daily time steps.
+
+
+        Definition
+        ----------
+        def gr4j_unit_hydrographs(x4):
+
+
+        Input
+        -----
+        x4           base times [nruns] in days
+
+
+        Output
+        ------
+        uh1, uh2     ordinates [nruns, n] padded with zeros to the longest base time; rows sum to 1
+
+
+        Examples
+        --------
+        >>> uh1, uh2 = gr4j_unit_hydrographs(np.array([1.5, 2.0]))
+        >>> print(np.round(uh1, 4))
+        [[0.3629 0.6371 0.     0.    ]
+         [0.1768 0.8232 0.     0.    ]]
+        >>> print(np.round(uh2.sum(axis=1), 12))
+        [1. 1.]
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    x4 = np.asarray(x4, dtype=float)[:, np.newaxis]
+    nn = int(np.ceil(2. * np.max(x4)))
+    tt = np.arange(nn+1, dtype=float)[np.newaxis, :]
+    sh1 = np.where(tt < x4, (np.minimum(tt, x4) / x4)**2.5, 1.)
+    tr  = np.minimum(tt / x4, 2.)
+    sh2 = np.where(tr <= 1., 0.5 * tr**2.5, 1. - 0.5 * (2. - tr)**2.5)
+    return np.diff(sh1, axis=1), np.diff(sh2, axis=1)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
@@ -0,0 +1,495 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import itertools
+import os
+import pickle
+import socket
+import threading
+import time
+import uuid
+
+from model_process import call_with_retries
+
+__all__ = ['JobQueue', 'queue_worker']
+
+# number of claims of this process: unique worker token of every claim
+_nclaim = itertools.count(1)
+
+
+class JobQueue(object):
+    """
+        Job queue of model runs in a directory, e.g. on a file system shared by several nodes.
+
+
+        Every job is one parameter set (one line of the parameter set file) stored
+        as a file in one of the sub-directories
+
+            todo/       jobs waiting for a worker
+            running/    jobs claimed by a worker
+            done/       results of finished jobs (pickled dictionary of model outputs)
+            failed/     tracebacks of jobs whose model run raised an exception (pickled list)
+
+        Jobs move between these directories with atomic renames so that any number
+        of workers on any number of nodes can pull jobs without further locking.
+        A worker holds a lease on its running job by updating the modification time
+        of the job file regularly. Jobs whose lease expired, e.g. because the worker
+        or its node died, are put back into todo/ by the next worker asking for a job
+        or by the master collecting the results.
+
+        Job files are named <ijob>.<epoch> in todo/ and <ijob>.<epoch>.<worker> otherwise.
+        The epoch is drawn anew by every submit and stored next to the number of jobs
+        so that files of earlier queues are never taken for jobs of the current queue.
+        The worker token identifies the claim: a worker completes a job only if it
+        still owns the running file of its claim, which it takes over with an atomic
+        rename. A worker whose job was requeued, e.g. because it stalled longer than
+        the lease, or whose queue was replaced by a new submit, can hence neither
+        remove the running file of the new owner nor store stale results.
+
+
+        Definition
+        ----------
+        class JobQueue(qdir, lease=600., poll=1.):
+
+
+        Input
+        -----
+        qdir         queue directory; created if it does not exist
+
+
+        Optional Input
+        --------------
+        lease        seconds after which a running job without heartbeat of its worker
+                     is requeued (default: 600)
+        poll         seconds between checks for new jobs or results (default: 1)
+
+
+        Methods
+        -------
+        submit(parasets, ijobs=None)
+                                (master) clear queue and submit one job per parameter set (string or list of floats);
+                                jobs are numbered by ijobs, e.g. rows of the parameter set file (default: 0, 1, ...)
+        collect(allow_failed=False)
+                                (master) generator of (ijob, result) until all jobs are finished;
+                                raises ValueError if a job failed unless allow_failed, then result is None
+        errors(ijob)            list of tracebacks of all attempts of failed job
+        claim()                 (worker) next job as (ijob, paraset) or None if no job is waiting
+        heartbeat(ijob)         (worker) renew lease of running job
+        complete(ijob, result)  (worker) store result of claimed job;
+                                returns False and discards result if the claim is no longer owned
+        fail(ijob, errors)      (worker) store list of tracebacks of claimed job; returns False as complete
+        requeue_expired()       put running jobs with expired lease back to todo; returns number of jobs
+        status()                dictionary with number of jobs 'todo', 'running', 'done', 'failed' and 'njobs'
+        finished()              True if all submitted jobs are done or failed
+
+
+        Examples
+        --------
+        >>> import tempfile, shutil
+        >>> qdir = os.path.join(tempfile.mkdtemp(), 'queue')
+        >>> jq = JobQueue(qdir, lease=60., poll=0.01)
+        >>> jq.submit(['1.0 2.0', '3.0 4.0', [5.0, 6.0]])
+        >>> print(jq.status())
+        {'njobs': 3, 'todo': 3, 'running': 0, 'done': 0, 'failed': 0}
+
+        >>> # a worker claims a job and dies without completing it
+        >>> print(jq.claim())
+        (0, [1.0, 2.0])
+        >>> print(jq.status()['running'], jq.requeue_expired())
+        1 0
+        >>> jq.lease = 0.
+        >>> print(jq.requeue_expired(), jq.status()['todo'])
+        1 3
+        >>> jq.lease = 60.
+
+        >>> # the stalled worker wakes up after another worker claimed its job again
+        >>> other = JobQueue(qdir, lease=60., poll=0.01)
+        >>> print(other.claim())
+        (0, [1.0, 2.0])
+        >>> print(jq.complete(0, {'sum': -1.}), jq.status()['done'], jq.status()['running'])
+        False 0 1
+        >>> jq.lease = 0.
+        >>> print(jq.requeue_expired())
+        1
+        >>> jq.lease = 60.
+        >>> print(other.fail(0, ['stale']), jq.status()['failed'], jq.status()['todo'])
+        False 0 3
+
+        >>> # claims of an earlier queue are void after a new submit; a worker walks its
+        >>> # listing of todo/ first, so the requeued job 0 comes after the jobs listed before
+        >>> print(other.claim())
+        (1, [3.0, 4.0])
+        >>> jq.submit(['1.0 2.0', '3.0 4.0', [5.0, 6.0]])
+        >>> print(other.complete(1, {'sum': -1.}), jq.status())
+        False {'njobs': 3, 'todo': 3, 'running': 0, 'done': 0, 'failed': 0}
+
+        >>> # three localhost workers run all jobs
+        >>> import multiprocessing
+        >>> def model(ijob, paraset):
+        ...     return {'sum': sum(paraset), 'pid': os.getpid()}
+        >>> workers = [ multiprocessing.Process(target=queue_worker, args=(qdir, model), kwargs={'poll':0.01})
+        ...             for ii in range(3) ]
+        >>> for ww in workers: ww.start()
+        >>> results = dict(jq.collect())
+        >>> for ww in workers: ww.join()
+        >>> print([ results[ijob]['sum'] for ijob in sorted(results) ], jq.finished())
+        [3.0, 7.0, 11.0] True
+
+        >>> # failed jobs are reported by the master
+        >>> def crash(ijob, paraset):
+        ...     if ijob == 1:
+        ...         raise ValueError('model crashed')
+        ...     return {'sum': sum(paraset)}
+        >>> jq.submit(['1.0 2.0', '3.0 4.0'])
+        >>> print(queue_worker(qdir, crash, poll=0.01))
+        2
+        >>> results = dict(jq.collect())
+        Traceback (most recent call last):
+        ...
+        ValueError: JobQueue: 1 job(s) failed, e.g. job 1: ...
+        >>> results = dict(jq.collect(allow_failed=True))
+        >>> print(results[0], results[1], jq.errors(1)[-1].splitlines()[-1])
+        {'sum': 3.0} None ValueError: model crashed
+
+        >>> # jobs numbered by rows of the parameter set file, e.g. second chunk of rows
+        >>> jq.submit(['1.0 2.0', '3.0 4.0'], ijobs=[2, 3])
+        >>> print(queue_worker(qdir, lambda ijob, paraset: {'row': ijob}, poll=0.01), sorted(dict(jq.collect()).items()))
+        2 [(2, {'row': 2}), (3, {'row': 3})]
+
+        >>> # Clean up doctest
+        >>> shutil.rmtree(os.path.dirname(qdir))
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+
+    def __init__(self, qdir, lease=600., poll=1.):
+        self.qdir  = os.path.abspath(qdir)
+        self.lease = float(lease)
+        self.poll  = float(poll)
+        # running files of the claims of this worker
+        self._claims = {}
+        # listing of todo/ walked by successive claims, and its epoch
+        self._todo   = []
+        self._tepoch = None
+        # files of failed jobs of the last poll of collect
+        self._failed = {}
+        self._worker = socket.gethostname().split('.')[0]+'-'+str(os.getpid())
+        for dd in ['todo', 'running', 'done', 'failed']:
+            try:
+                os.makedirs(os.path.join(self.qdir, dd))
+            except OSError:     # exists, e.g. created by another worker at the same time
+                if not os.path.isdir(os.path.join(self.qdir, dd)):
+                    raise
+
+    # ---------------
+    # master
+    # ---------------
+    def submit(self, parasets, ijobs=None):
+        if ijobs is None:
+            ijobs = range(len(parasets))
+        if len(ijobs) != len(parasets) or len(set(ijobs)) != len(parasets):
+            raise ValueError('JobQueue: need one unique job number per parameter set')
+        if os.path.exists(self._file('njobs')):
+            os.remove(self._file('njobs'))
+        for dd in ['todo', 'running', 'done', 'failed']:
+            for ff in os.listdir(os.path.join(self.qdir, dd)):
+                self._remove(os.path.join(self.qdir, dd, ff))
+        epoch = uuid.uuid4().hex[:12]
+        for ijob, paraset in zip(ijobs, parasets):
+            if not isinstance(paraset, str):
+                paraset = ' '.join([ repr(float(pp)) for pp in paraset ])
+            _atomic_write(self._file('todo', ijob, epoch), paraset.strip()+'\n')
+        # written last: workers start only on complete queues
+        _atomic_write(self._file('njobs'), str(len(parasets))+' '+epoch+'\n')
+
+    def collect(self, allow_failed=False):
+        header    = self._header()
+        njobs     = int(header[0])
+        epoch     = header[1]
+        collected = set()
+        while len(collected) < njobs:
+            # done/ and failed/ are listed once per poll
+            done = self._listing('done', epoch)
+            self._failed = self._listing('failed', epoch)
+            new  = [ ijob for ijob in sorted(done) if not(ijob in collected) ]
+            for ijob in new:
+                ff = open(done[ijob][0], 'rb')
+                result = pickle.load(ff)
+                ff.close()
+                collected.add(ijob)
+                yield ijob, result
+            failed = [ ijob for ijob in sorted(self._failed) if not(ijob in collected) ]
+            if allow_failed:
+                for ijob in failed:
+                    collected.add(ijob)
+                    yield ijob, None
+            elif len(failed) > 0 and len(collected) + len(failed) >= njobs:
+                message = self.errors(failed[0])[-1].strip().splitlines()
+                raise ValueError('JobQueue: '+str(len(failed))+' job(s) failed, e.g. job '+str(failed[0])+': '+
+                                 (message[-1] if len(message) > 0 else ''))
+            if len(new) == 0 and (len(failed) == 0 or not allow_failed):
+                self.requeue_expired()
+                time.sleep(self.poll)
+
+    # ---------------
+    # worker
+    # ---------------
+    def claim(self):
+        self.requeue_expired()
+        epoch = self._epoch()
+        if epoch is None:
+            return None
+        # todo/ is listed once and walked by the following claims; it is listed again
+        # if the listing is used up, e.g. by other workers, or belongs to an earlier queue
+        if self._tepoch != epoch:
+            self._todo, self._tepoch = [], epoch
+        for relist in [False, True]:
+            if relist or len(self._todo) == 0:
+                self._todo = sorted(self._listing('todo', epoch), reverse=True)
+            while len(self._todo) > 0:
+                ijob = self._todo.pop()
+                todo = self._file('todo', ijob, epoch)
+                running = self._file('running', ijob, epoch, self._worker+'-'+str(next(_nclaim)))
+                try:
+                    # fresh modification time before rename: lease starts when job is claimed
+                    os.utime(todo, None)
+                    os.rename(todo, running)
+                except OSError:     # claimed by another worker
+                    continue
+                ff = open(running, 'r')
+                paraset = list(map(float, ff.read().strip().split()))
+                ff.close()
+                self._claims[ijob] = running
+                return ijob, paraset
+        return None
+
+    def errors(self, ijob):
+        fname = self._failed.get(ijob, [None])[0]
+        if fname is None or not os.path.exists(fname):
+            fname = self._files('failed', ijob)[0]
+        ff = open(fname, 'rb')
+        errors = pickle.load(ff)
+        ff.close()
+        return errors
+
+    def heartbeat(self, ijob):
+        try:
+            os.utime(self._claims[ijob], None)
+        except (KeyError, OSError):     # requeued or completed meanwhile
+            pass
+
+    def complete(self, ijob, result):
+        return self._finish('done', ijob, result)
+
+    def fail(self, ijob, errors):
+        return self._finish('failed', ijob, list(errors))
+
+    # ---------------
+    # both
+    # ---------------
+    def requeue_expired(self):
+        now   = time.time()
+        epoch = self._epoch()
+        njobs = 0
+        for ff in os.listdir(self._file('running')):
+            running = os.path.join(self._file('running'), ff)
+            name    = _parse(ff)
+            if name is None:
+                continue
+            if name[1] != epoch:    # left over from an earlier queue
+                self._remove(running)
+                continue
+            try:
+                if now - os.stat(running).st_mtime > self.lease:
+                    os.rename(running, self._file('todo', name[0], epoch))
+                    njobs += 1
+            except OSError:     # completed or requeued meanwhile
+                pass
+        return njobs
+
+    def njobs(self):
+        njobs = self._header()
+        return None if njobs is None else int(njobs[0])
+
+    def status(self):
+        status = {'njobs': self.njobs()}
+        for dd in ['todo', 'running', 'done', 'failed']:
+            status[dd] = len(self._jobs(dd))
+        return status
+
+    def finished(self):
+        njobs = self.njobs()
+        if njobs is None:
+            return False
+        return len(set(self._jobs('done') + self._jobs('failed'))) >= njobs
+
+    # Store result of claimed job if running file is still owned by this worker
+    def _finish(self, dd, ijob, result):
+        running = self._claims.pop(ijob, None)
+        if running is None:
+            return False
+        # taking over the running file is atomic: fails if the job was requeued or resubmitted meanwhile;
+        # the new name keeps the job visible to requeue_expired should this worker die before storing
+        finishing = running+'.'+dd
+        try:
+            os.rename(running, finishing)
+        except OSError:
+            return False
+        _atomic_write(self._file(dd, ijob, *_parse(os.path.basename(running))[1:]), pickle.dumps(result), mode='wb')
+        self._remove(finishing)
+        return True
+
+    # Number of jobs and epoch of current queue or None
+    def _header(self):
+        try:
+            ff = open(self._file('njobs'), 'r')
+        except IOError:
+            return None
+        header = ff.read().split()
+        ff.close()
+        return header if len(header) == 2 else None
+
+    def _epoch(self):
+        header = self._header()
+        return None if header is None else header[1]
+
+    def _file(self, dd, ijob=None, epoch=None, worker=None):
+        if ijob is None:
+            return os.path.join(self.qdir, dd)
+        return os.path.join(self.qdir, dd, '.'.join([ '{:08d}'.format(ijob), epoch ] + ([] if worker is None else [worker])))
+
+    # Files of job in directory dd of current queue
+    def _files(self, dd, ijob):
+        return self._listing(dd).get(ijob, [])
+
+    # Sorted job numbers in directory dd of current queue
+    def _jobs(self, dd):
+        return sorted(self._listing(dd))
+
+    # Dictionary of job number to sorted files of job in directory dd of queue epoch (default: current)
+    def _listing(self, dd, epoch=None):
+        if epoch is None:
+            epoch = self._epoch()
+        jobs = {}
+        for ff in os.listdir(os.path.join(self.qdir, dd)):
+            name = _parse(ff)
+            if not(name is None) and name[1] == epoch:
+                jobs.setdefault(name[0], []).append(os.path.join(self.qdir, dd, ff))
+        for ijob in jobs:
+            jobs[ijob].sort()
+        return jobs
+
+    def _remove(self, fname):
+        try:
+            os.remove(fname)
+        except OSError:
+            pass
+
+
+def queue_worker(qdir, model_function, lease=600., poll=1., wait=False, retries=0, delay=0.):
+    """
+        Worker daemon pulling jobs from a JobQueue and running them with model_function.
+
+
+        The worker renews the lease of its running job in a background thread every
+        lease/4 seconds. Exceptions of model_function are stored as failed jobs and
+        the worker continues with the next job.
+
+
+        Definition
+        ----------
+        def queue_worker(qdir, model_function, lease=600., poll=1., wait=False, retries=0, delay=0.):
+
+
+        Input
+        -----
+        qdir             queue directory of JobQueue
+        model_function   function(ijob, paraset) returning dictionary of model outputs
+
+
+        Optional Input
+        --------------
+        lease            see JobQueue (default: 600)
+        poll             seconds between checks for new jobs (default: 1)
+        wait             True:  keep waiting for new queues after all jobs are finished
+                         False: return when all jobs of the queue are finished (default)
+        retries          number of retries of a failed job (default: 0)
+        delay            seconds before first retry, doubled for every further retry (default: 0)
+
+
+        Output
+        ------
+        number of jobs run by this worker
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    jq     = JobQueue(qdir, lease=lease, poll=poll)
+    worker = jq._worker
+    nrun   = 0
+    while True:
+        job = jq.claim() if not(jq.njobs() is None) else None
+        if job is None:
+            if jq.finished() and not wait:
+                return nrun
+            time.sleep(poll)
+            continue
+
+        ijob, paraset = job
+        stop  = threading.Event()
+        pulse = threading.Thread(target=_heartbeat, args=(jq, ijob, stop))
+        pulse.daemon = True
+        pulse.start()
+        result, errors = call_with_retries(lambda: model_function(ijob, paraset), retries=retries, delay=delay)
+        stop.set()
+        pulse.join()
+        if result is None:
+            jq.fail(ijob, [ 'worker '+worker+'\n'+ee for ee in errors ])
+        else:
+            jq.complete(ijob, result)
+        nrun += 1
+
+
+# Renew lease of running job until stop is set
+def _heartbeat(jq, ijob, stop):
+    while not stop.wait(jq.lease/4.):
+        jq.heartbeat(ijob)
+
+
+# Job number, epoch and worker token of file name; None for other files
+def _parse(fname):
+    name = fname.split('.')
+    if not(name[0].isdigit()) or len(name) < 2:
+        return None
+    return int(name[0]), name[1], (name[2] if len(name) > 2 else None)
+
+
+# Write file via temporary file and rename so that readers never see partial files
+def _atomic_write(fname, content, mode='w'):
+    tmp = os.path.join(os.path.dirname(fname), '.'+os.path.basename(fname)+'.'+socket.gethostname()+'.'+str(os.getpid()))
+    ff = open(tmp, mode)
+    ff.write(content)
+    ff.close()
+    os.rename(tmp, fname)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import numpy as np
+
+__all__ = ['nse', 'lognse', 'kge', 'pbias', 'rmse', 'mae', 'metric_functions', 'calc_metrics']
+
+
+def nse(sim, obs):
+    """
+        Nash-Sutcliffe efficiency of one or many simulated time series.
+
+
+        All metrics of this module are vectorized over model runs: sim can hold many
+        runs (one per row) that are all compared with the same observations. Time steps
+        with missing observations (NaN) are skipped. Runs with NaN simulations
+        (e.g. failed model runs) get NaN.
+
+
+        Definition
+        ----------
+        def nse(sim, obs):
+
+
+        Input
+        -----
+        sim          simulated time series [ntime] or [nruns, ntime]
+        obs          observed time series [ntime]; missing values are NaN
+
+
+        Output
+        ------
+        NSE per run: scalar or [nruns]
+
+
+        Examples
+        --------
+        >>> obs = np.array([1., 2., np.nan, 4., 5.])
+        >>> sim = np.array([[1., 2., 3., 4., 5.], [2., 3., 4., 5., 6.], [1., np.nan, 1., 1., 1.]])
+        >>> print(nse(sim, obs))
+        [1.  0.6  nan]
+        >>> print(nse(sim[1], obs))
+        0.6
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    sim, obs = _valid(sim, obs)
+    return 1. - np.sum((sim-obs)**2, axis=-1) / np.sum((obs-np.mean(obs))**2)
+
+
+def lognse(sim, obs):
+    """
+        Nash-Sutcliffe efficiency of logarithms of simulated and observed time series
+        (emphasizes low flows). A small constant epsilon, one hundredth of the mean
+        observation (Pushpalatha et al. 2012), is added to both so that zero flows stay
+        valid; negative simulated flows are set to zero, negative observations are missing.
+
+
+        Definition
+        ----------
+        def lognse(sim, obs):
+
+
+        Examples
+        --------
+        >>> obs = np.array([1., 10., 100.])
+        >>> print(np.round(lognse(np.array([[1., 10., 100.], [2., 20., 200.]]), obs), 4))
+        [1.     0.8663]
+        >>> # zero flows do not fail the run
+        >>> print(np.round(lognse(np.array([[1., 2., 3., 0.], [1., 2., 3., 4.]]), np.array([1., 2., 3., 4.])), 4))
+        [-23.4728   1.    ]
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    sim, obs = _valid(sim, np.where(np.asarray(obs, dtype=float) >= 0., obs, np.nan))
+    eps = np.mean(obs)/100.
+    return nse(np.log(np.maximum(sim, 0.)+eps), np.log(obs+eps))
+
+
+def kge(sim, obs):
+    """
+        Kling-Gupta efficiency (Gupta et al. 2009)
+
+            KGE = 1 - sqrt( (r-1)**2 + (alpha-1)**2 + (beta-1)**2 )
+
+        with correlation r, ratio of standard deviations alpha and ratio of means beta
+        of simulation and observation.
+
+
+        Definition
+        ----------
+        def kge(sim, obs):
+
+
+        Examples
+        --------
+        >>> obs = np.array([1., 2., 3., 4.])
+        >>> print(np.round(kge(np.array([[1., 2., 3., 4.], [2., 4., 6., 8.]]), obs), 4))
+        [ 1.     -0.4142]
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    sim, obs = _valid(sim, obs)
+    ms    = np.mean(sim, axis=-1)
+    mo    = np.mean(obs)
+    ss    = np.std(sim, axis=-1)
+    so    = np.std(obs)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = np.mean((sim-ms[..., np.newaxis])*(obs-mo), axis=-1) / (ss*so)
+    alpha = ss/so
+    beta  = ms/mo
+    return 1. - np.sqrt((r-1.)**2 + (alpha-1.)**2 + (beta-1.)**2)
+
+
+def pbias(sim, obs):
+    """
+        Percent bias 100 * sum(sim-obs) / sum(obs); positive if simulation overestimates.
+
+
+        Definition
+        ----------
+        def pbias(sim, obs):
+
+
+        Examples
+        --------
+        >>> print(pbias(np.array([[1., 2., 3., 4.], [2., 4., 6., 8.]]), np.array([1., 2., 3., 4.])))
+        [  0. 100.]
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    sim, obs = _valid(sim, obs)
+    return 100. * np.sum(sim-obs, axis=-1) / np.sum(obs)
+
+
+def rmse(sim, obs):
+    """
+        Root mean squared error.
+
+
+        Definition
+        ----------
+        def rmse(sim, obs):
+
+
+        Examples
+        --------
+        >>> print(rmse(np.array([[1., 2., 3., 4.], [2., 3., 4., 5.]]), np.array([1., 2., 3., 4.])))
+        [0. 1.]
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    sim, obs = _valid(sim, obs)
+    return np.sqrt(np.mean((sim-obs)**2, axis=-1))
+
+
+def mae(sim, obs):
+    """
+        Mean absolute error.
+
+
+        Definition
+        ----------
+        def mae(sim, obs):
+
+
+        Examples
+        --------
+        >>> print(mae(np.array([[1., 2., 3., 4.], [2., 1., 4., 5.]]), np.array([1., 2., 3., 4.])))
+        [0. 1.]
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    sim, obs = _valid(sim, obs)
+    return np.mean(np.abs(sim-obs), axis=-1)
+
+
+# names of metrics that can be derived with calc_metrics
+metric_functions = {'nse': nse, 'lognse': lognse, 'kge': kge, 'pbias': pbias, 'rmse': rmse, 'mae': mae}
+
+
+def calc_metrics(sim, obs, metrics, nblock=1000):
+    """
+        Several metrics of many simulated time series against the same observations.
+
+
+        Runs are processed in blocks of nblock rows so that sim can be a memory-mapped
+        array of a model output store that does not fit into memory.
+
+
+        Definition
+        ----------
+        def calc_metrics(sim, obs, metrics, nblock=1000):
+
+
+        Input
+        -----
+        sim          simulated time series [nruns, ntime]
+        obs          observed time series [ntime]; missing values are NaN
+        metrics      list of metric names, any of: 'nse', 'lognse', 'kge', 'pbias', 'rmse', 'mae'
+
+
+        Optional Input
+        --------------
+        nblock       number of runs processed at once (default: 1000)
+
+
+        Output
+        ------
+        dictionary with one array [nruns] per metric
+
+
+        Examples
+        --------
+        >>> obs = np.array([1., 2., np.nan, 4., 5.])
+        >>> sim = np.array([[1., 2., 3., 4., 5.], [2., 3., 4., 5., 6.]])
+        >>> out = calc_metrics(sim, obs, ['nse', 'pbias'], nblock=1)
+        >>> print(out['nse'], out['pbias'])
+        [1.  0.6] [ 0.   33.33333333]
+        >>> out = calc_metrics(sim, obs, ['r2'])
+        Traceback (most recent call last):
+        ...
+        ValueError: calc_metrics: unknown metric 'r2'; available are: kge, lognse, mae, nse, pbias, rmse
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    for mm in metrics:
+        if not(mm in metric_functions):
+            raise ValueError("calc_metrics: unknown metric '"+mm+"'; available are: "+', '.join(sorted(metric_functions.keys())))
+    nruns = np.shape(sim)[0]
+    out   = {}
+    for mm in metrics:
+        out[mm] = np.empty(nruns)
+    for i0 in range(0, nruns, nblock):
+        block = np.asarray(sim[i0:i0+nblock], dtype=float)
+        for mm in metrics:
+            out[mm][i0:i0+nblock] = metric_functions[mm](block, obs)
+    return out
+
+
+# Time steps with observations; simulations of these time steps
+def _valid(sim, obs):
+    sim = np.asarray(sim, dtype=float)
+    obs = np.asarray(obs, dtype=float)
+    if np.shape(sim)[-1] != np.shape(obs)[-1]:
+        raise ValueError('metrics: simulation has '+str(np.shape(sim)[-1])+' time steps but observation '+str(np.shape(obs)[-1]))
+    ii = np.isfinite(obs)
+    return sim[..., ii], obs[ii]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+__all__ = ['run_model', 'call_with_retries', 'record_failure']
+
+
+def run_model(cmd, logfile, cwd=None, timeout=None, kill_wait=5.):
+    """
+        Run an external model executable with its output redirected to a log file.
+
+
+        The model is started in its own process group (session). Standard output
+        and standard error go directly into the log file without passing through
+        Python. If the model does not finish within the given wall-clock time,
+        the whole process group is terminated (SIGTERM) and killed (SIGKILL)
+        if it is still alive after kill_wait seconds. The exit code is recorded
+        at the end of the log file. The model process is reaped with wait4 so
+        that its resource usage (CPU time, peak memory, block I/O) is returned
+        without polling.
+
+
+        Definition
+        ----------
+        def run_model(cmd, logfile, cwd=None, timeout=None, kill_wait=5.):
+
+
+        Input
+        -----
+        cmd          command to run as list of strings, e.g. ['./Raven.exe', 'raven_hmets', '-o', 'output/']
+        logfile      file receiving standard output and standard error of the model;
+                     all necessary directories will be created.
+
+
+        Optional Input
+        --------------
+        cwd          working directory of the model run (default: current directory)
+        timeout      wall-clock time limit of the model run in seconds (default: None, i.e. no limit)
+        kill_wait    seconds between SIGTERM and SIGKILL of the process group after timeout (default: 5)
+
+
+        Output
+        ------
+        dictionary with
+            'returncode'    exit code of the model; negative if killed by signal -N
+            'timeout'       True if the model run was killed because of the timeout
+            'walltime'      wall-clock time of the model run in seconds
+            'cputime'       user plus system CPU time of the model process in seconds
+            'maxrss'        peak resident memory of the model process in MB
+            'inblock'       number of file system blocks read by the model process
+            'oublock'       number of file system blocks written by the model process
+            'logfile'       name of log file
+
+
+        Examples
+        --------
+        >>> import tempfile
+        >>> logfile = os.path.join(tempfile.mkdtemp(), 'logs', 'run_set_0.log')
+        >>> status = run_model(['sh', '-c', 'echo out; echo err 1>&2; exit 3'], logfile)
+        >>> print(status['returncode'], status['timeout'], status['cputime'] >= 0., status['maxrss'] > 0.)
+        3 False True True
+        >>> print(open(logfile).read(), end='')
+        run cmd: sh -c echo out; echo err 1>&2; exit 3
+        out
+        err
+        exit code: 3
+
+        >>> status = run_model(['sh', '-c', 'sleep 60 & sleep 60'], logfile, timeout=0.5)
+        >>> print(status['returncode'], status['timeout'], status['walltime'] < 10.)
+        -15 True True
+        >>> print(open(logfile).read().splitlines()[-1])
+        exit code: -15 (killed after timeout of 0.5 s)
+
+        >>> # Clean up doctest
+        >>> import shutil
+        >>> shutil.rmtree(os.path.dirname(os.path.dirname(logfile)))
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    logdir = os.path.dirname(os.path.abspath(logfile))
+    if not os.path.exists(logdir):
+        os.makedirs(logdir)
+
+    with open(logfile, 'w') as log:
+        log.write('run cmd: '+' '.join(cmd)+'\n')
+        log.flush()
+
+        t0 = time.time()
+        process = subprocess.Popen(cmd, cwd=cwd, stdout=log, stderr=subprocess.STDOUT,
+                                   stdin=subprocess.DEVNULL, start_new_session=True)
+        # process group is killed by a timer thread; wait4 gives the resource usage of the model
+        reaped = threading.Event()
+        killed = []
+        if not(timeout is None):
+            timer = threading.Timer(timeout, _kill_group, args=(process, kill_wait, reaped, killed))
+            timer.daemon = True
+            timer.start()
+        pid, sts, usage = os.wait4(process.pid, 0)
+        reaped.set()
+        if not(timeout is None):
+            timer.cancel()
+        process.returncode = -os.WTERMSIG(sts) if os.WIFSIGNALED(sts) else os.WEXITSTATUS(sts)
+        timed_out = len(killed) > 0
+        walltime = time.time() - t0
+
+        log.flush()
+        if timed_out:
+            log.write('exit code: '+str(process.returncode)+' (killed after timeout of '+str(timeout)+' s)\n')
+        else:
+            log.write('exit code: '+str(process.returncode)+'\n')
+
+    status = {}
+    status['returncode'] = process.returncode
+    status['timeout']    = timed_out
+    status['walltime']   = walltime
+    status['cputime']    = usage.ru_utime + usage.ru_stime
+    status['maxrss']     = usage.ru_maxrss / (1024.**2 if sys.platform == 'darwin' else 1024.)   # bytes on macOS, kB else
+    status['inblock']    = usage.ru_inblock
+    status['oublock']    = usage.ru_oublock
+    status['logfile']    = logfile
+
+    return status
+
+
+# Terminate, and kill if necessary, the process group of a Popen process until it is reaped
+def _kill_group(process, kill_wait, reaped, killed):
+    killed.append(True)
+    for sig in [signal.SIGTERM, signal.SIGKILL]:
+        if reaped.is_set():
+            return
+        try:
+            os.killpg(process.pid, sig)
+        except OSError:     # group already gone
+            pass
+        if reaped.wait(kill_wait):
+            return
+
+
+def call_with_retries(func, retries=0, delay=0., backoff=2.):
+    """
+        Call a function, e.g. a model run, and retry it if it raises an exception.
+
+
+        Definition
+        ----------
+        def call_with_retries(func, retries=0, delay=0., backoff=2.):
+
+
+        Input
+        -----
+        func         function without arguments, e.g. lambda: model_function(paraset, run_id='run_set_0')
+
+
+        Optional Input
+        --------------
+        retries      number of retries after the first failed call (default: 0)
+        delay        seconds to wait before the first retry (default: 0)
+        backoff      factor by which delay grows with every further retry (default: 2)
+
+
+        Output
+        ------
+        (result, errors) with
+            result       return value of func or None if all attempts failed
+            errors       list of tracebacks of all failed attempts
+
+
+        Examples
+        --------
+        >>> calls = []
+        >>> def flaky():
+        ...     calls.append(1)
+        ...     if len(calls) < 3:
+        ...         raise ValueError('attempt '+str(len(calls))+' failed')
+        ...     return {'out': 1.0}
+        >>> result, errors = call_with_retries(flaky, retries=1)
+        >>> print(result, len(errors), errors[-1].splitlines()[-1])
+        None 2 ValueError: attempt 2 failed
+        >>> result, errors = call_with_retries(flaky, retries=1)
+        >>> print(result, len(errors))
+        {'out': 1.0} 0
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    errors = []
+    for iattempt in range(int(retries)+1):
+        if iattempt > 0 and delay > 0.:
+            time.sleep(delay * backoff**(iattempt-1))
+        try:
+            return func(), errors
+        except Exception:
+            errors.append(traceback.format_exc())
+    return None, errors
+
+
+def record_failure(failedlog, run_id, errors, logfile=None):
+    """
+        Append a failed model run with its errors to a log file of failed runs.
+
+
+        Definition
+        ----------
+        def record_failure(failedlog, run_id, errors, logfile=None):
+
+
+        Input
+        -----
+        failedlog    log file of failed runs; all necessary directories will be created.
+        run_id       name of failed run
+        errors       list of tracebacks of failed attempts (see call_with_retries)
+
+
+        Optional Input
+        --------------
+        logfile      log file of model output of the run to refer to (default: None)
+
+
+        Examples
+        --------
+        >>> import tempfile
+        >>> failedlog = os.path.join(tempfile.mkdtemp(), 'failed_runs.log')
+        >>> record_failure(failedlog, 'run_set_3', ['Traceback...\\nValueError: Raven failed'], logfile='model_logs/run_set_3.log')
+        >>> print(open(failedlog).read(), end='')
+        run_set_3: failed after 1 attempt(s); stored as NaN; model log: model_logs/run_set_3.log
+            Traceback...
+            ValueError: Raven failed
+        >>> import shutil
+        >>> shutil.rmtree(os.path.dirname(failedlog))
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    logdir = os.path.dirname(os.path.abspath(failedlog))
+    if not os.path.exists(logdir):
+        os.makedirs(logdir)
+    with open(failedlog, 'a') as log:
+        log.write(str(run_id)+': failed after '+str(len(errors))+' attempt(s); stored as NaN')
+        if not(logfile is None):
+            log.write('; model log: '+str(logfile))
+        log.write('\n')
+        if len(errors) > 0:
+            for line in errors[-1].rstrip().splitlines():
+                log.write('    '+line+'\n')
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
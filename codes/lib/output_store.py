@@ -0,0 +1,713 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import os
+import pickle
+from collections import OrderedDict
+import numpy as np
+
+__all__ = ['ModelOutputStore', 'load_model_output', 'output_keys', 'store_format',
+           'add_model_output', 'chunk_rows', 'merge_model_output', 'append_model_output']
+
+
+class ModelOutputStore(object):
+    """
+        Preallocated, typed store of model outputs of all runs of a parameter design.
+
+
+        Each output key gets one array for all runs: 1D [nruns] for scalar outputs
+        and 2D [nruns, ntime] for time series (or higher dimensional for arrays).
+        Arrays are allocated when the first run of a key is set and are filled with
+        NaN, so runs can be set in any order. A store can hold only a block of rows
+        of the parameter design (e.g. of one scheduler array task); the design rows
+        are then saved with the outputs and partial stores can be merged with
+        merge_model_output. The store is written in one of these formats, chosen by
+        the name of the output file:
+
+            *.pkl     pickle of dictionary of arrays (as the drivers wrote before)
+            *.nc      NetCDF4 file with one variable per key, chunked by blocks of runs and time steps,
+                      optionally compressed (zlib); single keys are read lazily
+            else      directory with one <key>.npy file per key;
+                      single keys are memory-mapped on reading
+
+
+        Definition
+        ----------
+        class ModelOutputStore(nruns, rows=None, ndesign=None):
+
+
+        Input
+        -----
+        nruns        number of model runs (rows of parameter design)
+
+
+        Optional Input
+        --------------
+        rows         design rows of the nruns runs if store holds only part of the design
+                     (default: None, i.e. whole design)
+        ndesign      total number of rows of the design if rows is given (default: None)
+
+
+        Methods
+        -------
+        set(irun, model)                      store dictionary of outputs of run irun
+        keys()                                list of output keys
+        save(outfile, dtype=None, zlib=False) write store; dtype e.g. np.float32 halves file size;
+                                              zlib compresses NetCDF output
+        share(sdir, dtype=None)               move arrays into memory-mapped <key>.npy files in sdir;
+                                              processes forked afterwards write their runs
+                                              directly into these shared slots (see lib/parallel_runs.py)
+        [key]                                 array of key
+
+
+        Examples
+        --------
+        >>> import tempfile, shutil
+        >>> store = ModelOutputStore(3)
+        >>> for irun in range(3):
+        ...     store.set(irun, {'nse':0.5+irun, 'Q':np.arange(4.)*irun})
+        >>> print(store.keys(), store['nse'], store['Q'].shape)
+        ['nse', 'Q'] [0.5 1.5 2.5] (3, 4)
+
+        >>> tmpdir = tempfile.mkdtemp()
+        >>> for outfile in ['model_output.pkl', 'model_output.nc', 'model_output']:
+        ...     store.save(os.path.join(tmpdir, outfile), dtype=np.float32)
+        ...     print(outfile, output_keys(os.path.join(tmpdir, outfile)))
+        ...     mo = load_model_output(os.path.join(tmpdir, outfile), keys=['Q'])
+        ...     print(list(mo.keys()), mo['Q'][2,:], mo['Q'].dtype)
+        model_output.pkl ['nse', 'Q']
+        ['Q'] [0. 2. 4. 6.] float32
+        model_output.nc ['nse', 'Q']
+        ['Q'] [0. 2. 4. 6.] float32
+        model_output ['nse', 'Q']
+        ['Q'] [0. 2. 4. 6.] float32
+        >>> isinstance(mo['Q'], np.memmap)
+        True
+        >>> shutil.rmtree(tmpdir)
+
+        >>> # shared slots: saving to the slot directory only writes the key list
+        >>> tmpdir = tempfile.mkdtemp()
+        >>> store.share(os.path.join(tmpdir, 'model_output'))
+        >>> print(isinstance(store['Q'], np.memmap), store['nse'])
+        True [0.5 1.5 2.5]
+        >>> store.save(os.path.join(tmpdir, 'model_output'))
+        >>> print(load_model_output(os.path.join(tmpdir, 'model_output'))['Q'][2,:])
+        [0. 2. 4. 6.]
+        >>> store.set(1, {'kge':0.3})
+        Traceback (most recent call last):
+        ...
+        ValueError: ModelOutputStore: new output 'kge' of run 1 in store with shared slots
+        >>> shutil.rmtree(tmpdir)
+
+        >>> store.set(0, {'nse':1., 'Q':np.arange(5.)})
+        Traceback (most recent call last):
+        ...
+        ValueError: ModelOutputStore: output 'Q' of run 0 has shape (5,) but previous runs had (4,)
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+
+    def __init__(self, nruns, rows=None, ndesign=None):
+        self.nruns   = int(nruns)
+        self.data    = OrderedDict()
+        self.rows    = None if rows is None else np.asarray(rows, dtype=np.int64)
+        self.ndesign = ndesign
+        self.shared  = None
+        if not(self.rows is None):
+            if len(self.rows) != self.nruns:
+                raise ValueError('ModelOutputStore: number of rows ('+str(len(self.rows))+') does not match number of runs ('+str(self.nruns)+')')
+            if ndesign is None:
+                raise ValueError('ModelOutputStore: size of design (ndesign) must be given with rows')
+
+    def keys(self):
+        return list(self.data.keys())
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def set(self, irun, model):
+        for ikey in model:
+            value = np.asarray(model[ikey], dtype=float)
+            if not(ikey in self.data):
+                if not(self.shared is None):
+                    raise ValueError("ModelOutputStore: new output '"+ikey+"' of run "+str(irun)+" in store with shared slots")
+                self.data[ikey] = np.full((self.nruns,)+value.shape, np.nan)
+            if self.data[ikey].shape[1:] != value.shape:
+                raise ValueError("ModelOutputStore: output '"+ikey+"' of run "+str(irun)+" has shape "+
+                                 str(value.shape)+" but previous runs had "+str(self.data[ikey].shape[1:]))
+            self.data[ikey][irun] = value
+
+    def save(self, outfile, dtype=None, zlib=False):
+        fmt = store_format(outfile)
+        # design rows of partial stores are saved as hidden keys
+        meta = OrderedDict()
+        if not(self.rows is None):
+            meta['__rows__']    = self.rows
+            meta['__ndesign__'] = np.array(self.ndesign, dtype=np.int64)
+        if fmt == 'pickle':
+            data = OrderedDict([ (ikey, np.asarray(self._typed(ikey, dtype))) for ikey in self.data ])
+            data.update(meta)
+            ff = open(outfile, 'wb')
+            pickle.dump(data, ff)
+            ff.close()
+        elif fmt == 'netcdf':
+            import netCDF4 as nc
+            ncout = nc.Dataset(outfile, 'w')
+            ncout.createDimension('run', self.nruns)
+            ncout.setncattr('keys', ' '.join(self.data.keys()))
+            for ikey in self.data:
+                var  = self._typed(ikey, dtype)
+                dims = ['run']
+                for ii, nn in enumerate(var.shape[1:]):
+                    dims.append(ikey+'_dim'+str(ii))
+                    ncout.createDimension(dims[-1], nn)
+                # chunks of blocks of runs and time steps of about 1 MB: reading a block of runs or a
+                # block of time steps of all runs (see mean_elementary_effects) touches only their chunks
+                if var.ndim > 1:
+                    tchunk = min(var.shape[1], 1024)
+                    chunks = [min(self.nruns, max(1, 131072//tchunk)), tchunk] + list(var.shape[2:])
+                else:
+                    chunks = [min(self.nruns, 65536)]
+                ncvar = ncout.createVariable(_ncname(ikey), var.dtype, dims, zlib=zlib, chunksizes=chunks)
+                ncvar.setncattr('key', ikey)
+                ncvar[:] = var
+            for ikey in meta:
+                ncvar = ncout.createVariable(ikey, 'i8', ('run',) if meta[ikey].ndim > 0 else ())
+                ncvar[:] = meta[ikey]
+            ncout.close()
+        else:
+            if not os.path.exists(outfile):
+                os.makedirs(outfile)
+            ff = open(os.path.join(outfile, 'keys.txt'), 'w')
+            for ikey in self.data:
+                npyfile = os.path.join(outfile, _ncname(ikey)+'.npy')
+                if self._is_slot(ikey, npyfile) and (dtype is None or self.data[ikey].dtype == np.dtype(dtype)):
+                    # shared slot is already the output file
+                    self.data[ikey].flush()
+                else:
+                    np.save(npyfile, self._typed(ikey, dtype))
+                ff.write(ikey+'\n')
+            ff.close()
+            for ikey in meta:
+                np.save(os.path.join(outfile, ikey+'.npy'), meta[ikey])
+
+    def share(self, sdir, dtype=None):
+        if not os.path.exists(sdir):
+            os.makedirs(sdir)
+        self.shared = os.path.abspath(sdir)
+        for ikey in self.data:
+            slot = np.lib.format.open_memmap(os.path.join(self.shared, _ncname(ikey)+'.npy'), mode='w+',
+                                             dtype=self.data[ikey].dtype if dtype is None else dtype,
+                                             shape=self.data[ikey].shape)
+            slot[:] = self.data[ikey]
+            self.data[ikey] = slot
+
+    def _is_slot(self, ikey, npyfile):
+        return (isinstance(self.data[ikey], np.memmap) and not(self.shared is None) and
+                os.path.realpath(self.data[ikey].filename) == os.path.realpath(npyfile))
+
+    def _typed(self, ikey, dtype):
+        if dtype is None:
+            return self.data[ikey]
+        return self.data[ikey].astype(dtype)
+
+
+def store_format(outfile):
+    """
+        Format of model output store from its name: 'pickle' (*.pkl, *.pickle),
+        'netcdf' (*.nc, *.nc4) or 'npy' (directory of .npy files, all other names).
+
+
+        Definition
+        ----------
+        def store_format(outfile):
+
+
+        Examples
+        --------
+        >>> print(store_format('iter_1/model_output.pkl'), store_format('a.nc'), store_format('model_output'))
+        pickle netcdf npy
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    ext = os.path.splitext(outfile)[1].lower()
+    if ext in ['.pkl', '.pickle']:
+        return 'pickle'
+    elif ext in ['.nc', '.nc4']:
+        return 'netcdf'
+    else:
+        return 'npy'
+
+
+def output_keys(infile):
+    """
+        List of output keys in a model output store without reading the outputs
+        (except for pickle files).
+
+
+        Definition
+        ----------
+        def output_keys(infile):
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    fmt = store_format(infile)
+    if fmt == 'pickle':
+        ff = open(infile, 'rb')
+        keys = [ ikey for ikey in pickle.load(ff).keys() if not(_hidden(ikey)) ]
+        ff.close()
+    elif fmt == 'netcdf':
+        import netCDF4 as nc
+        ncin = nc.Dataset(infile, 'r')
+        keys = ncin.getncattr('keys').split()
+        ncin.close()
+    else:
+        ff = open(os.path.join(infile, 'keys.txt'), 'r')
+        keys = [ ll.strip() for ll in ff if len(ll.strip()) > 0 ]
+        ff.close()
+    return keys
+
+
+def load_model_output(infile, keys=None, mmap=True, lazy=False):
+    """
+        Read model outputs of selected keys from a model output store.
+
+
+        Definition
+        ----------
+        def load_model_output(infile, keys=None, mmap=True, lazy=False):
+
+
+        Input
+        -----
+        infile       model output store written by ModelOutputStore.save or
+                     pickle file of dictionary (of lists) written by older drivers
+
+
+        Optional Input
+        --------------
+        keys         list of output keys to read (default: None, i.e. all)
+        mmap         True:  memory-map .npy files of directory stores (default)
+                     False: read arrays into memory
+        lazy         True:  return variables of NetCDF stores instead of arrays; the file stays
+                     open and only slices that are indexed are read, e.g. blocks of time
+                     steps for out-of-core processing (see lib/eee_effects.py)
+                     False: read NetCDF variables into memory (default)
+
+
+        Output
+        ------
+        OrderedDict of arrays [nruns,...] (or NetCDF variables if lazy) for all keys.
+        The hidden keys '__rows__' and '__ndesign__' (design rows and size of design
+        of partial stores) can be requested explicitly; they are None for complete stores.
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    fmt = store_format(infile)
+    if keys is None:
+        keys = output_keys(infile)
+    out = OrderedDict()
+    if fmt == 'pickle':
+        ff = open(infile, 'rb')
+        data = pickle.load(ff)
+        ff.close()
+        for ikey in keys:
+            out[ikey] = np.array(data[ikey]) if ikey in data else _missing(ikey, infile)
+    elif fmt == 'netcdf':
+        import netCDF4 as nc
+        ncin = nc.Dataset(infile, 'r')
+        for ikey in keys:
+            if not(_ncname(ikey) in ncin.variables):
+                out[ikey] = _missing(ikey, infile)
+                continue
+            ncvar = ncin.variables[_ncname(ikey)]
+            ncvar.set_auto_mask(False)
+            out[ikey] = ncvar if lazy and not(_hidden(ikey)) else ncvar[:]
+        if not(lazy):
+            ncin.close()
+    else:
+        for ikey in keys:
+            fname = os.path.join(infile, _ncname(ikey)+'.npy')
+            if not os.path.exists(fname):
+                out[ikey] = _missing(ikey, infile)
+                continue
+            out[ikey] = np.load(fname, mmap_mode='r' if mmap and not(_hidden(ikey)) else None)
+    return out
+
+
+def add_model_output(infile, outputs, dtype=None):
+    """
+        Add (or replace) output keys of an existing model output store, e.g. metrics
+        derived afterwards from stored simulations.
+
+
+        Definition
+        ----------
+        def add_model_output(infile, outputs, dtype=None):
+
+
+        Input
+        -----
+        infile       model output store (any format of ModelOutputStore)
+        outputs      dictionary of arrays [nruns,...] to add
+
+
+        Optional Input
+        --------------
+        dtype        data type of added outputs, e.g. np.float32 (default: None, i.e. float64)
+
+
+        Examples
+        --------
+        >>> import tempfile, shutil
+        >>> tmpdir = tempfile.mkdtemp()
+        >>> store  = ModelOutputStore(2)
+        >>> store.set(0, {'Q':np.arange(3.)}); store.set(1, {'Q':np.ones(3)})
+        >>> for outfile in ['mo.pkl', 'mo.nc', 'mo']:
+        ...     store.save(os.path.join(tmpdir, outfile))
+        ...     add_model_output(os.path.join(tmpdir, outfile), {'meanQ':np.array([1., 1.])})
+        ...     print(output_keys(os.path.join(tmpdir, outfile)), load_model_output(os.path.join(tmpdir, outfile), ['meanQ'])['meanQ'])
+        ['Q', 'meanQ'] [1. 1.]
+        ['Q', 'meanQ'] [1. 1.]
+        ['Q', 'meanQ'] [1. 1.]
+        >>> shutil.rmtree(tmpdir)
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    fmt  = store_format(infile)
+    keys = output_keys(infile)
+    new  = [ ikey for ikey in outputs if not(ikey in keys) ]
+    if fmt == 'pickle':
+        ff = open(infile, 'rb')
+        data = pickle.load(ff)
+        ff.close()
+        for ikey in outputs:
+            data[ikey] = np.asarray(outputs[ikey], dtype=float if dtype is None else dtype)
+        ff = open(infile, 'wb')
+        pickle.dump(data, ff)
+        ff.close()
+    elif fmt == 'netcdf':
+        import netCDF4 as nc
+        ncout = nc.Dataset(infile, 'a')
+        for ikey in outputs:
+            var = np.asarray(outputs[ikey], dtype=float if dtype is None else dtype)
+            if _ncname(ikey) in ncout.variables:
+                ncout.variables[_ncname(ikey)][:] = var
+                continue
+            dims = ['run']
+            for ii, nn in enumerate(var.shape[1:]):
+                dims.append(ikey+'_dim'+str(ii))
+                ncout.createDimension(dims[-1], nn)
+            ncvar = ncout.createVariable(_ncname(ikey), var.dtype, dims)
+            ncvar.setncattr('key', ikey)
+            ncvar[:] = var
+        ncout.setncattr('keys', ' '.join(keys+new))
+        ncout.close()
+    else:
+        for ikey in outputs:
+            np.save(os.path.join(infile, _ncname(ikey)+'.npy'), np.asarray(outputs[ikey], dtype=float if dtype is None else dtype))
+        ff = open(os.path.join(infile, 'keys.txt'), 'a')
+        for ikey in new:
+            ff.write(ikey+'\n')
+        ff.close()
+
+
+def chunk_rows(nrows, chunk=None):
+    """
+        Contiguous block of rows of a parameter design run by one of n array tasks.
+
+
+        Definition
+        ----------
+        def chunk_rows(nrows, chunk=None):
+
+
+        Input
+        -----
+        nrows        number of rows of parameter design
+
+
+        Optional Input
+        --------------
+        chunk        'i/n': block i of n blocks (i = 1, ..., n), e.g. '3/8' or $SLURM_ARRAY_TASK_ID/8.
+                     Blocks differ at most by one row in size (default: None, i.e. all rows)
+
+
+        Output
+        ------
+        integer array of design rows
+
+
+        Examples
+        --------
+        >>> print([ chunk_rows(10, str(ii)+'/3') for ii in range(1,4) ])
+        [array([0, 1, 2, 3]), array([4, 5, 6]), array([7, 8, 9])]
+        >>> print(chunk_rows(3))
+        [0 1 2]
+        >>> chunk_rows(10, '4/3')
+        Traceback (most recent call last):
+        ...
+        ValueError: chunk_rows: chunk must be 'i/n' with 1 <= i <= n: 4/3
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    if chunk is None:
+        return np.arange(nrows)
+    try:
+        ichunk, nchunk = [ int(cc) for cc in str(chunk).split('/') ]
+    except ValueError:
+        ichunk, nchunk = 0, 0
+    if ichunk < 1 or ichunk > nchunk:
+        raise ValueError("chunk_rows: chunk must be 'i/n' with 1 <= i <= n: "+str(chunk))
+    return np.array_split(np.arange(nrows), nchunk)[ichunk-1]
+
+
+def merge_model_output(infiles, outfile=None, dtype=None, zlib=False):
+    """
+        Merge partial model output stores (written with --chunk i/n) into one store in design order.
+
+
+        All partial stores must come from the same design and have the same output keys.
+        Every design row must be present exactly once; otherwise a ValueError lists
+        missing and duplicate rows.
+
+
+        Definition
+        ----------
+        def merge_model_output(infiles, outfile=None, dtype=None, zlib=False):
+
+
+        Input
+        -----
+        infiles      list of partial model output stores (any format of ModelOutputStore)
+
+
+        Optional Input
+        --------------
+        outfile      name of merged model output store (format by name, see ModelOutputStore)
+                     (default: None, i.e. store is only returned)
+        dtype        data type of merged outputs, e.g. np.float32 (default: None, i.e. float64)
+        zlib         compress merged NetCDF output (default: False)
+
+
+        Output
+        ------
+        merged ModelOutputStore
+
+
+        Examples
+        --------
+        >>> import tempfile, shutil
+        >>> tmpdir = tempfile.mkdtemp()
+        >>> infiles = []
+        >>> for ichunk in [2, 1, 3]:
+        ...     rows  = chunk_rows(5, str(ichunk)+'/3')
+        ...     store = ModelOutputStore(len(rows), rows=rows, ndesign=5)
+        ...     for irun, row in enumerate(rows):
+        ...         store.set(irun, {'nse':float(row), 'Q':np.ones(2)*row})
+        ...     infiles.append(os.path.join(tmpdir, 'model_output_'+str(ichunk)+'.nc'))
+        ...     store.save(infiles[-1])
+        >>> merged = merge_model_output(infiles, os.path.join(tmpdir, 'model_output.pkl'))
+        >>> print(merged['nse'], merged['Q'][:,0])
+        [0. 1. 2. 3. 4.] [0. 1. 2. 3. 4.]
+        >>> print(output_keys(os.path.join(tmpdir, 'model_output.pkl')))
+        ['nse', 'Q']
+
+        >>> merge_model_output(infiles[:2]+infiles[:1])
+        Traceback (most recent call last):
+        ...
+        ValueError: merge_model_output: design of 5 rows incomplete: missing rows [4], duplicate rows [2, 3]
+
+        >>> shutil.rmtree(tmpdir)
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    parts   = []
+    ndesign = None
+    keys    = None
+    for infile in infiles:
+        meta = load_model_output(infile, keys=['__rows__', '__ndesign__'])
+        if meta['__rows__'] is None:
+            raise ValueError('merge_model_output: not a partial model output store (no design rows): '+str(infile))
+        ikeys = output_keys(infile)
+        if ndesign is None:
+            ndesign = int(meta['__ndesign__'])
+            keys    = ikeys
+        if int(meta['__ndesign__']) != ndesign:
+            raise ValueError('merge_model_output: '+str(infile)+' is part of a design of '+str(int(meta['__ndesign__']))+
+                             ' rows but previous files of '+str(ndesign)+' rows')
+        if ikeys != keys:
+            raise ValueError('merge_model_output: '+str(infile)+' has output keys '+str(ikeys)+' but previous files '+str(keys))
+        parts.append((infile, np.array(meta['__rows__'], dtype=np.int64)))
+
+    if len(parts) == 0:
+        raise ValueError('merge_model_output: no input files given')
+
+    count   = np.bincount(np.concatenate([ rows for infile, rows in parts ]), minlength=ndesign)[:ndesign]
+    missing = list(np.where(count == 0)[0])
+    double  = list(np.where(count > 1)[0])
+    if len(missing) > 0 or len(double) > 0:
+        raise ValueError('merge_model_output: design of '+str(ndesign)+' rows incomplete: missing rows '+
+                         str([ int(ii) for ii in missing ])+', duplicate rows '+str([ int(ii) for ii in double ]))
+
+    merged = ModelOutputStore(ndesign)
+    for infile, rows in parts:
+        data = load_model_output(infile, keys=keys)
+        for ikey in keys:
+            if not(ikey in merged):
+                merged.data[ikey] = np.full((ndesign,)+data[ikey].shape[1:], np.nan)
+            if merged.data[ikey].shape[1:] != data[ikey].shape[1:]:
+                raise ValueError("merge_model_output: output '"+ikey+"' of "+str(infile)+" has shape "+
+                                 str(data[ikey].shape[1:])+" but previous files had "+str(merged.data[ikey].shape[1:]))
+            merged.data[ikey][rows] = data[ikey]
+
+    if not(outfile is None):
+        merged.save(outfile, dtype=dtype, zlib=zlib)
+
+    return merged
+
+
+
+def append_model_output(infiles, outfile=None, dtype=None, zlib=False):
+    """
+        Append complete model output stores of consecutive parameter designs into one store,
+        e.g. of Morris trajectories added one batch at a time.
+
+
+        All stores must have the same output keys and shapes; runs are appended in the
+        order of infiles.
+
+
+        Definition
+        ----------
+        def append_model_output(infiles, outfile=None, dtype=None, zlib=False):
+
+
+        Input
+        -----
+        infiles      list of complete model output stores (any format of ModelOutputStore)
+
+
+        Optional Input
+        --------------
+        outfile      name of appended model output store (format by name, see ModelOutputStore)
+                     (default: None, i.e. store is only returned)
+        dtype        data type of appended outputs, e.g. np.float32 (default: None, i.e. float64)
+        zlib         compress appended NetCDF output (default: False)
+
+
+        Output
+        ------
+        appended ModelOutputStore
+
+
+        Examples
+        --------
+        >>> import tempfile, shutil
+        >>> tmpdir = tempfile.mkdtemp()
+        >>> infiles = []
+        >>> for ibatch, nruns in enumerate([2, 3]):
+        ...     store = ModelOutputStore(nruns)
+        ...     for irun in range(nruns):
+        ...         store.set(irun, {'nse':10.*ibatch+irun, 'Q':np.ones(2)*irun})
+        ...     infiles.append(os.path.join(tmpdir, 'model_output_'+str(ibatch)))
+        ...     store.save(infiles[-1])
+        >>> appended = append_model_output(infiles, os.path.join(tmpdir, 'model_output.nc'))
+        >>> print(appended['nse'], appended['Q'].shape)
+        [ 0.  1. 10. 11. 12.] (5, 2)
+
+        >>> store = ModelOutputStore(1)
+        >>> store.set(0, {'nse':1.})
+        >>> store.save(os.path.join(tmpdir, 'model_output_2.pkl'))
+        >>> append_model_output(infiles+[os.path.join(tmpdir, 'model_output_2.pkl')])
+        Traceback (most recent call last):
+        ...
+        ValueError: append_model_output: .../model_output_2.pkl has output keys ['nse'] but previous files ['nse', 'Q']
+
+        >>> shutil.rmtree(tmpdir)
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    if len(infiles) == 0:
+        raise ValueError('append_model_output: no input files given')
+    keys = None
+    data = []
+    for infile in infiles:
+        ikeys = output_keys(infile)
+        if keys is None:
+            keys = ikeys
+        if ikeys != keys:
+            raise ValueError('append_model_output: '+str(infile)+' has output keys '+str(ikeys)+' but previous files '+str(keys))
+        data.append(load_model_output(infile, keys=keys))
+
+    appended = ModelOutputStore(int(np.sum([ len(dd[keys[0]]) for dd in data ])))
+    for ikey in keys:
+        shapes = [ np.shape(dd[ikey])[1:] for dd in data ]
+        if len(set(shapes)) > 1:
+            raise ValueError("append_model_output: output '"+ikey+"' has different shapes in input files: "+str(shapes))
+        appended.data[ikey] = np.concatenate([ np.asarray(dd[ikey], dtype=float) for dd in data ])
+
+    if not(outfile is None):
+        appended.save(outfile, dtype=dtype, zlib=zlib)
+
+    return appended
+
+# Output key as file/variable name
+def _ncname(ikey):
+    return ikey.replace('/', '_')
+
+
+# Keys of meta data (design rows of partial stores)
+def _hidden(ikey):
+    return ikey.startswith('__') and ikey.endswith('__')
+
+
+# Requested key not in store: None for hidden keys, error otherwise
+def _missing(ikey, infile):
+    if _hidden(ikey):
+        return None
+    raise KeyError("load_model_output: output '"+ikey+"' not found in "+str(infile))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
@@ -0,0 +1,501 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import multiprocessing
+import multiprocessing.connection
+import sys
+import time
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+from model_process import call_with_retries
+
+__all__ = ['run_parallel', 'parse_procs', 'WorkerController']
+
+
+def run_parallel(run_function, store, njobs, sdir, retries=0, delay=0., dtype=None, maxprocs=None, log=sys.stderr):
+    """
+        Run all model runs of a store with parallel local processes writing their outputs
+        directly into shared result slots.
+
+
+        Runs are done in this process until the first run succeeded. Its outputs give
+        the keys and shapes of all outputs, so that the store is preallocated as
+        memory-mapped <key>.npy files in sdir (see ModelOutputStore.share). The
+        remaining runs are then done by njobs forked processes, each writing the
+        outputs of its runs straight into its rows of the shared files. Only the run
+        index and the errors of failed runs are sent back to this process; outputs
+        are never pickled or copied back. If sdir is the output directory (.npy
+        format), saving the store afterwards only writes the list of keys.
+
+        If maxprocs is larger than njobs, the number of processes is adapted between
+        njobs and maxprocs by a WorkerController: it starts with njobs processes, measures
+        the runs per second and the CPU time, peak memory and block I/O of the model
+        runs (including their child processes, e.g. Raven), and ramps the number of
+        processes up or down to maximize the runs per second without exhausting
+        the memory or the CPUs of the node.
+
+        Processes that die during a run, e.g. because they were killed or ran out of
+        memory, are noticed by the end of their pipe or by a liveness check every
+        second. Their run is given to a new process up to retries times and is then
+        reported as failed with NaN outputs.
+
+
+        Definition
+        ----------
+        def run_parallel(run_function, store, njobs, sdir, retries=0, delay=0., dtype=None, maxprocs=None, log=sys.stderr):
+
+
+        Input
+        -----
+        run_function function(irun) returning dictionary of model outputs of run irun
+                     (0, ..., store.nruns-1)
+        store        empty ModelOutputStore (see lib/output_store.py)
+        njobs        number of parallel processes; minimum number if maxprocs is given
+        sdir         directory of shared result slots
+
+
+        Optional Input
+        --------------
+        retries      number of retries of a failed run (default: 0)
+        delay        seconds before first retry, doubled for every further retry (default: 0)
+        dtype        data type of shared slots, e.g. np.float32 (default: None, i.e. float64)
+        maxprocs     maximum number of parallel processes; adaptive if larger than njobs
+                     (default: None, i.e. always njobs processes)
+        log          stream of messages of adaptive number of processes (default: sys.stderr)
+
+
+        Output
+        ------
+        generator of (irun, errors) for every run in order of completion;
+        errors is None for successful runs and the list of tracebacks of failed runs
+        (their outputs stay NaN)
+
+
+        Examples
+        --------
+        >>> import os, tempfile, shutil
+        >>> import numpy as np
+        >>> from output_store import ModelOutputStore, load_model_output
+        >>> def model(irun):
+        ...     if irun in [0, 5]:
+        ...         raise ValueError('model crashed')
+        ...     return {'sum': float(irun), 'Q': np.arange(3.)*irun, 'pid': os.getpid()}
+        >>> tmpdir = tempfile.mkdtemp()
+        >>> store  = ModelOutputStore(8)
+        >>> failed = sorted([ irun for irun, errors in run_parallel(model, store, 3, os.path.join(tmpdir, 'model_output'))
+        ...                   if not(errors is None) ])
+        >>> print(failed, store['sum'])
+        [0, 5] [nan  1.  2.  3.  4. nan  6.  7.]
+        >>> print(len(np.unique(store['pid'][2:])) > 1)
+        True
+        >>> # a killed process does not stall the other processes
+        >>> def killed(irun):
+        ...     if irun == 4:
+        ...         os.kill(os.getpid(), 9)
+        ...     return model(irun)
+        >>> store2 = ModelOutputStore(8)
+        >>> print([ (irun, errors) for irun, errors in run_parallel(killed, store2, 3, os.path.join(tmpdir, 'model_output_k'), log=None)
+        ...         if irun == 4 ], store2['sum'])
+        [(4, ['worker process of run 4 died (exit code -9)'])] [nan  1.  2.  3. nan nan  6.  7.]
+        >>> store.save(os.path.join(tmpdir, 'model_output'))
+        >>> print(load_model_output(os.path.join(tmpdir, 'model_output'))['Q'][7])
+        [ 0.  7. 14.]
+
+        >>> # adaptive number of processes between 1 and 4
+        >>> store  = ModelOutputStore(40)
+        >>> failed = sorted([ irun for irun, errors in run_parallel(model, store, 1, os.path.join(tmpdir, 'model_output_2'),
+        ...                                                           maxprocs=4, log=None)
+        ...                   if not(errors is None) ])
+        >>> print(failed, np.nansum(store['sum']) == np.sum(np.arange(40)) - 5)
+        [0, 5] True
+
+        >>> # model processes that die are run again, then reported as failed
+        >>> import signal
+        >>> def fragile(irun):
+        ...     if irun == 6 or (irun == 3 and not os.path.exists(os.path.join(tmpdir, 'died_3'))):
+        ...         open(os.path.join(tmpdir, 'died_'+str(irun)), 'w').close()
+        ...         os.kill(os.getpid(), signal.SIGKILL)
+        ...     return {'sum': float(irun)}
+        >>> store  = ModelOutputStore(8)
+        >>> failed = [ (irun, errors) for irun, errors in run_parallel(fragile, store, 1, os.path.join(tmpdir, 'model_output_3'),
+        ...                                                             retries=1, maxprocs=2, log=None)
+        ...            if not(errors is None) ]
+        >>> print(failed)
+        [(6, ['worker process of run 6 died (exit code -9)', 'worker process of run 6 died (exit code -9)'])]
+        >>> print(store['sum'])
+        [ 0.  1.  2.  3.  4.  5. nan  7.]
+        >>> shutil.rmtree(tmpdir)
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    # first successful run gives keys and shapes of shared slots
+    irun = 0
+    while irun < store.nruns:
+        model, errors = call_with_retries(lambda: run_function(irun), retries=retries, delay=delay)
+        if model is None:
+            yield irun, errors
+        else:
+            store.set(irun, model)
+            yield irun, None
+        irun += 1
+        if not(model is None):
+            break
+    if irun >= store.nruns:
+        return
+    store.share(sdir, dtype=dtype)
+
+    # forked processes inherit run function and store with its memory maps
+    _slots['run_function'] = run_function
+    _slots['store']        = store
+    _slots['retries']      = retries
+    _slots['delay']        = delay
+    try:
+        context = multiprocessing.get_context('fork')
+    except AttributeError:     # Python 2 always forks
+        context = multiprocessing
+    # fixed number of processes if controller cannot change it
+    controller = WorkerController(njobs, njobs if maxprocs is None else max(int(njobs), int(maxprocs)))
+    try:
+        for result in _run_workers(context, range(irun, store.nruns), controller, log, retries=retries):
+            yield result
+    finally:
+        _slots.clear()
+
+
+def parse_procs(procs):
+    """
+        Number of parallel processes given as 'n' (fixed) or 'nmin:nmax' (adaptive).
+
+
+        Definition
+        ----------
+        def parse_procs(procs):
+
+
+        Examples
+        --------
+        >>> print(parse_procs('4'), parse_procs('2:16'), parse_procs(1))
+        (4, 4) (2, 16) (1, 1)
+        >>> parse_procs('8:2')
+        Traceback (most recent call last):
+        ...
+        ValueError: parse_procs: need 1 <= nmin <= nmax but got '8:2'
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    procs = str(procs).split(':')
+    nmin  = int(procs[0])
+    nmax  = int(procs[-1])
+    if len(procs) > 2 or nmin < 1 or nmax < nmin:
+        raise ValueError("parse_procs: need 1 <= nmin <= nmax but got '"+':'.join(procs)+"'")
+    return nmin, nmax
+
+
+class WorkerController(object):
+    """
+        Controller of the number of parallel model processes maximizing the runs per second.
+
+
+        Runs are measured in windows of at least max(2*nprocs, 4) finished runs. At the
+        end of every window, the throughput (runs per second) is compared with the
+        previous window: the number of processes keeps moving in the same direction
+        (one process per window) while the throughput does not drop by more than
+        tolerance, and turns around otherwise (hill climbing). Increases are vetoed if
+
+            - the peak memory of a run times the additional processes does not fit
+              into the available memory (minus memreserve of the total memory)
+            - the CPUs are saturated, i.e. processes times CPU time per run wall time
+              would exceed the number of CPUs
+
+        and the number of processes is decreased if the available memory falls below
+        memreserve of the total memory. The block I/O per run is reported with every
+        change so that I/O bound models can be spotted.
+
+
+        Definition
+        ----------
+        class WorkerController(minprocs, maxprocs, start=None, tolerance=0.05, memreserve=0.1, ncpu=None):
+
+
+        Input
+        -----
+        minprocs     minimum number of processes
+        maxprocs     maximum number of processes
+
+
+        Optional Input
+        --------------
+        start        initial number of processes (default: minprocs)
+        tolerance    relative drop of throughput regarded as worse (default: 0.05)
+        memreserve   fraction of total memory kept free (default: 0.1)
+        ncpu         number of CPUs (default: multiprocessing.cpu_count())
+
+
+        Methods
+        -------
+        record(usage)               add usage of one finished run: dictionary with 'walltime', 'cputime' [s],
+                                    'maxrss' [MB] and 'ioblocks'
+        window_done()               True if enough runs were recorded to decide
+        update(elapsed, memory=None) new number of processes after a window of elapsed seconds;
+                                    memory is (available, total) in MB (default: read from /proc/meminfo)
+        message                     description of the last update
+
+
+        Examples
+        --------
+        >>> # throughput grows up to 6 processes, then I/O contention reduces it
+        >>> def throughput(n):
+        ...     return min(n, 6) - 0.5*max(0, n-6)
+        >>> ctrl  = WorkerController(1, 12, ncpu=64)
+        >>> steps = [ctrl.nprocs]
+        >>> for window in range(14):
+        ...     while not ctrl.window_done():
+        ...         ctrl.record({'walltime': 1., 'cputime': 0.9, 'maxrss': 100., 'ioblocks': 10})
+        ...     steps.append(ctrl.update(ctrl.nrecorded/throughput(ctrl.nprocs), memory=(8000., 16000.)))
+        >>> print(steps)
+        [1, 2, 3, 4, 5, 6, 7, 6, 5, 6, 7, 6, 5, 6, 7]
+
+        >>> # not enough memory for more processes
+        >>> ctrl = WorkerController(1, 12, start=4, ncpu=64)
+        >>> while not ctrl.window_done():
+        ...     ctrl.record({'walltime': 1., 'cputime': 0.9, 'maxrss': 1000., 'ioblocks': 0})
+        >>> print(ctrl.update(2., memory=(2200., 16000.)))
+        4
+
+        >>> # CPUs saturated
+        >>> ctrl = WorkerController(1, 12, start=4, ncpu=4)
+        >>> while not ctrl.window_done():
+        ...     ctrl.record({'walltime': 1., 'cputime': 0.99, 'maxrss': 100., 'ioblocks': 0})
+        >>> print(ctrl.update(2., memory=(8000., 16000.)), ctrl.message)
+        4 hold: CPUs saturated ...
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+
+    def __init__(self, minprocs, maxprocs, start=None, tolerance=0.05, memreserve=0.1, ncpu=None):
+        self.minprocs   = int(minprocs)
+        self.maxprocs   = int(maxprocs)
+        self.nprocs     = self.minprocs if start is None else min(max(int(start), self.minprocs), self.maxprocs)
+        self.tolerance  = float(tolerance)
+        self.memreserve = float(memreserve)
+        self.ncpu       = multiprocessing.cpu_count() if ncpu is None else int(ncpu)
+        self.direction  = 1
+        self.lastrate   = None
+        self.message    = ''
+        self._reset()
+
+    def record(self, usage):
+        self.nrecorded += 1
+        self.walltime  += usage['walltime']
+        self.cputime   += usage['cputime']
+        self.maxrss     = max(self.maxrss, usage['maxrss'])
+        self.ioblocks  += usage['ioblocks']
+
+    def window_done(self):
+        return self.nrecorded >= max(2*self.nprocs, 4)
+
+    def update(self, elapsed, memory=None):
+        if memory is None:
+            memory = _memory()
+        rate    = self.nrecorded / max(elapsed, 1e-9)
+        cpufrac = self.cputime / max(self.walltime, 1e-9)     # CPUs used by one run
+        if not(self.lastrate is None) and rate < self.lastrate*(1.-self.tolerance):
+            self.direction = -self.direction
+        target = min(max(self.nprocs + self.direction, self.minprocs), self.maxprocs)
+        reason = 'throughput'
+        if target > self.nprocs:
+            if not(memory is None) and self.maxrss*(target-self.nprocs) > memory[0] - self.memreserve*memory[1]:
+                target, reason = self.nprocs, 'hold: memory'
+            elif target*cpufrac > self.ncpu:
+                target, reason = self.nprocs, 'hold: CPUs saturated'
+        if not(memory is None) and memory[0] < self.memreserve*memory[1] and self.nprocs > self.minprocs:
+            target, reason = self.nprocs-1, 'memory pressure'
+            self.direction = -1
+        self.message = '{:s} ({:.3f} runs/s with {:d} processes; per run: {:.2f} CPUs, {:.0f} MB peak, {:.0f} I/O blocks)'.format(
+            reason, rate, self.nprocs, cpufrac, self.maxrss, self.ioblocks/self.nrecorded)
+        self.lastrate = rate
+        self.nprocs   = target
+        self._reset()
+        return target
+
+    def _reset(self):
+        self.nrecorded = 0
+        self.walltime  = 0.
+        self.cputime   = 0.
+        self.maxrss    = 0.
+        self.ioblocks  = 0
+        self.t0        = time.time()
+
+
+# state of run_parallel inherited by forked processes
+_slots = {}
+
+
+# Fixed or adaptive number of forked processes supervised through one pipe each; every process holds either one run
+# or gets a stop (None). Runs of processes that died, e.g. killed or out of memory, are given to a new
+# process up to retries times and are then reported as failed with NaN outputs.
+def _run_workers(context, runs, controller, log, retries=0, poll=1.):
+    runs    = iter(runs)
+    again   = []     # runs of died processes
+    deaths  = {}     # messages of died processes per run
+    workers = {}     # connection: [process, run]
+    try:
+        while True:
+            # start processes up to target
+            while len(workers) < controller.nprocs:
+                irun = again.pop(0) if len(again) > 0 else next(runs, None)
+                if irun is None:
+                    break
+                conn, child = context.Pipe()
+                worker = context.Process(target=_slot_worker, args=(child,))
+                worker.daemon = True
+                worker.start()
+                child.close()     # end of pipe reads EOF when process dies
+                workers[conn] = [worker, irun]
+                _send(conn, irun)
+            if len(workers) == 0:
+                break
+            ready = multiprocessing.connection.wait(list(workers.keys()), timeout=poll)
+            for conn in list(workers.keys()):
+                worker, irun = workers[conn]
+                message = None
+                if conn in ready:
+                    try:
+                        message = conn.recv()
+                    except EOFError:
+                        pass
+                elif worker.is_alive():
+                    continue
+                if message is None:
+                    # process died during run: its slot might be partially written
+                    del workers[conn]
+                    conn.close()
+                    worker.join()
+                    deaths.setdefault(irun, []).append('worker process of run '+str(irun)+' died (exit code '+
+                                                       str(worker.exitcode)+')')
+                    if not(log is None):
+                        log.write(deaths[irun][-1]+('; run again\n' if len(deaths[irun]) <= retries else '\n'))
+                        log.flush()
+                    if len(deaths[irun]) <= retries:
+                        again.append(irun)
+                    else:
+                        store = _slots['store']
+                        for ikey in store.keys():
+                            store[ikey][irun] = float('nan')
+                        yield irun, deaths[irun]
+                    continue
+                irun, errors, usage = message
+                yield irun, errors
+                controller.record(usage)
+                if controller.window_done():
+                    nprocs = controller.nprocs
+                    if controller.update(time.time() - controller.t0) != nprocs and not(log is None):
+                        log.write('processes: '+str(nprocs)+' -> '+str(controller.nprocs)+': '+controller.message+'\n')
+                        log.flush()
+                nextrun = None
+                if len(workers) <= controller.nprocs:
+                    nextrun = again.pop(0) if len(again) > 0 else next(runs, None)
+                if nextrun is None:
+                    _send(conn, None)
+                    del workers[conn]
+                    conn.close()
+                    worker.join()
+                else:
+                    workers[conn][1] = nextrun
+                    _send(conn, nextrun)
+    finally:
+        for conn in workers:
+            _send(conn, None)
+        for conn in workers:
+            workers[conn][0].join()
+
+
+# Send to process; a died process is noticed by the next wait on its connection
+def _send(conn, irun):
+    try:
+        conn.send(irun)
+    except (IOError, OSError):
+        pass
+
+
+# Forked process running runs received from conn until it gets None; sends back (irun, errors, usage)
+def _slot_worker(conn):
+    while True:
+        try:
+            irun = conn.recv()
+        except EOFError:     # parent died
+            return
+        if irun is None:
+            return
+        t0 = time.time()
+        u0 = _usage()
+        try:
+            result = _run_slot(irun)
+        except Exception as err:     # e.g. outputs not fitting into shared slots
+            result = (irun, [type(err).__name__+': '+str(err)])
+        u1 = _usage()
+        usage = {'walltime': time.time() - t0, 'cputime': u1[0] - u0[0], 'maxrss': u1[1], 'ioblocks': u1[2] - u0[2]}
+        conn.send((result[0], result[1], usage))
+
+
+# CPU time [s], peak memory [MB] and block I/O of this process and its children (e.g. model executables)
+def _usage():
+    if resource is None:
+        return 0., 0., 0
+    usage = [ resource.getrusage(who) for who in [resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN] ]
+    scale = 1024.**2 if sys.platform == 'darwin' else 1024.     # bytes on macOS, kB else
+    return (sum([ uu.ru_utime + uu.ru_stime for uu in usage ]), usage[1].ru_maxrss / scale,
+            sum([ uu.ru_inblock + uu.ru_oublock for uu in usage ]))
+
+
+# Available and total memory in MB (Linux) or None
+def _memory():
+    try:
+        ff = open('/proc/meminfo', 'r')
+        lines = ff.readlines()
+        ff.close()
+    except (IOError, OSError):
+        return None
+    info = dict([ (ll.split(':')[0], float(ll.split()[1])/1024.) for ll in lines if len(ll.split()) > 1 ])
+    if not('MemAvailable' in info):
+        return None
+    return info['MemAvailable'], info['MemTotal']
+
+
+# Run one model run in forked process and write outputs into its shared slot
+def _run_slot(irun):
+    model, errors = call_with_retries(lambda: _slots['run_function'](irun),
+                                      retries=_slots['retries'], delay=_slots['delay'])
+    if model is None:
+        return irun, errors
+    _slots['store'].set(irun, model)
+    return irun, None
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
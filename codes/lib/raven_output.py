@@ -0,0 +1,421 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import collections
+import datetime
+import itertools
+import numpy as np
+
+__all__ = ['read_raven_csv', 'read_raven_diagnostics', 'read_raven_observations', 'read_raven_multidata']
+
+
+def read_raven_csv(infile, cname, skip=0, nrows=None):
+    """
+        Read selected columns of a Raven CSV output file (e.g. Hydrographs.csv,
+        custom outputs) into a float array.
+
+
+        Columns are picked by their header name (or index). Warm-up rows are skipped
+        without being split and only the selected columns are converted to numbers
+        with numpy's C-level text parser. This is much faster than fread, which
+        splits every line in Python, for multi-decade daily or hourly outputs.
+
+
+        Definition
+        ----------
+        def read_raven_csv(infile, cname, skip=0, nrows=None):
+
+
+        Input
+        -----
+        infile       Raven CSV output file with one header line
+        cname        column(s) to read: header name (string), e.g. 'hmets [m3/s]',
+                     column index (int, starting with 0), or list of names/indexes.
+                     Header names are compared after stripping blanks and quotes.
+
+
+        Optional Input
+        --------------
+        skip         number of data rows to skip after the header, e.g. warm-up period (default: 0)
+        nrows        number of data rows to read after skip (default: None, i.e. all)
+
+
+        Output
+        ------
+        1D float array if cname is a single name or index,
+        2D float array (nrows, ncolumns) if cname is a list.
+        Empty entries (e.g. missing observations) are NaN.
+
+
+        Examples
+        --------
+        >>> import os, tempfile
+        >>> filename = os.path.join(tempfile.mkdtemp(), 'Hydrographs.csv')
+        >>> ff = open(filename, 'w')
+        >>> null = ff.write('time,date,hour,precip [mm/day],hmets [m3/s],hmets (observed) [m3/s]\\n')
+        >>> null = ff.write('0,1989-01-01,00:00:00,---,0.0,5.78,\\n')
+        >>> null = ff.write('1,1989-01-02,00:00:00,1.2,3.5,5.66,\\n')
+        >>> null = ff.write('2,1989-01-03,00:00:00,0.0,4.25,,\\n')
+        >>> ff.close()
+
+        >>> print(read_raven_csv(filename, 'hmets [m3/s]', skip=1))
+        [3.5  4.25]
+        >>> print(read_raven_csv(filename, ['hmets [m3/s]', 'hmets (observed) [m3/s]'], skip=1))
+        [[3.5   5.66]
+         [4.25   nan]]
+        >>> print(read_raven_csv(filename, 4, skip=0, nrows=2))
+        [0.  3.5]
+
+        >>> # same as fread
+        >>> from fread import fread
+        >>> print(np.all(read_raven_csv(filename, 4, skip=1) == np.transpose(fread(filename, skip=2, cskip=4, nc=1))[0]))
+        True
+
+        >>> read_raven_csv(filename, 'Q [m3/s]')
+        Traceback (most recent call last):
+        ...
+        ValueError: read_raven_csv: column 'Q [m3/s]' not found in header of ...
+
+        >>> # Clean up doctest
+        >>> import shutil
+        >>> shutil.rmtree(os.path.dirname(filename))
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    single = not isinstance(cname, (list, tuple, np.ndarray))
+    if single:
+        cname = [cname]
+
+    with open(infile, 'r') as ff:
+        header = _split_header(ff.readline())
+        usecols = []
+        for cc in cname:
+            if isinstance(cc, (int, np.integer)):
+                usecols.append(int(cc))
+            else:
+                cc = cc.strip().strip('"').strip("'")
+                if not(cc in header):
+                    raise ValueError("read_raven_csv: column '"+cc+"' not found in header of "+str(infile))
+                usecols.append(header.index(cc))
+
+        # skip rows without splitting them
+        if skip > 0:
+            collections.deque(itertools.islice(ff, skip), maxlen=0)
+        if nrows is None:
+            lines = ff.read().splitlines()
+        else:
+            lines = list(itertools.islice(ff, nrows))
+
+    # vectorized parsing of selected columns;
+    # only columns with empty cells (e.g. missing observations) need the slower converter
+    try:
+        var = np.loadtxt(lines, delimiter=',', usecols=usecols, dtype=float, ndmin=2)
+    except ValueError:
+        var = np.loadtxt(lines, delimiter=',', usecols=usecols, dtype=float, ndmin=2,
+                         converters=dict([ (ii,_empty_nan) for ii in usecols ]))
+
+    var = np.array(var, dtype=float).reshape((-1, len(usecols)))
+    if single:
+        var = var[:,0]
+
+    return var
+
+
+def read_raven_diagnostics(infile):
+    """
+        Read Raven's Diagnostics.csv into a dictionary of metric arrays.
+
+
+        Definition
+        ----------
+        def read_raven_diagnostics(infile):
+
+
+        Input
+        -----
+        infile       Raven diagnostics file (Diagnostics.csv)
+
+
+        Output
+        ------
+        dictionary with
+            'series'      list of names of observed data series (one per row)
+            'filename'    list of observation file names (one per row)
+            <metric>      float array with one value per row for every metric column
+                          of the header, e.g. 'DIAG_NASH_SUTCLIFFE', 'DIAG_KLING_GUPTA'
+
+
+        Examples
+        --------
+        >>> import os, tempfile
+        >>> filename = os.path.join(tempfile.mkdtemp(), 'Diagnostics.csv')
+        >>> ff = open(filename, 'w')
+        >>> null = ff.write('observed data series,filename,DIAG_NASH_SUTCLIFFE,DIAG_RMSE,\\n')
+        >>> null = ff.write('HYDROGRAPH_CALIBRATION[1],data_obs/Qobs_daily.rvt,0.6543,23.1,\\n')
+        >>> ff.close()
+        >>> diag = read_raven_diagnostics(filename)
+        >>> print(diag['series'], diag['DIAG_NASH_SUTCLIFFE'][-1], diag['DIAG_RMSE'])
+        ['HYDROGRAPH_CALIBRATION[1]'] 0.6543 [23.1]
+
+        >>> # Clean up doctest
+        >>> import shutil
+        >>> shutil.rmtree(os.path.dirname(filename))
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    with open(infile, 'r') as ff:
+        header = _split_header(ff.readline())
+        rows   = [ ll.rstrip().split(',') for ll in ff if len(ll.strip()) > 0 ]
+
+    diag = {}
+    diag['series']   = [ rr[0] for rr in rows ]
+    diag['filename'] = [ rr[1] if len(rr) > 1 else '' for rr in rows ]
+    for ii in range(2, len(header)):
+        if header[ii] == '':
+            continue
+        diag[header[ii]] = np.array([ _tofloat(rr[ii]) if len(rr) > ii else np.nan for rr in rows ], dtype=float)
+
+    return diag
+
+
+def read_raven_observations(infile, missing=-1.2345):
+    """
+        Read a time series of observations (:ObservationData block) of a Raven RVT file,
+        e.g. observed streamflow Qobs_daily.rvt.
+
+
+        Definition
+        ----------
+        def read_raven_observations(infile, missing=-1.2345):
+
+
+        Input
+        -----
+        infile       Raven RVT file with one block
+                         :ObservationData  HYDROGRAPH  1  m3/s
+                          1954-01-01  0:00:00   1  20819
+                         5.78
+                         ...
+                         :EndObservationData
+
+
+        Optional Input
+        --------------
+        missing      value of missing observations; set to NaN (default: -1.2345)
+
+
+        Output
+        ------
+        dictionary with
+            'type'        observation type, e.g. 'HYDROGRAPH'
+            'id'          subbasin/HRU ID as string
+            'units'       units, e.g. 'm3/s'
+            'start'       datetime.datetime of first observation
+            'interval'    time step in days
+            'values'      float array of observations; missing values are NaN
+
+
+        Examples
+        --------
+        >>> import os, tempfile
+        >>> filename = os.path.join(tempfile.mkdtemp(), 'Qobs_daily.rvt')
+        >>> ff = open(filename, 'w')
+        >>> null = ff.write(':ObservationData\\tHYDROGRAPH\\t1\\tm3/s\\n 1954-01-01  0:00:00   1  4\\n5.78 \\n5.66 \\n-1.2345 \\n5.61 \\n:EndObservationData\\n')
+        >>> ff.close()
+        >>> obs = read_raven_observations(filename)
+        >>> print(obs['type'], obs['units'], obs['start'], obs['interval'], obs['values'])
+        HYDROGRAPH m3/s 1954-01-01 00:00:00 1.0 [5.78 5.66  nan 5.61]
+
+        >>> # Clean up doctest
+        >>> import shutil
+        >>> shutil.rmtree(os.path.dirname(filename))
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    with open(infile, 'r') as ff:
+        lines = ff.read().splitlines()
+
+    iblock = [ ii for ii, ll in enumerate(lines) if ll.strip().startswith(':ObservationData') ]
+    if len(iblock) == 0:
+        raise ValueError('read_raven_observations: no :ObservationData block in '+str(infile))
+    iblock = iblock[0]
+    head   = lines[iblock].split()
+    time   = lines[iblock+1].split()
+    nvalue = int(time[3])
+
+    obs = {}
+    obs['type']     = head[1]
+    obs['id']       = head[2]
+    obs['units']    = head[3] if len(head) > 3 else ''
+    obs['start']    = datetime.datetime.strptime(time[0]+' '+time[1].split('.')[0], '%Y-%m-%d %H:%M:%S')
+    obs['interval'] = float(time[2])
+    values = np.array(lines[iblock+2:iblock+2+nvalue], dtype=float)
+    obs['values']   = np.where(values == missing, np.nan, values)
+
+    return obs
+
+
+def read_raven_multidata(infile):
+    """
+        Read the forcing time series (:MultiData block) of a Raven RVT file,
+        e.g. meteo_daily.rvt.
+
+
+        Definition
+        ----------
+        def read_raven_multidata(infile):
+
+
+        Input
+        -----
+        infile       Raven RVT file with one block
+                         :MultiData
+                          1954-01-01  0:00:00   1  20819
+                         :Parameters      RAINFALL   SNOWFALL   TEMP_DAILY_MIN   TEMP_DAILY_MAX   PET
+                         :Units           mm/d       mm/d       C                C                mm/d
+                         0.000000 0.000000 -17.991528 -4.024469 0.000000
+                         ...
+                         :EndMultiData
+
+
+        Output
+        ------
+        dictionary with
+            'start'       datetime.datetime of first time step
+            'interval'    time step in days
+            'units'       ordered dictionary of units per forcing
+            'data'        ordered dictionary of float arrays per forcing, e.g. 'RAINFALL'
+
+
+        Examples
+        --------
+        >>> import os, tempfile
+        >>> filename = os.path.join(tempfile.mkdtemp(), 'meteo_daily.rvt')
+        >>> ff = open(filename, 'w')
+        >>> null = ff.write(':MultiData\\n 1954-01-01  0:00:00   1  3\\n:Parameters  RAINFALL  TEMP_DAILY_MIN\\n:Units  mm/d  C\\n')
+        >>> null = ff.write('0.0 -17.9\\n2.5 -11.3\\n1.0 -17.8\\n:EndMultiData\\n')
+        >>> ff.close()
+        >>> forcing = read_raven_multidata(filename)
+        >>> print(forcing['start'], forcing['interval'], list(forcing['units'].items()))
+        1954-01-01 00:00:00 1.0 [('RAINFALL', 'mm/d'), ('TEMP_DAILY_MIN', 'C')]
+        >>> print(forcing['data']['TEMP_DAILY_MIN'])
+        [-17.9 -11.3 -17.8]
+
+        >>> # Clean up doctest
+        >>> import shutil
+        >>> shutil.rmtree(os.path.dirname(filename))
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    with open(infile, 'r') as ff:
+        lines = ff.read().splitlines()
+
+    iblock = [ ii for ii, ll in enumerate(lines) if ll.strip().startswith(':MultiData') ]
+    if len(iblock) == 0:
+        raise ValueError('read_raven_multidata: no :MultiData block in '+str(infile))
+    iblock = iblock[0]
+    time   = lines[iblock+1].split()
+    nvalue = int(time[3])
+    names  = []
+    units  = []
+    iline  = iblock+2
+    while lines[iline].strip().startswith(':'):
+        words = lines[iline].replace(',', ' ').split()
+        if words[0] == ':Parameters':
+            names = words[1:]
+        elif words[0] == ':Units':
+            units = words[1:]
+        iline += 1
+
+    values = np.array([ ll.replace(',', ' ').split() for ll in lines[iline:iline+nvalue] ], dtype=float)
+    forcing = {}
+    forcing['start']    = datetime.datetime.strptime(time[0]+' '+time[1].split('.')[0], '%Y-%m-%d %H:%M:%S')
+    forcing['interval'] = float(time[2])
+    forcing['units']    = collections.OrderedDict(zip(names, units))
+    forcing['data']     = collections.OrderedDict([ (nn, values[:,ii]) for ii, nn in enumerate(names) ])
+
+    return forcing
+
+
+# Header line split into stripped cell names
+def _split_header(line):
+    return [ hh.strip().strip('"').strip("'") for hh in line.rstrip().split(',') ]
+
+
+# Converter for loadtxt: empty cell -> NaN
+def _empty_nan(s):
+    s = s.strip()
+    return float(s) if len(s) > 0 else np.nan
+
+
+def _tofloat(s):
+    try:
+        return float(s)
+    except ValueError:
+        return np.nan
+
+
+if __name__ == '__main__':
+    import doctest
+    import os
+    import sys
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    sys.path.append(dir_path)
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
+
+    # -------------------------
+    # benchmark against fread on 50 years of daily Raven hydrographs
+    # -------------------------
+    import datetime
+    import shutil
+    import tempfile
+    import timeit
+    from fread import fread
+
+    ndays  = 50*365
+    warmup = 2*365
+    tmpdir = tempfile.mkdtemp()
+    fname  = os.path.join(tmpdir, 'Hydrographs.csv')
+    day0   = datetime.date(1961, 1, 1)
+    qsim   = np.random.random(ndays)*100.
+    with open(fname, 'w') as ff:
+        ff.write('time,date,hour,precip [mm/day],hmets [m3/s],hmets (observed) [m3/s]\n')
+        for ii in range(ndays):
+            ff.write('{:d},{:s},00:00:00,{:.4f},{:.6f},{:.2f},\n'.format(
+                ii, str(day0+datetime.timedelta(ii)), qsim[ii]/10., qsim[ii], qsim[ii]*0.9))
+
+    q1 = np.transpose(fread(fname, skip=warmup+1, cskip=4, nc=1))[0]
+    q2 = read_raven_csv(fname, 'hmets [m3/s]', skip=warmup)
+    assert np.all(q1 == q2)
+
+    nrep   = 10
+    t_fread = timeit.timeit(lambda: fread(fname, skip=warmup+1, cskip=4, nc=1), number=nrep)
+    t_raven = timeit.timeit(lambda: read_raven_csv(fname, 'hmets [m3/s]', skip=warmup), number=nrep)
+    print('Hydrographs.csv with {:d} daily rows'.format(ndays))
+    print('fread:           {:9.2f} ms'.format(t_fread/nrep*1000.))
+    print('read_raven_csv:  {:9.2f} ms  (speedup {:.1f}x)'.format(t_raven/nrep*1000., t_fread/t_raven))
+    shutil.rmtree(tmpdir)
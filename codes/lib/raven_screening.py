@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+
+__all__ = ['raven_outputs_needed', 'screening_templates']
+
+
+def raven_outputs_needed(keys, outputs_of_key):
+    """
+        Raven outputs needed to derive the requested model output keys of a driver.
+
+
+        Definition
+        ----------
+        def raven_outputs_needed(keys, outputs_of_key):
+
+
+        Input
+        -----
+        keys             list of model output keys computed in screening mode, e.g. ['nse']
+        outputs_of_key   dictionary of all model output keys of the driver with the list of
+                         Raven outputs each key is derived from:
+                             'Hydrographs'     Hydrographs.csv
+                             'CustomOutput'    files of :CustomOutput commands
+                             'DIAG_<METRIC>'   column of Diagnostics.csv, e.g. 'DIAG_NASH_SUTCLIFFE'
+
+
+        Output
+        ------
+        sorted list of needed Raven outputs
+
+
+        Examples
+        --------
+        >>> outputs_of_key = {'nse': ['DIAG_NASH_SUTCLIFFE'], 'kge': ['DIAG_KLING_GUPTA'], 'Q': ['Hydrographs']}
+        >>> print(raven_outputs_needed(['nse', 'kge'], outputs_of_key))
+        ['DIAG_KLING_GUPTA', 'DIAG_NASH_SUTCLIFFE']
+        >>> raven_outputs_needed(['rmse'], outputs_of_key)
+        Traceback (most recent call last):
+        ...
+        ValueError: raven_outputs_needed: unknown model output key 'rmse'; available are: Q, kge, nse
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    needed = set()
+    for ikey in keys:
+        if not(ikey in outputs_of_key):
+            raise ValueError("raven_outputs_needed: unknown model output key '"+ikey+"'; available are: "+
+                             ', '.join(sorted(outputs_of_key.keys())))
+        needed.update(outputs_of_key[ikey])
+    return sorted(needed)
+
+
+def screening_templates(rvi, rvt, outputs, obs_pattern='Qobs'):
+    """
+        I/O-minimal variants of Raven RVI and RVT templates that write only the outputs needed.
+
+
+        Screening runs often keep only a few values per run, e.g. the NSE of Diagnostics.csv.
+        The RVI and RVT (templates) are changed such that Raven writes nothing else:
+
+            Hydrographs   not needed:  :SuppressOutput is added, i.e. no Hydrographs.csv
+                                       and other standard outputs; diagnostics and custom
+                                       outputs are still written
+            CustomOutput  not needed:  all :CustomOutput commands are removed
+            DIAG_<METRIC>              :EvaluationMetrics lists only the needed metrics;
+                                       if no metric is needed, the command is removed and
+                                       observations (:RedirectToFile lines of the RVT whose
+                                       file name contains obs_pattern) are not read
+
+        Commands of the templates are not changed otherwise, e.g. parameter placeholders stay.
+
+
+        Definition
+        ----------
+        def screening_templates(rvi, rvt, outputs, obs_pattern='Qobs'):
+
+
+        Input
+        -----
+        rvi          content (template) of Raven RVI file
+        rvt          content (template) of Raven RVT file
+        outputs      list of needed Raven outputs (see raven_outputs_needed):
+                     'Hydrographs', 'CustomOutput', 'DIAG_<METRIC>'
+
+
+        Optional Input
+        --------------
+        obs_pattern  part of file names of observations redirected to in the RVT (default: 'Qobs')
+
+
+        Output
+        ------
+        (rvi, rvt) with reduced outputs
+
+
+        Examples
+        --------
+        >>> rvi = '\\n'.join([':StartDate  1989-01-01 00:00:00',
+        ...                   ':CustomOutput DAILY AVERAGE Between:PONDED_WATER.And.SOIL[0] BY_BASIN',
+        ...                   ':EvaluationMetrics NASH_SUTCLIFFE RMSE',
+        ...                   '#:SuppressOutput',
+        ...                   ':SilentMode'])
+        >>> rvt = '\\n'.join([':Gauge',
+        ...                   '  :RedirectToFile data_obs/Salmon-River-Near-Prince-George_meteo_daily.rvt',
+        ...                   ':EndGauge',
+        ...                   ':RedirectToFile data_obs/Salmon-River-Near-Prince-George_Qobs_daily.rvt'])
+
+        >>> # only NSE
+        >>> srvi, srvt = screening_templates(rvi, rvt, ['DIAG_NASH_SUTCLIFFE'])
+        >>> print(srvi)
+        :StartDate  1989-01-01 00:00:00
+        :EvaluationMetrics NASH_SUTCLIFFE
+        #:SuppressOutput
+        :SilentMode
+        :SuppressOutput
+        >>> srvt == rvt
+        True
+
+        >>> # only simulated Q: no observations and diagnostics
+        >>> srvi, srvt = screening_templates(rvi, rvt, ['Hydrographs'])
+        >>> print(srvi)
+        :StartDate  1989-01-01 00:00:00
+        #:SuppressOutput
+        :SilentMode
+        >>> print(srvt)
+        :Gauge
+          :RedirectToFile data_obs/Salmon-River-Near-Prince-George_meteo_daily.rvt
+        :EndGauge
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    metrics = [ oo[len('DIAG_'):] for oo in outputs if oo.startswith('DIAG_') ]
+
+    lines = []
+    for line in rvi.split('\n'):
+        command = _command(line)
+        if command == ':CustomOutput' and not('CustomOutput' in outputs):
+            continue
+        if command == ':SuppressOutput':
+            continue
+        if command == ':EvaluationMetrics':
+            if len(metrics) == 0:
+                continue
+            line = ':EvaluationMetrics '+' '.join(metrics)
+        lines.append(line)
+    if not('Hydrographs' in outputs):
+        lines.append(':SuppressOutput')
+    rvi = '\n'.join(lines)
+
+    if len(metrics) == 0:
+        lines = []
+        for line in rvt.split('\n'):
+            if _command(line) == ':RedirectToFile' and obs_pattern in line:
+                continue
+            lines.append(line)
+        rvt = '\n'.join(lines)
+
+    return rvi, rvt
+
+
+# Raven command of a line (first word without comment) or None
+def _command(line):
+    words = line.split('#')[0].split()
+    if len(words) == 0:
+        return None
+    return words[0]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
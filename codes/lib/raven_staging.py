@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import datetime
+import math
+import os
+import re
+import socket
+
+__all__ = ['raven_window', 'trim_raven_timeseries', 'stage_raven_forcing']
+
+
+def raven_window(rvi):
+    """
+        Simulation period of a Raven RVI file (template) from :StartDate and :EndDate or :Duration.
+
+
+        Definition
+        ----------
+        def raven_window(rvi):
+
+
+        Input
+        -----
+        rvi          content (template) of Raven RVI file
+
+
+        Output
+        ------
+        (start, end) as datetime
+
+
+        Examples
+        --------
+        >>> rvi = ':StartDate  1989-01-01 00:00:00 # 1954-01-01 00:00:00\\n:EndDate 2010-12-31 00:00:00\\n'
+        >>> print(raven_window(rvi))
+        (datetime.datetime(1989, 1, 1, 0, 0), datetime.datetime(2010, 12, 31, 0, 0))
+        >>> print(raven_window(':StartDate 1989-01-01 00:00:00\\n:Duration 365\\n')[1])
+        1990-01-01 00:00:00
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    start    = None
+    end      = None
+    duration = None
+    for line in rvi.split('\n'):
+        words = line.split('#')[0].split()
+        if len(words) < 2:
+            continue
+        if words[0] == ':StartDate':
+            start = _datetime(words[1], words[2] if len(words) > 2 else '00:00:00')
+        elif words[0] == ':EndDate':
+            end = _datetime(words[1], words[2] if len(words) > 2 else '00:00:00')
+        elif words[0] == ':Duration':
+            duration = float(words[1])
+    if start is None:
+        raise ValueError('raven_window: no :StartDate in RVI')
+    if end is None:
+        if duration is None:
+            raise ValueError('raven_window: neither :EndDate nor :Duration in RVI')
+        end = start + datetime.timedelta(days=duration)
+    return start, end
+
+
+def trim_raven_timeseries(infile, outfile, start, end):
+    """
+        Copy of a Raven time series file (e.g. :MultiData forcings or :ObservationData)
+        containing only the time steps of a simulation period.
+
+
+        Every block whose header line is followed by a line 'date time interval n'
+        (e.g. :MultiData, :Data, :ObservationData) is cut to the time steps from start
+        to end plus one time step; its start date and number of time steps are adapted.
+        All other lines are copied unchanged. Raven then parses only the forcings of
+        the simulated period instead of the whole record.
+
+
+        Definition
+        ----------
+        def trim_raven_timeseries(infile, outfile, start, end):
+
+
+        Input
+        -----
+        infile       Raven time series file (.rvt)
+        outfile      trimmed copy
+        start        datetime of first simulated time step
+        end          datetime of last simulated time step
+
+
+        Output
+        ------
+        number of time steps written per block (list)
+
+
+        Examples
+        --------
+        >>> import tempfile, shutil
+        >>> tmpdir = tempfile.mkdtemp()
+        >>> ff = open(os.path.join(tmpdir, 'meteo.rvt'), 'w')
+        >>> _ = ff.write(':MultiData\\n 1954-01-01  0:00:00   1  10\\n:Parameters RAINFALL TEMP_DAILY_AVE\\n:Units mm/d C\\n')
+        >>> for ii in range(10): _ = ff.write(str(ii)+'.0 '+str(-ii)+'.5\\n')
+        >>> _ = ff.write(':EndMultiData\\n')
+        >>> ff.close()
+        >>> print(trim_raven_timeseries(os.path.join(tmpdir, 'meteo.rvt'), os.path.join(tmpdir, 'trimmed.rvt'),
+        ...                             datetime.datetime(1954, 1, 3), datetime.datetime(1954, 1, 6)))
+        [5]
+        >>> print(open(os.path.join(tmpdir, 'trimmed.rvt')).read(), end='')
+        :MultiData
+         1954-01-03 00:00:00 1 5
+        :Parameters RAINFALL TEMP_DAILY_AVE
+        :Units mm/d C
+        2.0 -2.5
+        3.0 -3.5
+        4.0 -4.5
+        5.0 -5.5
+        6.0 -6.5
+        :EndMultiData
+        >>> trim_raven_timeseries(os.path.join(tmpdir, 'meteo.rvt'), os.path.join(tmpdir, 'trimmed.rvt'),
+        ...                       datetime.datetime(1960, 1, 1), datetime.datetime(1961, 1, 1))
+        Traceback (most recent call last):
+        ...
+        ValueError: trim_raven_timeseries: no time steps of .../meteo.rvt in period 1960-01-01 00:00:00 to 1961-01-01 00:00:00
+        >>> shutil.rmtree(tmpdir)
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    ff = open(infile, 'r')
+    lines = ff.readlines()
+    ff.close()
+
+    out     = []
+    nsteps  = []
+    iline   = 0
+    while iline < len(lines):
+        line = lines[iline]
+        out.append(line)
+        iline += 1
+        header = _block_header(lines[iline]) if (line.strip().startswith(':') and iline < len(lines)) else None
+        if header is None:
+            continue
+        t0, interval, n = header
+        # time steps of period [start, end] plus one time step
+        i0 = max(0, int(math.ceil((start - t0).total_seconds()/86400./interval - 1e-9)))
+        i1 = min(n, int(math.floor((end - t0).total_seconds()/86400./interval + 1e-9)) + 2)
+        if i1 <= i0:
+            raise ValueError('trim_raven_timeseries: no time steps of '+infile+' in period '+str(start)+' to '+str(end))
+        tstart = t0 + datetime.timedelta(days=i0*interval)
+        out.append(' '+tstart.strftime('%Y-%m-%d %H:%M:%S')+' '+_number(interval)+' '+str(i1-i0)+'\n')
+        iline += 1
+        # :Parameters, :Units, ... before data
+        while iline < len(lines) and lines[iline].strip().startswith(':'):
+            out.append(lines[iline])
+            iline += 1
+        out.extend(lines[iline+i0:iline+i1])
+        iline += n
+        nsteps.append(i1-i0)
+
+    _atomic_write(outfile, ''.join(out))
+    return nsteps
+
+
+def stage_raven_forcing(rvi, rvt, obs_folder, stagedir):
+    """
+        Stage the forcing and observation files of a Raven setup trimmed to its simulation period.
+
+
+        All files of obs_folder that the RVT (template) redirects to (':RedirectToFile
+        data_obs/<file>') are trimmed to the simulation period of the RVI (see
+        trim_raven_timeseries) into
+
+            <stagedir>/<YYYYmmdd>-<YYYYmmdd>/<basename of obs_folder>/
+
+        and all other files are linked. Linking this folder instead of obs_folder into
+        the run folders makes every Raven run read only the simulated period, without
+        changing the RVT. Staging is done once per campaign: files are only trimmed
+        again if their source is newer. Concurrent processes can stage at the same time.
+
+
+        Definition
+        ----------
+        def stage_raven_forcing(rvi, rvt, obs_folder, stagedir):
+
+
+        Input
+        -----
+        rvi          content (template) of Raven RVI file
+        rvt          content (template) of Raven RVT file
+        obs_folder   folder with forcing and observation files, e.g. .../model/data_obs
+        stagedir     folder of staged files
+
+
+        Output
+        ------
+        staged folder to be linked instead of obs_folder
+
+
+        Examples
+        --------
+        >>> import tempfile, shutil
+        >>> tmpdir = tempfile.mkdtemp()
+        >>> os.makedirs(os.path.join(tmpdir, 'data_obs'))
+        >>> ff = open(os.path.join(tmpdir, 'data_obs', 'Qobs.rvt'), 'w')
+        >>> _ = ff.write(':ObservationData HYDROGRAPH 1 m3/s\\n 2000-01-01  0:00:00   1  366\\n')
+        >>> _ = ff.write(''.join([ str(ii)+'.0\\n' for ii in range(366) ])+':EndObservationData\\n')
+        >>> ff.close()
+        >>> _ = open(os.path.join(tmpdir, 'data_obs', 'README'), 'w').close()
+        >>> rvi = ':StartDate 2000-03-01 00:00:00\\n:EndDate 2000-03-31 00:00:00\\n'
+        >>> rvt = ':RedirectToFile data_obs/Qobs.rvt\\n'
+        >>> staged = stage_raven_forcing(rvi, rvt, os.path.join(tmpdir, 'data_obs'), os.path.join(tmpdir, 'staged'))
+        >>> print(os.path.relpath(staged, tmpdir), sorted(os.listdir(staged)))
+        staged/20000301-20000331/data_obs ['Qobs.rvt', 'README']
+        >>> print(open(os.path.join(staged, 'Qobs.rvt')).read().splitlines()[1:3])
+        [' 2000-03-01 00:00:00 1 32', '60.0']
+        >>> shutil.rmtree(tmpdir)
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    start, end = raven_window(rvi)
+    obs_folder = os.path.abspath(obs_folder)
+    staged     = os.path.join(os.path.abspath(stagedir), start.strftime('%Y%m%d')+'-'+end.strftime('%Y%m%d'),
+                              os.path.basename(obs_folder))
+    try:
+        os.makedirs(staged)
+    except OSError:     # exists, e.g. created by another process at the same time
+        if not os.path.isdir(staged):
+            raise
+
+    redirected = set()
+    for line in rvt.split('\n'):
+        words = line.split('#')[0].split()
+        if len(words) > 1 and words[0] == ':RedirectToFile':
+            path = os.path.normpath(words[1]).split(os.sep)
+            if len(path) == 2 and path[0] == os.path.basename(obs_folder):
+                redirected.add(path[1])
+
+    for fname in sorted(os.listdir(obs_folder)):
+        source = os.path.join(obs_folder, fname)
+        target = os.path.join(staged, fname)
+        if fname in redirected:
+            if not(os.path.exists(target)) or os.path.getmtime(target) < os.path.getmtime(source):
+                trim_raven_timeseries(source, target, start, end)
+        elif not(os.path.lexists(target)):
+            try:
+                os.symlink(source, target)
+            except OSError:     # linked by another process at the same time
+                pass
+    return staged
+
+
+# Start datetime, interval [days] and number of time steps of a time series block header line or None
+def _block_header(line):
+    mm = re.match(r'^\s*(\d{4}-\d{2}-\d{2})\s+(\d{1,2}:\d{2}:\d{2}(?:\.\d*)?)\s+([0-9.eE+-]+)\s+(\d+)\s*(?:#.*)?$', line)
+    if mm is None:
+        return None
+    return _datetime(mm.group(1), mm.group(2)), float(mm.group(3)), int(mm.group(4))
+
+
+# Datetime of Raven date 'YYYY-MM-DD' and time 'h:mm:ss[.s]'
+def _datetime(date, time):
+    hh, mi, ss = time.split(':')
+    return datetime.datetime.strptime(date, '%Y-%m-%d') + datetime.timedelta(hours=int(hh), minutes=int(mi), seconds=float(ss))
+
+
+# Interval without trailing zeros, e.g. 1 instead of 1.0
+def _number(value):
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+# Write file via temporary file and rename so that concurrent readers never see partial files
+def _atomic_write(fname, content):
+    tmp = os.path.join(os.path.dirname(os.path.abspath(fname)), '.'+os.path.basename(fname)+'.'+socket.gethostname()+'.'+str(os.getpid()))
+    ff = open(tmp, 'w')
+    ff.write(content)
+    ff.close()
+    os.rename(tmp, fname)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
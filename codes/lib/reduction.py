@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import datetime
+from collections import OrderedDict
+import numpy as np
+
+__all__ = ['parse_reductions', 'reduce_outputs']
+
+
+def parse_reductions(spec):
+    """
+        Parse a reduction spec of model output time series into summary statistics.
+
+
+        The spec is a comma-separated list of key:statistic items, e.g.
+
+            'Q:mean,Q:q05,Q:q95,Q:djf,infiltration:annual_sum'
+
+        Available statistics are
+
+            mean, median, std, min, max, sum    of the whole series
+            qNN                                 NN-th percentile, e.g. q05, q95
+            annual_mean, annual_sum, annual_max mean over calendar years of annual mean, total or maximum
+            djf, mam, jja, son                  seasonal means (Dec-Feb, Mar-May, Jun-Aug, Sep-Nov)
+            monNN                               monthly mean of month NN, e.g. mon01, mon12
+
+        Annual, seasonal and monthly statistics need the date of the first time step
+        (see reduce_outputs).
+
+
+        Definition
+        ----------
+        def parse_reductions(spec):
+
+
+        Input
+        -----
+        spec         reduction spec string (see above)
+
+
+        Output
+        ------
+        ordered dictionary of lists of statistics per model output key
+
+
+        Examples
+        --------
+        >>> red = parse_reductions('Q:mean, Q:q95,infiltration:annual_sum')
+        >>> print(list(red.items()))
+        [('Q', ['mean', 'q95']), ('infiltration', ['annual_sum'])]
+        >>> red = parse_reductions('Q:mode')
+        Traceback (most recent call last):
+        ...
+        ValueError: parse_reductions: unknown statistic 'mode' of key 'Q'
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    reductions = OrderedDict()
+    for item in spec.split(','):
+        item = item.strip()
+        if len(item) == 0:
+            continue
+        if item.count(':') != 1:
+            raise ValueError("parse_reductions: items must be key:statistic but got '"+item+"'")
+        key, stat = [ ii.strip() for ii in item.split(':') ]
+        if _statistic(stat) is None:
+            raise ValueError("parse_reductions: unknown statistic '"+stat+"' of key '"+key+"'")
+        reductions.setdefault(key, [])
+        if not(stat in reductions[key]):
+            reductions[key].append(stat)
+    return reductions
+
+
+def reduce_outputs(model, reductions, keep=False, start=None, interval=1.):
+    """
+        Reduce time series of the model outputs of one run to summary statistics.
+
+
+        Applied inside the model function (i.e. by each worker) so that only the reduced
+        outputs are returned, sent to the master and stored. The reduced output of
+        statistic stat of key is stored as key stat_key, e.g. 'q95_Q'.
+        Keys without reductions, e.g. scalar metrics, are returned unchanged.
+
+
+        Definition
+        ----------
+        def reduce_outputs(model, reductions, keep=False, start=None, interval=1.):
+
+
+        Input
+        -----
+        model        dictionary of model outputs of one run
+        reductions   dictionary of lists of statistics per key (see parse_reductions) or None
+
+
+        Optional Input
+        --------------
+        keep         True:  keep reduced time series as well
+                     False: replace reduced time series by their statistics (default)
+        start        datetime of first time step; needed for annual, seasonal and monthly statistics
+        interval     time step in days (default: 1)
+
+
+        Output
+        ------
+        dictionary of model outputs
+
+
+        Examples
+        --------
+        >>> q = np.arange(730.)
+        >>> model = {'nse': 0.7, 'Q': q}
+        >>> red = parse_reductions('Q:mean,Q:q50,Q:annual_max,Q:jja')
+        >>> out = reduce_outputs(model, red, start=datetime.datetime(1991, 1, 1))
+        >>> for key in sorted(out): print(key, out[key])
+        annual_max_Q 546.5
+        jja_Q 379.5
+        mean_Q 364.5
+        nse 0.7
+        q50_Q 364.5
+        >>> print(sorted(reduce_outputs(model, red, keep=True, start=datetime.datetime(1991, 1, 1))))
+        ['Q', 'annual_max_Q', 'jja_Q', 'mean_Q', 'nse', 'q50_Q']
+        >>> out = reduce_outputs(model, red)
+        Traceback (most recent call last):
+        ...
+        ValueError: reduce_outputs: statistic 'annual_max' of key 'Q' needs the date of the first time step
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    if reductions is None:
+        return model
+
+    out = OrderedDict()
+    for key in model:
+        if not(key in reductions) or keep:
+            out[key] = model[key]
+    for key in reductions:
+        if not(key in model):
+            raise ValueError("reduce_outputs: model output has no key '"+key+"'")
+        series = np.asarray(model[key], dtype=float)
+        dates  = None
+        for stat in reductions[key]:
+            kind, arg = _statistic(stat)
+            if kind in ['annual', 'season', 'month'] and dates is None:
+                if start is None:
+                    raise ValueError("reduce_outputs: statistic '"+stat+"' of key '"+key+"' needs the date of the first time step")
+                dates = [ start + datetime.timedelta(days=interval*ii) for ii in range(np.size(series)) ]
+                years  = np.array([ dd.year for dd in dates ])
+                months = np.array([ dd.month for dd in dates ])
+            if kind == 'whole':
+                value = arg(series)
+            elif kind == 'percentile':
+                value = np.percentile(series, arg)
+            elif kind == 'annual':
+                value = np.mean([ arg(series[years == yy]) for yy in np.unique(years) ])
+            elif kind == 'season':
+                value = np.mean(series[np.in1d(months, arg)])
+            else:
+                value = np.mean(series[months == arg])
+            out[stat+'_'+key] = value
+    return out
+
+
+# statistics of the whole series
+_whole = {'mean': np.mean, 'median': np.median, 'std': np.std, 'min': np.min, 'max': np.max, 'sum': np.sum}
+# months of seasons
+_seasons = {'djf': [12, 1, 2], 'mam': [3, 4, 5], 'jja': [6, 7, 8], 'son': [9, 10, 11]}
+
+
+# Kind and argument of a statistic or None if unknown
+def _statistic(stat):
+    if stat in _whole:
+        return 'whole', _whole[stat]
+    if stat.startswith('annual_') and stat[len('annual_'):] in ['mean', 'sum', 'max']:
+        return 'annual', _whole[stat[len('annual_'):]]
+    if stat in _seasons:
+        return 'season', _seasons[stat]
+    if stat.startswith('q') and stat[1:].isdigit() and int(stat[1:]) <= 100:
+        return 'percentile', int(stat[1:])
+    if stat.startswith('mon') and stat[3:].isdigit() and 1 <= int(stat[3:]) <= 12:
+        return 'month', int(stat[3:])
+    return None
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
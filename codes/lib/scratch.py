@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import atexit
+import os
+import shutil
+import socket
+import tempfile
+
+__all__ = ['ScratchDir', 'dirsize']
+
+
+class ScratchDir(object):
+    """
+        Scratch space of one EEE analysis with a unique namespace for its model run folders.
+
+
+        Every instance creates its own directory <root>/<prefix>-<host>-<pid>-XXXXXX so that
+        several analyses running at the same time on the same or different nodes never
+        share run folders. The root can be any directory, e.g. a RAM disk (tmpfs) such
+        as /dev/shm, to keep the model I/O in memory. The namespace is removed when
+        the Python process exits unless keep=True.
+
+
+        Definition
+        ----------
+        class ScratchDir(root=None, prefix='eee-analysis', keep=False):
+
+
+        Optional Input
+        --------------
+        root         directory in which the namespace is created.
+                     'shm' or 'ram' are shortcuts for /dev/shm.
+                     (default: environment variable EEE_SCRATCH if set, otherwise system temporary directory)
+        prefix       prefix of the namespace directory name (default: 'eee-analysis')
+        keep         True:  namespace and all run folders are kept at exit
+                     False: namespace is removed at exit of Python (default)
+
+
+        Methods
+        -------
+        run_folder(run_id)   returns empty folder <namespace>/<run_id> for a model run
+        release(run_id)      removes run folder after a model run and books its size
+        usage()              current size of namespace in bytes
+        free()               free bytes on the file system of the namespace
+        summary()            one-line summary of scratch usage
+        cleanup()            removes namespace (called automatically at exit if not keep)
+
+
+        Attributes
+        ----------
+        root         root directory
+        namespace    directory of this analysis
+        nreleased    number of released run folders
+        total        sum of sizes of all released run folders in bytes
+        peak         size of largest released run folder in bytes
+
+
+        Examples
+        --------
+        >>> root = tempfile.mkdtemp()
+        >>> s1 = ScratchDir(root=root, prefix='eee-test')
+        >>> s2 = ScratchDir(root=root, prefix='eee-test')
+        >>> s1.namespace != s2.namespace
+        True
+        >>> run = s1.run_folder('run_set_0')
+        >>> with open(os.path.join(run, 'out.txt'), 'w') as ff: null = ff.write('x'*1000)
+        >>> print(s1.usage())
+        1000
+        >>> s1.release('run_set_0')
+        1000
+        >>> print(s1.nreleased, s1.total, s1.peak, os.path.exists(run))
+        1 1000 1000 False
+        >>> s1.cleanup(); s2.cleanup()
+        >>> os.listdir(root)
+        []
+        >>> os.rmdir(root)
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+
+    def __init__(self, root=None, prefix='eee-analysis', keep=False):
+        if root is None:
+            root = os.environ.get('EEE_SCRATCH', tempfile.gettempdir())
+        if root.lower() in ['shm', 'ram']:
+            root = '/dev/shm'
+        if not os.path.isdir(root):
+            raise ValueError('ScratchDir: scratch root does not exist: '+root)
+        self.root      = os.path.abspath(root)
+        self.keep      = keep
+        host           = socket.gethostname().split('.')[0]
+        self.namespace = tempfile.mkdtemp(prefix=prefix+'-'+host+'-'+str(os.getpid())+'-', dir=self.root)
+        self.nreleased = 0
+        self.total     = 0
+        self.peak      = 0
+        if not keep:
+            atexit.register(self.cleanup)
+
+    def run_folder(self, run_id):
+        folder = os.path.join(self.namespace, str(run_id))
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
+        os.makedirs(folder)
+        return folder
+
+    def release(self, run_id):
+        folder = os.path.join(self.namespace, str(run_id))
+        if not os.path.exists(folder):
+            return 0
+        size = dirsize(folder)
+        self.nreleased += 1
+        self.total     += size
+        self.peak       = max(self.peak, size)
+        if not self.keep:
+            shutil.rmtree(folder)
+        return size
+
+    def usage(self):
+        return dirsize(self.namespace)
+
+    def free(self):
+        st = os.statvfs(self.namespace)
+        return st.f_bavail * st.f_frsize
+
+    def summary(self):
+        mb = 1024.*1024.
+        return ('scratch {:s}: {:d} runs, {:.1f} MB written in total, {:.1f} MB per run at most, {:.1f} MB free'.format(
+            self.namespace, self.nreleased, self.total/mb, self.peak/mb, self.free()/mb))
+
+    def cleanup(self):
+        if os.path.exists(self.namespace):
+            shutil.rmtree(self.namespace, ignore_errors=True)
+
+
+def dirsize(path):
+    """
+        Total size in bytes of all files below path; symbolic links are not followed.
+
+
+        Definition
+        ----------
+        def dirsize(path):
+
+
+        Examples
+        --------
+        >>> dirsize(os.devnull) >= 0
+        True
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    if not os.path.isdir(path):
+        return os.lstat(path).st_size if os.path.exists(path) else 0
+    size = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for ff in filenames:
+            fname = os.path.join(dirpath, ff)
+            if not os.path.islink(fname):
+                size += os.lstat(fname).st_size
+    return size
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
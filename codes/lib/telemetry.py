@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import json
+import os
+import socket
+import sys
+import time
+from collections import OrderedDict
+import numpy as np
+
+__all__ = ['Telemetry', 'Progress', 'summarize_telemetry']
+
+
+class Telemetry(object):
+    """
+        Per-run phase timings, exit status and resource usage of model runs written as JSON lines.
+
+
+        A model function decorated with timed() gets one record per call (i.e. per
+        attempt of a run) appended to the telemetry file, by whichever process runs it
+        (this process, forked processes of run_parallel or queue workers). Inside the
+        model function, lap(phase) ends the current phase and starts the next one;
+        every call starts with phase 'setup'. Typical phases of the drivers are
+
+            setup      templates rendered, run folder and links created
+            model      model executable
+            parse      model outputs read (e.g. read_raven_csv, fread, NetCDF)
+            cleanup    run folder released, outputs reduced
+
+        model_status(status) adds exit code and resource usage of the model process
+        returned by run_model. A record looks like
+
+            {"run_id": "run_set_3", "host": "node1", "pid": 1234, "start": 1760000000.0,
+             "status": "ok", "walltime": 4.2,
+             "phases": {"setup": 0.05, "model": 4.0, "parse": 0.1, "cleanup": 0.05},
+             "returncode": 0, "timeout": false, "cputime": 3.9, "maxrss": 85.3,
+             "inblock": 0, "oublock": 2048}
+
+        Failed calls have status 'failed' and the exception in 'error'.
+        A Telemetry without file records nothing.
+
+
+        Definition
+        ----------
+        class Telemetry(telfile=None):
+
+
+        Optional Input
+        --------------
+        telfile      file of JSON lines; all necessary directories will be created
+                     (default: None, i.e. no telemetry)
+
+
+        Methods
+        -------
+        timed(func)           decorator of model function func(paras, run_id=None)
+        lap(phase)            start next phase of running call
+        model_status(status)  record status dictionary of run_model
+        clear()               remove records of previous analyses
+
+
+        Examples
+        --------
+        >>> import tempfile, shutil
+        >>> tmpdir = tempfile.mkdtemp()
+        >>> telemetry = Telemetry(os.path.join(tmpdir, 'logs', 'telemetry.jsonl'))
+        >>> @telemetry.timed
+        ... def model(paras, run_id=None):
+        ...     telemetry.lap('model')
+        ...     telemetry.model_status({'returncode': 0, 'timeout': False, 'cputime': 0.1, 'maxrss': 10.})
+        ...     if paras[0] < 0.:
+        ...         raise ValueError('negative parameter')
+        ...     telemetry.lap('parse')
+        ...     return {'out': paras[0]}
+        >>> print(model([1.0], run_id='run_set_0'))
+        {'out': 1.0}
+        >>> model([-1.0], run_id='run_set_1')
+        Traceback (most recent call last):
+        ...
+        ValueError: negative parameter
+        >>> records = [ json.loads(ll) for ll in open(telemetry.telfile) ]
+        >>> print([ (rr['run_id'], rr['status'], list(rr['phases'].keys())) for rr in records ])
+        [('run_set_0', 'ok', ['setup', 'model', 'parse']), ('run_set_1', 'failed', ['setup', 'model'])]
+        >>> print(records[1]['error'], records[1]['returncode'])
+        ValueError: negative parameter 0
+        >>> shutil.rmtree(tmpdir)
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+
+    def __init__(self, telfile=None):
+        self.telfile = None if telfile is None else os.path.abspath(telfile)
+        self.record  = None
+        if not(self.telfile is None) and not os.path.exists(os.path.dirname(self.telfile)):
+            try:
+                os.makedirs(os.path.dirname(self.telfile))
+            except OSError:     # created by another process at the same time
+                if not os.path.isdir(os.path.dirname(self.telfile)):
+                    raise
+
+    def timed(self, func):
+        if self.telfile is None:
+            return func
+
+        def timed_func(*args, **kwargs):
+            self._start(kwargs.get('run_id', None))
+            try:
+                result = func(*args, **kwargs)
+            except Exception as err:
+                self._finish('failed', type(err).__name__+': '+str(err))
+                raise
+            self._finish('ok')
+            return result
+        timed_func.__name__ = func.__name__
+        timed_func.__doc__  = func.__doc__
+        return timed_func
+
+    def lap(self, phase):
+        if self.record is None:
+            return
+        now = time.time()
+        self.record['phases'][self._phase] = self.record['phases'].get(self._phase, 0.) + now - self._t0
+        self._phase = phase
+        self._t0    = now
+
+    def model_status(self, status):
+        if self.record is None:
+            return
+        for kk in ['returncode', 'timeout', 'cputime', 'maxrss', 'inblock', 'oublock']:
+            if kk in status:
+                self.record[kk] = status[kk]
+
+    def clear(self):
+        if not(self.telfile is None) and os.path.exists(self.telfile):
+            os.remove(self.telfile)
+
+    def _start(self, run_id):
+        self.record = OrderedDict([('run_id', run_id), ('host', socket.gethostname().split('.')[0]),
+                                   ('pid', os.getpid()), ('start', time.time()),
+                                   ('status', None), ('walltime', None), ('phases', OrderedDict())])
+        self._phase = 'setup'
+        self._t0    = self.record['start']
+
+    def _finish(self, status, error=None):
+        self.lap(None)
+        self.record['status']   = status
+        self.record['walltime'] = self._t0 - self.record['start']
+        if not(error is None):
+            self.record['error'] = error
+        # one write of a whole line: records of concurrent processes do not interleave
+        ff = open(self.telfile, 'a')
+        ff.write(json.dumps(self.record)+'\n')
+        ff.close()
+        self.record = None
+
+
+class Progress(object):
+    """
+        Live progress, throughput and estimated time to finish of a batch of model runs
+        written to standard error.
+
+
+        Definition
+        ----------
+        class Progress(nruns, stream=sys.stderr, interval=1.):
+
+
+        Input
+        -----
+        nruns        number of model runs of the batch
+
+
+        Optional Input
+        --------------
+        stream       output stream (default: sys.stderr)
+        interval     minimum seconds between two progress lines (default: 1)
+
+
+        Methods
+        -------
+        update(failed=False)  count one finished run
+        elapsed()             seconds since start
+
+
+        Examples
+        --------
+        >>> progress = Progress(4, stream=sys.stdout, interval=0.)
+        >>> for irun in range(4):
+        ...     progress.update(failed=(irun == 2))
+        progress:      1/4    25.0%  ... runs/s  ETA ...  failed: 0
+        progress:      2/4    50.0%  ... runs/s  ETA ...  failed: 0
+        progress:      3/4    75.0%  ... runs/s  ETA ...  failed: 1
+        progress:      4/4   100.0%  ... runs/s  ETA 00:00:00  failed: 1
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+
+    def __init__(self, nruns, stream=sys.stderr, interval=1.):
+        self.nruns    = int(nruns)
+        self.stream   = stream
+        self.interval = float(interval)
+        self.ndone    = 0
+        self.nfailed  = 0
+        self.t0       = time.time()
+        self._tprint  = None
+
+    def update(self, failed=False):
+        self.ndone += 1
+        if failed:
+            self.nfailed += 1
+        now = time.time()
+        if (self._tprint is None) or (now - self._tprint >= self.interval) or (self.ndone == self.nruns):
+            rate = self.ndone / max(now - self.t0, 1e-9)
+            eta  = (self.nruns - self.ndone) / rate
+            self.stream.write('progress: {:6d}/{:d}  {:6.1f}%  {:8.3f} runs/s  ETA {:s}  failed: {:d}\n'.format(
+                self.ndone, self.nruns, 100.*self.ndone/self.nruns, rate, _hms(eta), self.nfailed))
+            self.stream.flush()
+            self._tprint = now
+
+    def elapsed(self):
+        return time.time() - self.t0
+
+
+def summarize_telemetry(telfile, walltime=None):
+    """
+        Summary of the telemetry records of a batch of model runs.
+
+
+        Definition
+        ----------
+        def summarize_telemetry(telfile, walltime=None):
+
+
+        Input
+        -----
+        telfile      file of JSON lines written by Telemetry
+
+
+        Optional Input
+        --------------
+        walltime     wall-clock time of the whole batch in seconds; gives throughput
+                     (default: None, i.e. time between first start and last end of records)
+
+
+        Output
+        ------
+        dictionary with
+            'ncalls', 'nfailed'         number of recorded calls (attempts) and failed calls
+            'runs_per_s'                successful runs per second of batch wall-clock time
+            'run_p50', 'run_p95'        median and 95th percentile of run wall-clock time [s]
+            'phases'                    mean time per phase [s]
+            'overhead_fraction'         fraction of run time not spent in the model executable
+            'cputime_mean'              mean CPU time of the model process [s]
+            'maxrss_max'                largest peak memory of the model process [MB]
+
+
+        Examples
+        --------
+        >>> import tempfile, shutil
+        >>> tmpdir  = tempfile.mkdtemp()
+        >>> telfile = os.path.join(tmpdir, 'telemetry.jsonl')
+        >>> ff = open(telfile, 'w')
+        >>> for ii in range(10):
+        ...     rec = {'run_id': 'run_set_'+str(ii), 'start': float(ii), 'status': 'failed' if ii == 9 else 'ok',
+        ...            'walltime': 1.+ii, 'phases': {'setup': 0.5, 'model': 0.5+ii}, 'cputime': 1., 'maxrss': 10.*ii}
+        ...     _ = ff.write(json.dumps(rec)+'\\n')
+        >>> ff.close()
+        >>> summary = summarize_telemetry(telfile, walltime=18.)
+        >>> print(summary['ncalls'], summary['nfailed'], summary['runs_per_s'], summary['run_p50'], summary['maxrss_max'])
+        10 1 0.5 5.5 90.0
+        >>> print(dict(summary['phases']), round(summary['overhead_fraction'], 4))
+        {'setup': 0.5, 'model': 5.0} 0.0909
+        >>> shutil.rmtree(tmpdir)
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    records = []
+    ff = open(telfile, 'r')
+    for line in ff:
+        if len(line.strip()) > 0:
+            records.append(json.loads(line))
+    ff.close()
+
+    summary = OrderedDict()
+    summary['ncalls']  = len(records)
+    summary['nfailed'] = len([ rr for rr in records if rr['status'] != 'ok' ])
+    if len(records) == 0:
+        return summary
+    if walltime is None:
+        walltime = max([ rr['start']+rr['walltime'] for rr in records ]) - min([ rr['start'] for rr in records ])
+    runtimes = np.array([ rr['walltime'] for rr in records ])
+    summary['runs_per_s'] = (summary['ncalls']-summary['nfailed']) / max(walltime, 1e-9)
+    summary['run_p50']    = float(np.percentile(runtimes, 50))
+    summary['run_p95']    = float(np.percentile(runtimes, 95))
+    phases = OrderedDict()
+    for rr in records:
+        for pp in rr['phases']:
+            phases[pp] = phases.get(pp, 0.) + rr['phases'][pp]
+    summary['phases'] = OrderedDict([ (pp, phases[pp]/len(records)) for pp in phases ])
+    if 'model' in phases:
+        summary['overhead_fraction'] = 1. - phases['model'] / max(np.sum(runtimes), 1e-9)
+    cputime = [ rr['cputime'] for rr in records if 'cputime' in rr ]
+    maxrss  = [ rr['maxrss'] for rr in records if 'maxrss' in rr ]
+    if len(cputime) > 0:
+        summary['cputime_mean'] = float(np.mean(cputime))
+    if len(maxrss) > 0:
+        summary['maxrss_max'] = float(np.max(maxrss))
+    return summary
+
+
+# Seconds as hh:mm:ss
+def _hms(seconds):
+    seconds = int(round(seconds))
+    return '{:02d}:{:02d}:{:02d}'.format(seconds // 3600, (seconds // 60) % 60, seconds % 60)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+from __future__ import division, absolute_import, print_function
+import string
+
+__all__ = ['compile_template', 'CompiledTemplate']
+
+# cache of compiled templates: (template, names) -> CompiledTemplate
+_compiled = {}
+
+
+class CompiledTemplate(object):
+    """
+        Model input template compiled once into static text chunks and slot indices.
+
+        A template string with str.format-style replacement fields such as
+        {par[x01]} or {dpar[half_x20]} is split into its literal text pieces
+        and the list of fields. Every field is mapped to the index of its
+        name in an ordered list of slot names. Rendering a template is then
+        only a join of the text chunks with the formatted slot values and
+        gives exactly the same string as str.format.
+
+
+        Definition
+        ----------
+        class CompiledTemplate(template, names):
+
+
+        Input
+        -----
+        template     template string with replacement fields, e.g. {par[x01]}
+        names        ordered list of slot names, e.g. ['par[x01]', 'par[x02]', 'dpar[half_x20]'];
+                     every field name in the template must be in names.
+                     Slots not used in the template are allowed.
+
+
+        Methods
+        -------
+        render(values)      values is sequence of values in the same order as names
+                            (e.g. list or numpy array of floats); returns rendered string
+        format(**kwargs)    same call as template.format(**kwargs) with dictionaries, e.g.
+                            format(par=dict_paras, dpar=dict_dparas)
+
+
+        Attributes
+        ----------
+        chunks       list of literal text pieces, len(chunks) = number of fields + 1
+        index        list of slot indices of each field
+        fields       list of field names in the order of their appearance in the template
+
+
+        Restrictions
+        ------------
+        Field names must be plain names (e.g. {setup}) or names with one item
+        lookup (e.g. {par[x01]}). Attribute lookups and nested format
+        specifications are not supported.
+
+
+        Examples
+        --------
+        >>> tpl = 'x01 = {par[x01]}\\nx02 = {par[x02]:.3f} and {{braces}}\\nsum = {dpar[sum]}\\n'
+        >>> names = ['par[x01]', 'par[x02]', 'dpar[sum]']
+        >>> ct = CompiledTemplate(tpl, names)
+        >>> print(ct.fields)
+        ['par[x01]', 'par[x02]', 'dpar[sum]']
+        >>> print(ct.render([1.0, 2.5, 3.5]), end='')
+        x01 = 1.0
+        x02 = 2.500 and {braces}
+        sum = 3.5
+
+        >>> # parity with str.format
+        >>> par  = {'x01':0.1234567890123, 'x02':1.e-12}
+        >>> dpar = {'sum':par['x01']+par['x02']}
+        >>> ct.render([par['x01'], par['x02'], dpar['sum']]) == tpl.format(par=par, dpar=dpar)
+        True
+        >>> ct.format(par=par, dpar=dpar) == tpl.format(par=par, dpar=dpar)
+        True
+
+        >>> CompiledTemplate('{par[x03]}', names)
+        Traceback (most recent call last):
+        ...
+        KeyError: "Template field 'par[x03]' not in given slot names."
+
+
+        License
+        -------
+        This file is part of the EEE code library for "Computationally inexpensive identification
+        of noninformative model parameters by sequential screening: Efficient Elementary Effects (EEE)".
+
+        The EEE code library is free software: you can redistribute it and/or modify
+        it under the terms of the GNU Lesser General Public License as published by
+        the Free Software Foundation, either version 3 of the License, or
+        (at your option) any later version.
+
+        Copyright 2026 Juliane Mai - juliane.mai(at)uwaterloo.ca
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+
+    def __init__(self, template, names):
+        self.names  = list(names)
+        slot        = dict([ (nn,ii) for ii,nn in enumerate(self.names) ])
+        self.chunks = []
+        self.fields = []
+        self.index  = []
+        self.specs  = []
+        text = []
+        formatter = string.Formatter()
+        for literal, field, spec, conversion in formatter.parse(template):
+            text.append(literal)
+            if field is None:
+                continue
+            if (field == '') or field[0].isdigit():
+                raise ValueError('Positional template fields are not supported: {'+field+'}')
+            if ('.' in field) or ('{' in (spec or '')):
+                raise ValueError('Attribute lookups and nested format specifications are not supported: {'+field+'}')
+            if not(field in slot):
+                raise KeyError("Template field '"+field+"' not in given slot names.")
+            self.chunks.append(''.join(text))
+            text = []
+            self.fields.append(field)
+            self.index.append(slot[field])
+            self.specs.append((spec, conversion))
+        self.chunks.append(''.join(text))
+        # plain fields such as {par[x01]} only need format(value) without spec or conversion
+        self.plain = all([ (ss == '') and (cc is None) for ss,cc in self.specs ])
+
+    def _convert(self, value, spec, conversion):
+        if conversion == 'r':
+            value = repr(value)
+        elif conversion == 's':
+            value = str(value)
+        elif conversion == 'a':
+            value = ascii(value)
+        return format(value, spec)
+
+    def render(self, values):
+        nfields = len(self.index)
+        if nfields == 0:
+            return self.chunks[0]
+        out = [None]*(2*nfields+1)
+        out[0::2] = self.chunks
+        if self.plain:
+            out[1::2] = [ format(values[ii]) for ii in self.index ]
+        else:
+            out[1::2] = [ self._convert(values[ii], ss, cc) for ii,(ss,cc) in zip(self.index, self.specs) ]
+        return ''.join(out)
+
+    def format(self, **kwargs):
+        values = []
+        for nn in self.names:
+            if '[' in nn:
+                base, key = nn[:-1].split('[', 1)
+                values.append(kwargs[base][key])
+            else:
+                values.append(kwargs[nn])
+        return self.render(values)
+
+
+def compile_template(template, names):
+    """
+        Compile a template with CompiledTemplate but only once for the same template and slot names.
+
+
+        Definition
+        ----------
+        def compile_template(template, names):
+
+
+        Input
+        -----
+        template     template string with replacement fields, e.g. {par[x01]}
+        names        ordered list of slot names, e.g. ['par[x01]', 'par[x02]', 'dpar[half_x20]']
+
+
+        Output
+        ------
+        CompiledTemplate; the same object is returned for repeated calls
+
+
+        Examples
+        --------
+        >>> names = ['par[x1]', 'par[x2]']
+        >>> ct = compile_template('a={par[x1]} b={par[x2]}', names)
+        >>> ct is compile_template('a={par[x1]} b={par[x2]}', names)
+        True
+        >>> print(ct.render([1.0, 2.0]))
+        a=1.0 b=2.0
+
+
+        History
+        -------
+        Written,  JM, Oct 2026
+    """
+    key = (template, tuple(names))
+    if not(key in _compiled):
+        _compiled[key] = CompiledTemplate(template, names)
+    return _compiled[key]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE)
+
+    # -------------------------
+    # benchmark against str.format on the robin templates (if available)
+    # -------------------------
+    import os
+    import sys
+    import timeit
+    import numpy as np
+    dir_path  = os.path.dirname(os.path.realpath(__file__))
+    robin_dir = os.path.abspath(dir_path+'/../../examples/robin/model')
+    if os.path.exists(robin_dir):
+        sys.path.append(robin_dir)
+        import raven_model_files as rmf
+        import robin_model_files as bmf
+
+        npara       = 72
+        paras       = list(np.random.random(npara))
+        keys_paras  = ["x{:02d}".format(ii) for ii in range(1,npara+1)]
+        dict_paras  = dict(zip(keys_paras,paras))
+        dict_dparas = {}
+        dict_dparas['sum_x43_x45'] = paras[43]+paras[45]
+        dict_dparas['sum_x44_x46'] = paras[44]+paras[46]
+        dict_dparas['sum_x47_x49'] = paras[47]+paras[49]
+        dict_dparas['sum_x48_x50'] = paras[48]+paras[50]
+        names  = [ 'par['+kk+']' for kk in keys_paras ] + [ 'dpar['+kk+']' for kk in dict_dparas ]
+        values = paras + list(dict_dparas.values())
+
+        templates = [rmf.RVI, rmf.RVP, rmf.RVH, rmf.RVT, rmf.RVC, rmf.RVH_LAKE, rmf.RVP_CHANNEL,
+                     bmf.HRUCROP, bmf.INFO, bmf.INIC, bmf.MGT, bmf.OBS, bmf.MODEL, bmf.PAR]
+        compiled  = [ compile_template(tt, names) for tt in templates ]
+        for tt,cc in zip(templates, compiled):
+            assert cc.render(values) == tt.format(par=dict_paras, dpar=dict_dparas)
+
+        nrep   = 200
+        t_fmt  = timeit.timeit(lambda: [ tt.format(par=dict_paras, dpar=dict_dparas) for tt in templates ], number=nrep)
+        t_comp = timeit.timeit(lambda: [ cc.render(values) for cc in compiled ], number=nrep)
+        print('robin templates: {:d} characters, {:d} fields'.format(
+            sum([ len(tt) for tt in templates ]), sum([ len(cc.index) for cc in compiled ])))
+        print('str.format:        {:9.3f} ms per run'.format(t_fmt/nrep*1000.))
+        print('CompiledTemplate:  {:9.3f} ms per run  (speedup {:.1f}x)'.format(t_comp/nrep*1000., t_fmt/t_comp))
@@ -81,43 +81,82 @@ def makeDirectories(fnames):
     for d in dirs:
         d.mkdir(parents=True, exist_ok=True)
 
-def get_discharge(start_day, ncfile, duration=1, group=None, var=None, ibasin=None, ilag=None):
-
-    # ibasin ... index of basin (starts with 0)
+# index of start day in time axis of CEQUEAU output per (start_day, units, calendar);
+# resolved once per simulation setup and reused for all model runs
+_start_index = {}
 
-    ncdata = nc4.NcDataset(ncfile, "r")
-    ncdata_time = ncdata.variables["t"][:]
-    ncdata_time_unit = ncdata.variables['t'].units
-    ncdata_time_cal  = ncdata.variables['t'].calendar
+def get_discharge(start_day, ncfile, duration=1, group=None, var=None, ibasin=None, ilag=None):
+    """
+    Arguments
+    ---------
+    start_day (datetime.datetime) : first day of discharge time series
+    ncfile (Text)                 : CEQUEAU output file (resultats.nc)
+    duration (int)                : number of time steps to read
+    group (Text)                  : group of variable, e.g. "etatsCP"
+    var (Text)                    : variable name, e.g. "debitExutoire"
+    ibasin (int)                  : index of basin (starts with 0);
+                                    None returns all basins [duration,nbasins] in one read
+                                    (only together with group and ilag)
+    ilag (int)                    : index of lag
 
-    # -------------------
-    # below takes 0.1925 sec  (total runtime = 0.2065 sec)
-    # -------------------
-    # ncdata_time = nc4.netcdf4.num2date(ncdata_time,units=ncdata_time_unit,calendar=ncdata_time_cal)          # <<<< this is awefully slow
-    
-    # -------------------
-    # below takes 0.000126 sec (total runtime = 0.00997 sec  --> reduced by 95.2%)
-    # -------------------
-    start_day = nc4.netcdf4.date2num(start_day,units=ncdata_time_unit,calendar=ncdata_time_cal)
+    Return
+    ------
+    numpy (masked) array with discharge; scalar if duration is 1
 
-    if ( len(np.where( ncdata_time == start_day )[0]) == 1):
+    Purpose
+    -------
+    Read discharge of a CEQUEAU run from netCDF output. Only the
+    hyperslab [idx:idx+duration] of the variable is read. The index
+    idx of start_day in the time variable "t" is searched only at the
+    first call and afterwards only verified by reading one time value.
+    """
 
-        idx = np.where( ncdata_time == start_day )[0][0]
+    ncdata = nc4.netcdf4.Dataset(ncfile, "r")    # plain netCDF4 dataset; no wrapping of all groups and variables
+    try:
+        idx = _get_start_index(ncdata.variables["t"], start_day)
 
-        if ( not(group is None) and not(var is None) and not(ibasin is None) and not(ilag is None) ):
-            ncdata_var = ncdata.groups[group].variables[var][idx:idx+duration,ibasin,ilag]
+        if ( not(group is None) and not(var is None) and not(ilag is None) ):
+            if ibasin is None:
+                ncdata_var = ncdata.groups[group].variables[var][idx:idx+duration,:,ilag]
+            else:
+                ncdata_var = ncdata.groups[group].variables[var][idx:idx+duration,ibasin,ilag]
         elif ( not(var is None) and not(ibasin is None) ):
             ncdata_var = ncdata.variables[var][ibasin,idx:idx+duration]
         else:
             raise ValueError('common: get_discharge: this usage of get_discharge() is not implemented yet')
-            
-    else:
-
-        print('ncdata_time = ',ncdata_time)
-        print('start_day=',start_day,' found ',len(np.where( ncdata_time == start_day )[0]),' times')
-        raise ValueError('common: get_discharge: start_day either found multiple times or not at all')
+    finally:
+        ncdata.close()
 
     if len(ncdata_var) == 1:
         return ncdata_var[0]
     else:
         return ncdata_var
+
+def _get_start_index(ncdata_t, start_day):
+
+    ncdata_time_unit = ncdata_t.units
+    ncdata_time_cal  = ncdata_t.calendar
+    key = (start_day, ncdata_time_unit, ncdata_time_cal)
+
+    # verify cached index with a single value
+    if key in _start_index:
+        idx, start_num = _start_index[key]
+        if ( idx < ncdata_t.shape[0] ) and ( ncdata_t[idx] == start_num ):
+            return idx
+
+    # -------------------
+    # num2date of all time steps takes 0.1925 sec; date2num of start_day only 0.000126 sec
+    # -------------------
+    start_num   = nc4.netcdf4.date2num(start_day,units=ncdata_time_unit,calendar=ncdata_time_cal)
+    ncdata_time = ncdata_t[:]
+
+    if ( len(np.where( ncdata_time == start_num )[0]) == 1):
+        idx = np.where( ncdata_time == start_num )[0][0]
+    else:
+        print('ncdata_time = ',ncdata_time)
+        print('start_day=',start_num,' found ',len(np.where( ncdata_time == start_num )[0]),' times')
+        raise ValueError('common: get_discharge: start_day either found multiple times or not at all')
+
+    _start_index[key] = (idx, start_num)
+
+    return idx